@@ -0,0 +1,37 @@
+"""Add per-tenant counters for sale numbers
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'tenant_counters',
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('name', sa.String(100), primary_key=True),
+        sa.Column('value', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Continue numbering from the highest INV-YYYYMMDD-NNNN already issued per day
+    op.execute("""
+        INSERT INTO tenant_counters (tenant_id, name, value)
+        SELECT tenant_id,
+               'sale_number:' || substring(sale_number from 5 for 8),
+               max(CAST(substring(sale_number from 14) AS INTEGER))
+        FROM sales
+        WHERE sale_number ~ '^INV-[0-9]{8}-[0-9]+$'
+        GROUP BY tenant_id, substring(sale_number from 5 for 8)
+    """)
+
+
+def downgrade():
+    op.drop_table('tenant_counters')
@@ -0,0 +1,34 @@
+"""Add idempotency key store for POST /sales
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('key', sa.String(255), nullable=False),
+        sa.Column('request_hash', sa.String(64), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='in_progress'),
+        sa.Column('response_body', sa.Text()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('tenant_id', 'key', name='uq_idempotency_tenant_key'),
+    )
+    op.create_index('idx_idempotency_expires', 'idempotency_keys', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('idx_idempotency_expires', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
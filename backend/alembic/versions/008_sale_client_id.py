@@ -0,0 +1,23 @@
+"""Add client_id to sales for offline batch ingest
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sales', sa.Column('client_id', sa.String(100)))
+    op.create_unique_constraint('uq_sale_tenant_client_id', 'sales', ['tenant_id', 'client_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_sale_tenant_client_id', 'sales', type_='unique')
+    op.drop_column('sales', 'client_id')
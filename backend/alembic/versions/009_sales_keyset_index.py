@@ -0,0 +1,20 @@
+"""Index sales for keyset pagination on (created_at, id)
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-01-01
+"""
+from alembic import op
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_sales_tenant_created_id', 'sales', ['tenant_id', 'created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('idx_sales_tenant_created_id', table_name='sales')
@@ -0,0 +1,26 @@
+"""Index sales for the history screen filters
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-01-01
+"""
+from alembic import op
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_sales_tenant_payment_created', 'sales', ['tenant_id', 'payment_method', 'created_at'])
+    op.create_index('idx_sales_tenant_user_created', 'sales', ['tenant_id', 'user_id', 'created_at'])
+    op.create_index('idx_sales_tenant_status_created', 'sales', ['tenant_id', 'status', 'created_at'])
+    op.create_index('idx_sales_tenant_total', 'sales', ['tenant_id', 'total'])
+
+
+def downgrade():
+    op.drop_index('idx_sales_tenant_total', table_name='sales')
+    op.drop_index('idx_sales_tenant_status_created', table_name='sales')
+    op.drop_index('idx_sales_tenant_user_created', table_name='sales')
+    op.drop_index('idx_sales_tenant_payment_created', table_name='sales')
@@ -0,0 +1,38 @@
+"""Add transactional outbox for sale side effects
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('event_type', sa.String(100), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('available_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_error', sa.Text()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('processed_at', sa.DateTime()),
+    )
+    op.create_index('idx_outbox_pending', 'outbox_events', ['tenant_id', 'id'],
+                    postgresql_where=sa.text("status = 'pending'"))
+    op.create_index('idx_outbox_processed', 'outbox_events', ['processed_at'])
+
+
+def downgrade():
+    op.drop_index('idx_outbox_processed', table_name='outbox_events')
+    op.drop_index('idx_outbox_pending', table_name='outbox_events')
+    op.drop_table('outbox_events')
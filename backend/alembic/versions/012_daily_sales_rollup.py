@@ -0,0 +1,38 @@
+"""Add daily sales rollup for reports
+
+Revision ID: 012
+Revises: 011
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'daily_sales_rollup',
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('business_date', sa.Date(), primary_key=True),
+        sa.Column('payment_method', sa.String(50), primary_key=True),
+        sa.Column('sale_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('vat', sa.Numeric(14, 2), nullable=False, server_default='0'),
+    )
+
+    # Backfill from existing completed sales
+    op.execute("""
+        INSERT INTO daily_sales_rollup (tenant_id, business_date, payment_method, sale_count, revenue, vat)
+        SELECT tenant_id, date(created_at), coalesce(payment_method, ''), count(*), sum(total), sum(vat_amount)
+        FROM sales
+        WHERE status = 'completed'
+        GROUP BY tenant_id, date(created_at), coalesce(payment_method, '')
+    """)
+
+
+def downgrade():
+    op.drop_table('daily_sales_rollup')
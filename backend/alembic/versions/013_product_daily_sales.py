@@ -0,0 +1,42 @@
+"""Add per-product daily sales rollup
+
+Revision ID: 013
+Revises: 012
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'product_daily_sales',
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('business_date', sa.Date(), primary_key=True),
+        sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('quantity', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('vat', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('cost', sa.Numeric(14, 2), nullable=False, server_default='0'),
+    )
+
+    # Backfill from existing completed sales; cost uses the current product cost
+    op.execute("""
+        INSERT INTO product_daily_sales (tenant_id, business_date, product_id, quantity, revenue, vat, cost)
+        SELECT s.tenant_id, date(s.created_at), si.product_id, sum(si.quantity), sum(si.total), sum(si.vat_amount),
+               sum(si.quantity * coalesce(p.cost_price, 0))
+        FROM sale_items si
+        JOIN sales s ON s.id = si.sale_id
+        JOIN products p ON p.id = si.product_id
+        WHERE s.status = 'completed'
+        GROUP BY s.tenant_id, date(s.created_at), si.product_id
+    """)
+
+
+def downgrade():
+    op.drop_table('product_daily_sales')
@@ -0,0 +1,40 @@
+"""Add hourly sales rollup and tenant timezone
+
+Revision ID: 014
+Revises: 013
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tenants', sa.Column('timezone', sa.String(64), server_default='UTC'))
+
+    op.create_table(
+        'hourly_sales_rollup',
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('business_date', sa.Date(), primary_key=True),
+        sa.Column('hour', sa.Integer(), primary_key=True),
+        sa.Column('sale_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(14, 2), nullable=False, server_default='0'),
+    )
+
+    # Backfill from existing completed sales
+    op.execute("""
+        INSERT INTO hourly_sales_rollup (tenant_id, business_date, hour, sale_count, revenue)
+        SELECT tenant_id, date(created_at), extract(hour from created_at), count(*), sum(total)
+        FROM sales
+        WHERE status = 'completed'
+        GROUP BY tenant_id, date(created_at), extract(hour from created_at)
+    """)
+
+
+def downgrade():
+    op.drop_table('hourly_sales_rollup')
+    op.drop_column('tenants', 'timezone')
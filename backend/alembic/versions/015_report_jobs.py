@@ -0,0 +1,39 @@
+"""Add report jobs
+
+Revision ID: 015
+Revises: 014
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'report_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('params', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='queued'),
+        sa.Column('error', sa.Text()),
+        sa.Column('content_type', sa.String(100)),
+        sa.Column('filename', sa.String(255)),
+        sa.Column('result', sa.LargeBinary()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime()),
+        sa.Column('expires_at', sa.DateTime()),
+    )
+    op.create_index('idx_report_jobs_tenant_status', 'report_jobs', ['tenant_id', 'status', 'id'])
+    op.create_index('idx_report_jobs_expires', 'report_jobs', ['expires_at'])
+
+
+def downgrade():
+    op.drop_table('report_jobs')
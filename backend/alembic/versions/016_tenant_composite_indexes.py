@@ -0,0 +1,39 @@
+"""Index the remaining tables for their tenant-scoped query shapes
+
+Revision ID: 016
+Revises: 015
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Stock history (tenant, product, newest first) and tenant-wide movement scans
+    op.create_index('idx_stock_movements_tenant_product_created', 'stock_movements',
+                    ['tenant_id', 'product_id', 'created_at'])
+    op.create_index('idx_stock_movements_tenant_created', 'stock_movements', ['tenant_id', 'created_at'])
+    # Foreign key lookups from products and per-product line scans
+    op.create_index('idx_sale_items_product', 'sale_items', ['product_id'])
+    # Catalogue, inventory and report joins only ever read active products
+    op.create_index('idx_products_tenant_active', 'products', ['tenant_id', 'id'],
+                    postgresql_where=sa.text('is_active'))
+    # Report job workers look for queued jobs across all tenants
+    op.create_index('idx_report_jobs_queued', 'report_jobs', ['tenant_id', 'id'],
+                    postgresql_where=sa.text("status = 'queued'"))
+    # A prefix of idx_sales_tenant_created_id
+    op.drop_index('idx_sales_tenant', table_name='sales')
+
+
+def downgrade():
+    op.create_index('idx_sales_tenant', 'sales', ['tenant_id'])
+    op.drop_index('idx_report_jobs_queued', table_name='report_jobs')
+    op.drop_index('idx_products_tenant_active', table_name='products')
+    op.drop_index('idx_sale_items_product', table_name='sale_items')
+    op.drop_index('idx_stock_movements_tenant_created', table_name='stock_movements')
+    op.drop_index('idx_stock_movements_tenant_product_created', table_name='stock_movements')
@@ -0,0 +1,58 @@
+"""Snapshot unit cost on sale lines and add the cashier rollup
+
+Revision ID: 017
+Revises: 016
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sale_items', sa.Column('unit_cost', sa.Numeric(10, 2)))
+
+    # Lines sold before this migration get the current product cost, the
+    # same figure product_daily_sales was backfilled with
+    op.execute("""
+        UPDATE sale_items SET unit_cost = (
+            SELECT products.cost_price FROM products WHERE products.id = sale_items.product_id
+        )
+        WHERE product_id IS NOT NULL
+    """)
+
+    op.create_table(
+        'cashier_daily_sales',
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('business_date', sa.Date(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('sale_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('vat', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('cost', sa.Numeric(14, 2), nullable=False, server_default='0'),
+    )
+
+    # Backfill from existing completed sales
+    op.execute("""
+        INSERT INTO cashier_daily_sales (tenant_id, business_date, user_id, sale_count, revenue, vat, cost)
+        SELECT s.tenant_id, date(s.created_at), s.user_id, count(*),
+               coalesce(sum(l.revenue), 0), coalesce(sum(l.vat), 0), coalesce(sum(l.cost), 0)
+        FROM sales s
+        LEFT JOIN (
+            SELECT sale_id, sum(total) AS revenue, sum(vat_amount) AS vat,
+                   sum(quantity * coalesce(unit_cost, 0)) AS cost
+            FROM sale_items
+            GROUP BY sale_id
+        ) l ON l.sale_id = s.id
+        WHERE s.status = 'completed'
+        GROUP BY s.tenant_id, date(s.created_at), s.user_id
+    """)
+
+
+def downgrade():
+    op.drop_table('cashier_daily_sales')
+    op.drop_column('sale_items', 'unit_cost')
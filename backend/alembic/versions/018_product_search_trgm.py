@@ -0,0 +1,34 @@
+"""Trigram indexes for ranked product search
+
+Revision ID: 018
+Revises: 017
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pg_trgm ships with the PostgreSQL contrib package. Without it product
+    # search keeps working from the in-process index (ProductSearchIndex).
+    available = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first()
+    if not available:
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('idx_products_name_trgm', 'products', ['name'],
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('idx_products_sku_trgm', 'products', ['sku'],
+                    postgresql_using='gin', postgresql_ops={'sku': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_products_sku_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_products_name_trgm")
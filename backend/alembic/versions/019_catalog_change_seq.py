@@ -0,0 +1,73 @@
+"""Change sequence and tombstones for catalog delta sync
+
+Revision ID: 019
+Revises: 018
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('products', sa.Column('change_seq', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('categories', sa.Column('change_seq', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('categories', sa.Column('updated_at', sa.DateTime()))
+    op.execute("UPDATE categories SET updated_at = created_at")
+
+    # Number the existing rows per tenant, categories first, so a terminal
+    # pulling from 0 gets everything; the catalog counter continues after them
+    op.execute("""
+        WITH numbered AS (
+            SELECT id, row_number() OVER (PARTITION BY tenant_id ORDER BY id) AS seq FROM categories
+        )
+        UPDATE categories c SET change_seq = n.seq FROM numbered n WHERE c.id = n.id
+    """)
+    op.execute("""
+        WITH numbered AS (
+            SELECT p.id,
+                   row_number() OVER (PARTITION BY p.tenant_id ORDER BY p.id)
+                   + (SELECT count(*) FROM categories c WHERE c.tenant_id = p.tenant_id) AS seq
+            FROM products p
+        )
+        UPDATE products p SET change_seq = n.seq FROM numbered n WHERE p.id = n.id
+    """)
+    op.execute("""
+        INSERT INTO tenant_counters (tenant_id, name, value)
+        SELECT tenant_id, 'catalog', max(change_seq)
+        FROM (
+            SELECT tenant_id, change_seq FROM categories
+            UNION ALL
+            SELECT tenant_id, change_seq FROM products
+        ) rows
+        GROUP BY tenant_id
+        ON CONFLICT (tenant_id, name) DO UPDATE SET value = EXCLUDED.value
+    """)
+
+    op.create_index('idx_products_tenant_change_seq', 'products', ['tenant_id', 'change_seq'])
+    op.create_index('idx_categories_tenant_change_seq', 'categories', ['tenant_id', 'change_seq'])
+
+    op.create_table(
+        'catalog_tombstones',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('entity', sa.String(20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('idx_catalog_tombstones_tenant_change_seq', 'catalog_tombstones', ['tenant_id', 'change_seq'])
+
+
+def downgrade():
+    op.drop_table('catalog_tombstones')
+    op.execute("DELETE FROM tenant_counters WHERE name = 'catalog'")
+    op.drop_index('idx_categories_tenant_change_seq', table_name='categories')
+    op.drop_index('idx_products_tenant_change_seq', table_name='products')
+    op.drop_column('categories', 'updated_at')
+    op.drop_column('categories', 'change_seq')
+    op.drop_column('products', 'change_seq')
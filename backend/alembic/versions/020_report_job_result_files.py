@@ -0,0 +1,26 @@
+"""Keep report job results in files instead of the jobs table
+
+Revision ID: 020
+Revises: 019
+Create Date: 2024-01-01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '020'
+down_revision = '019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Results are kept for REPORT_JOB_TTL_HOURS only; finished jobs lose theirs
+    op.execute("DELETE FROM report_jobs WHERE status = 'done'")
+    op.drop_column('report_jobs', 'result')
+    op.add_column('report_jobs', sa.Column('result_path', sa.String(500)))
+
+
+def downgrade():
+    op.execute("DELETE FROM report_jobs WHERE status = 'done'")
+    op.drop_column('report_jobs', 'result_path')
+    op.add_column('report_jobs', sa.Column('result', sa.LargeBinary()))
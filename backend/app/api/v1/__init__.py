@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, products, sales, inventory, reports, settings, suppliers, chat
+from app.api.v1 import auth, products, sales, inventory, reports, dashboard, settings, suppliers, chat
 
 router = APIRouter()
 router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -7,6 +7,7 @@ router.include_router(products.router, prefix="/products", tags=["products"])
 router.include_router(sales.router, prefix="/sales", tags=["sales"])
 router.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
 router.include_router(reports.router, prefix="/reports", tags=["reports"])
+router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 router.include_router(settings.router, prefix="/settings", tags=["settings"])
 router.include_router(suppliers.router, prefix="/suppliers", tags=["suppliers"])
 router.include_router(chat.router, prefix="/chat", tags=["chat"])
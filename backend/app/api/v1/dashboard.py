@@ -0,0 +1,22 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.dashboard import Dashboard
+from app.services.dashboard_service import DashboardService
+from app.core.dependencies import require_permission
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("", response_model=Dashboard)
+def get_dashboard(
+    today: date = Query(default=None),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """Today's KPIs, period comparisons, stock alerts, top sellers and recent sales in one call"""
+    service = DashboardService(db)
+    return service.get_dashboard(user.tenant_id, today or date.today())
@@ -6,6 +6,7 @@ from app.database import get_db
 from app.schemas.inventory import StockAdjustment, StockMovementResponse, LowStockProduct, InventoryItem
 from app.schemas.product import ProductResponse
 from app.services.inventory_service import InventoryService
+from app.services.stock_service import InsufficientStockError
 from app.core.dependencies import get_current_user, require_permission
 from app.models.user import User
 
@@ -42,6 +43,8 @@ def adjust_stock(
     service = InventoryService(db)
     try:
         return service.adjust_stock(user.tenant_id, user.id, data)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -1,14 +1,21 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import gzip
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.schemas.product import (
     CategoryCreate, CategoryUpdate, CategoryResponse,
-    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, ProductScan, CatalogChanges,
+    ProductImportResult
 )
+from app.services.catalog_sync_service import CatalogSyncService
+from app.services.counter_service import CounterService, CATALOG_COUNTER
+from app.services.product_import_service import ProductImportService
 from app.services.product_service import ProductService
 from app.core.dependencies import get_current_user, require_permission
+from app.core.etag import version_etag, not_modified, time_window
+from app.config import settings
 from app.models.user import User
 
 router = APIRouter()
@@ -17,9 +24,17 @@ router = APIRouter()
 # Categories
 @router.get("/categories", response_model=List[CategoryResponse])
 def list_categories(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
+    """Categories; answers 304 to If-None-Match until the catalog changes"""
+    etag = version_etag("categories", user.tenant_id,
+                        *CounterService(db).current_values(user.tenant_id, CATALOG_COUNTER))
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
     service = ProductService(db)
     return service.get_categories(user.tenant_id)
 
@@ -63,11 +78,26 @@ def delete_category(
 # Products
 @router.get("", response_model=ProductListResponse)
 def list_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
+    """A page of products; answers 304 to If-None-Match until the catalog changes.
+
+    Stock is not versioned, as sales would change the tag all day: the tag
+    moves on every PRODUCT_LIST_STOCK_WINDOW_SECONDS instead, which bounds
+    how old the stock levels of a revalidated page can be. Tills read live
+    stock from the product and inventory endpoints.
+    """
+    catalog, = CounterService(db).current_values(user.tenant_id, CATALOG_COUNTER)
+    etag = version_etag("products", user.tenant_id, skip, limit, catalog,
+                        time_window(settings.PRODUCT_LIST_STOCK_WINDOW_SECONDS))
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
     try:
         service = ProductService(db)
         items, total = service.get_products(user.tenant_id, skip, limit)
@@ -89,6 +119,50 @@ def search_products(
     return service.search_products(user.tenant_id, q)
 
 
+@router.get("/changes", response_model=CatalogChanges)
+def get_catalog_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Catalog changes after the `since` cursor, for terminals keeping a local copy.
+
+    Start from `/snapshot` (or since=0), apply the page and pull again with
+    the returned `cursor`; repeat straight away while `has_more` is true.
+    """
+    service = CatalogSyncService(db)
+    return service.get_changes(user.tenant_id, since, limit)
+
+
+@router.get("/snapshot")
+def get_catalog_snapshot(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """The whole active catalog as one gzip-encoded CatalogSnapshot document, for a terminal's cold start"""
+    service = CatalogSyncService(db)
+    body = service.get_snapshot(user.tenant_id)
+    if "gzip" not in request.headers.get("accept-encoding", ""):
+        return Response(gzip.decompress(body), media_type="application/json")
+    return Response(body, media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+
+@router.get("/by-barcode/{code}", response_model=ProductScan)
+def get_product_by_barcode(
+    code: str,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Till scan lookup by barcode or SKU from the in-memory catalog index"""
+    service = ProductService(db)
+    product = service.find_by_code(user.tenant_id, code)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 def get_product(
     product_id: int,
@@ -120,6 +194,26 @@ def create_product(
         )
 
 
+@router.post("/import", response_model=ProductImportResult)
+def import_products(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("products:write"))
+):
+    """Create or update products from a CSV or NDJSON file, matched by SKU or barcode.
+
+    Columns are the product fields plus `category` (a name, created when
+    missing). The format defaults to NDJSON for .ndjson/.jsonl files and CSV
+    otherwise. Rows that fail are listed with their line and skipped; the
+    others are written.
+    """
+    if format is None:
+        format = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+    service = ProductImportService(db)
+    return service.import_stream(user.tenant_id, file.file, format)
+
+
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: int,
@@ -1,12 +1,22 @@
-from typing import List
+import os
+from typing import List, Literal
 from datetime import date
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.database import get_db
-from app.schemas.report import DailySummary, ProductSalesReport, SalesByDateReport
+from app.schemas.report import (
+    DailySummary, ProductSalesReport, CategorySalesReport, SalesByDateReport, SalesHeatmap, AbcReport,
+    MarginReport, ReportJobCreate, ReportJobResponse
+)
 from app.services.report_service import ReportService
+from app.services.export_service import ExportService
+from app.services.report_job_service import ReportJobService
+from app.workers.report_jobs import job_pool
+from app.config import settings
 from app.core.dependencies import require_permission
+from app.core.cache import report_cache
 from app.models.user import User
 
 router = APIRouter()
@@ -27,12 +37,30 @@ def get_daily_summary(
 def get_sales_by_product(
     start_date: date = Query(...),
     end_date: date = Query(...),
+    order_by: Literal["revenue", "quantity"] = Query("revenue"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=500),
     db: Session = Depends(get_db),
     user: User = Depends(require_permission("reports:read"))
 ):
     """Get sales breakdown by product"""
     service = ReportService(db)
-    return service.get_sales_by_product(user.tenant_id, start_date, end_date)
+    return service.get_sales_by_product(user.tenant_id, start_date, end_date, order_by, skip, limit)
+
+
+@router.get("/by-category", response_model=List[CategorySalesReport])
+def get_sales_by_category(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    order_by: Literal["revenue", "quantity"] = Query("revenue"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """Get sales breakdown by product category"""
+    service = ReportService(db)
+    return service.get_sales_by_category(user.tenant_id, start_date, end_date, order_by, skip, limit)
 
 
 @router.get("/range", response_model=SalesByDateReport)
@@ -44,4 +72,138 @@ def get_date_range_report(
 ):
     """Get comprehensive report for date range"""
     service = ReportService(db)
-    return service.get_date_range_report(user.tenant_id, start_date, end_date)
+    try:
+        return service.get_date_range_report(user.tenant_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/heatmap", response_model=SalesHeatmap)
+def get_heatmap(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """Transactions and revenue per weekday and hour in the tenant's timezone"""
+    service = ReportService(db)
+    try:
+        return service.get_heatmap(user.tenant_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/abc", response_model=AbcReport)
+def get_abc_report(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    metric: Literal["revenue", "margin"] = Query("revenue"),
+    a_threshold: float = Query(0.8),
+    b_threshold: float = Query(0.95),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """ABC (Pareto) classification of the catalog by revenue or margin"""
+    service = ReportService(db)
+    try:
+        return service.get_abc_report(user.tenant_id, start_date, end_date, metric,
+                                      a_threshold, b_threshold, skip, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/margin", response_model=MarginReport)
+def get_margin_report(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    group_by: Literal["product", "category", "day", "cashier"] = Query("product"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """Gross margin by product, category, day or cashier, from costs captured at sale time"""
+    service = ReportService(db)
+    try:
+        return service.get_margin_report(user.tenant_id, start_date, end_date, group_by, skip, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+def export_sales(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    rows: Literal["lines", "sales"] = Query("lines"),
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    gzip: bool = Query(False),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """Stream every sale line (or sale) of the range as CSV or NDJSON"""
+    service = ExportService(db)
+    try:
+        chunks = service.stream(user.tenant_id, start_date, end_date, rows, format, gzip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filename = f"{rows}_{start_date}_{end_date}.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else ("text/csv" if format == "csv" else "application/x-ndjson")
+    return StreamingResponse(chunks, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=202)
+def submit_report_job(
+    data: ReportJobCreate,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """Queue a long range report or export; poll the job and download its result"""
+    service = ReportJobService(db)
+    try:
+        job = service.submit(user.tenant_id, user.id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if settings.REPORT_JOBS_IN_PROCESS:
+        job_pool.wake(sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind()))
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+def get_report_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """Get the status of a report job"""
+    job = ReportJobService(db).get_job(user.tenant_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/result")
+def get_report_job_result(
+    job_id: int,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("reports:read"))
+):
+    """Download the result of a finished report job"""
+    job = ReportJobService(db).get_job(user.tenant_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Report job is {job.status}")
+    path = ReportJobService.result_file(job)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Report job result is no longer available")
+    return FileResponse(path, media_type=job.content_type, filename=job.filename)
+
+
+@router.get("/cache-stats")
+def get_cache_stats(user: User = Depends(require_permission("reports:read"))):
+    """Report cache hit/miss counters for this process"""
+    return report_cache.stats()
@@ -1,41 +1,153 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.schemas.sale import SaleCreate, SaleResponse, SaleListResponse
+from app.config import settings
+from app.schemas.sale import (
+    SaleCreate, SaleResponse, SaleListResponse, SaleBatchCreate, SaleBatchResponse,
+    SaleFilters, SaleSummaryListResponse, SaleStatusUpdate
+)
 from app.services.sale_service import SaleService
+from app.services.idempotency_service import (
+    IdempotencyService, IdempotencyConflictError, IdempotencyInProgressError
+)
 from app.core.dependencies import get_current_user, require_permission
+from app.core.cache import report_cache
 from app.models.user import User
 
 router = APIRouter()
 
 
+def sale_filters(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    payment_method: Optional[str] = Query(None),
+    user_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    min_total: Optional[Decimal] = Query(None),
+    max_total: Optional[Decimal] = Query(None)
+) -> SaleFilters:
+    return SaleFilters(
+        date_from=date_from, date_to=date_to, payment_method=payment_method, user_id=user_id,
+        status=status, min_total=min_total, max_total=max_total
+    )
+
+
 @router.post("", response_model=SaleResponse)
 def create_sale(
     data: SaleCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db),
     user: User = Depends(require_permission("sales:write"))
 ):
-    """Process a new sale"""
+    """Process a new sale.
+
+    Send an Idempotency-Key header to make retries safe: a repeated request
+    returns the stored response without touching stock.
+    """
     service = SaleService(db)
+    if not idempotency_key:
+        try:
+            return service.create_sale(user.tenant_id, user.id, data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    idempotency = IdempotencyService(db)
     try:
-        return service.create_sale(user.tenant_id, user.id, data)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        record = idempotency.begin(user.tenant_id, idempotency_key, idempotency.fingerprint(data))
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if record.status == "completed":
+        response.headers["Idempotent-Replayed"] = "true"
+        return SaleResponse.model_validate_json(record.response_body)
+
+    try:
+        sale = service.add_sale(user.tenant_id, user.id, data)
+        result = SaleResponse.model_validate(sale)
+        idempotency.complete(record, result.model_dump_json())
+        db.commit()
+    except Exception as e:
+        # Whatever failed, nothing was committed: free the key for the retry
+        db.rollback()
+        idempotency.release(record)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+
+    report_cache.invalidate(user.tenant_id)
+    return result
+
+
+@router.post("/batch", response_model=SaleBatchResponse)
+def create_sales_batch(
+    data: SaleBatchCreate,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("sales:write"))
+):
+    """Ingest sales queued by a terminal while offline.
+
+    Sales are processed in order and skipped when their client_id was
+    already ingested, so a terminal can safely resend the whole queue.
+    """
+    service = SaleService(db)
+    results = service.ingest_batch(user.tenant_id, user.id, data.sales, settings.SALE_BATCH_CHUNK_SIZE)
+    return SaleBatchResponse(
+        results=results,
+        created=sum(1 for r in results if r.status == "created"),
+        duplicates=sum(1 for r in results if r.status == "duplicate"),
+        errors=sum(1 for r in results if r.status == "error")
+    )
 
 
 @router.get("", response_model=SaleListResponse)
 def list_sales(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
+    filters: SaleFilters = Depends(sale_filters),
     db: Session = Depends(get_db),
     user: User = Depends(require_permission("sales:read"))
 ):
-    """List sales"""
+    """List sales, newest first.
+
+    Use `next_cursor` from the previous page as `cursor` for fast deep
+    paging; `include_total=false` skips the count.
+    """
     service = SaleService(db)
-    items, total = service.get_sales(user.tenant_id, skip, limit)
-    return SaleListResponse(items=items, total=total)
+    try:
+        items, total, next_cursor = service.get_sales(user.tenant_id, skip, limit, cursor, include_total, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SaleListResponse(items=items, total=total, next_cursor=next_cursor)
+
+
+@router.get("/summary", response_model=SaleSummaryListResponse)
+def list_sale_summaries(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
+    filters: SaleFilters = Depends(sale_filters),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("sales:read"))
+):
+    """List sales for the history screen: header columns only, no line items"""
+    service = SaleService(db)
+    try:
+        items, total, next_cursor = service.get_sale_summaries(
+            user.tenant_id, skip, limit, cursor, include_total, filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SaleSummaryListResponse(items=items, total=total, next_cursor=next_cursor)
 
 
 @router.get("/{sale_id}", response_model=SaleResponse)
@@ -50,3 +162,18 @@ def get_sale(
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
     return sale
+
+
+@router.put("/{sale_id}/status", response_model=SaleResponse)
+def update_sale_status(
+    sale_id: int,
+    data: SaleStatusUpdate,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("sales:write"))
+):
+    """Mark a sale as refunded or cancelled (or completed again)"""
+    service = SaleService(db)
+    sale = service.update_status(user.tenant_id, sale_id, data.status)
+    if not sale:
+        raise HTTPException(status_code=404, detail="Sale not found")
+    return sale
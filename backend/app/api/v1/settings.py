@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.schemas.settings import BusinessInfo, VatRates, ReceiptTemplate, AllSettings
+from app.schemas.settings import BusinessInfo, VatRates, ReceiptTemplate, StockPolicy, AllSettings
+from app.services.counter_service import CounterService, SETTINGS_COUNTER
 from app.services.settings_service import SettingsService
 from app.core.dependencies import require_permission
+from app.core.etag import version_etag, not_modified
 from app.models.user import User
 
 router = APIRouter()
@@ -12,15 +14,23 @@ router = APIRouter()
 
 @router.get("", response_model=AllSettings)
 def get_all_settings(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(require_permission("*"))
 ):
-    """Get all settings"""
+    """Get all settings; answers 304 to If-None-Match until a setting changes"""
+    etag = version_etag("settings", user.tenant_id,
+                        *CounterService(db).current_values(user.tenant_id, SETTINGS_COUNTER))
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
     service = SettingsService(db)
     return AllSettings(
         business=service.get_business_info(user.tenant_id),
         vat_rates=service.get_vat_rates(user.tenant_id),
-        receipt=service.get_receipt_template(user.tenant_id)
+        receipt=service.get_receipt_template(user.tenant_id),
+        stock_policy=service.get_stock_policy(user.tenant_id)
     )
 
 
@@ -79,3 +89,22 @@ def update_receipt_template(
 ):
     service = SettingsService(db)
     return service.update_receipt_template(user.tenant_id, data)
+
+
+@router.get("/stock-policy", response_model=StockPolicy)
+def get_stock_policy(
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("*"))
+):
+    service = SettingsService(db)
+    return service.get_stock_policy(user.tenant_id)
+
+
+@router.put("/stock-policy", response_model=StockPolicy)
+def update_stock_policy(
+    data: StockPolicy,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_permission("*"))
+):
+    service = SettingsService(db)
+    return service.update_stock_policy(user.tenant_id, data)
@@ -1,11 +1,13 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.schemas.supplier import SupplierCreate, SupplierUpdate, SupplierResponse
+from app.services.counter_service import CounterService, SUPPLIERS_COUNTER
 from app.services.supplier_service import SupplierService
 from app.core.dependencies import get_current_user, require_permission
+from app.core.etag import version_etag, not_modified
 from app.models.user import User
 
 router = APIRouter()
@@ -13,10 +15,17 @@ router = APIRouter()
 
 @router.get("", response_model=List[SupplierResponse])
 def list_suppliers(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """List all suppliers for the tenant"""
+    """List all suppliers for the tenant; answers 304 to If-None-Match until a supplier changes"""
+    etag = version_etag("suppliers", user.tenant_id,
+                        *CounterService(db).current_values(user.tenant_id, SUPPLIERS_COUNTER))
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
     service = SupplierService(db)
     return service.get_suppliers(user.tenant_id)
 
@@ -0,0 +1,115 @@
+"""Admin commands.
+
+    python -m app.cli rebuild-rollups [--tenant ID]
+    python -m app.cli verify-rollups [--tenant ID]
+    python -m app.cli export-snapshot --out DIR [--tenant ID] [--full]
+    python -m app.cli import-products --tenant ID FILE [--format csv|ndjson]
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from app.database import SessionLocal
+from app.models.tenant import Tenant
+from app.services.product_import_service import ProductImportService
+from app.services.rollup_service import RollupService
+from app.services.snapshot_service import SnapshotService, PYARROW_AVAILABLE
+
+
+def _tenant_ids(db, tenant_id: Optional[int]) -> List[int]:
+    if tenant_id:
+        return [tenant_id]
+    return [row[0] for row in db.query(Tenant.id).order_by(Tenant.id)]
+
+
+def rebuild_rollups(args) -> int:
+    db = SessionLocal()
+    try:
+        service = RollupService(db)
+        for tenant_id in _tenant_ids(db, args.tenant):
+            service.rebuild(tenant_id)
+            print(f"Tenant {tenant_id}: rollups rebuilt")
+    finally:
+        db.close()
+    return 0
+
+
+def verify_rollups(args) -> int:
+    db = SessionLocal()
+    failed = False
+    try:
+        service = RollupService(db)
+        for tenant_id in _tenant_ids(db, args.tenant):
+            problems = service.verify(tenant_id)
+            for problem in problems:
+                print(f"Tenant {tenant_id}: {problem}")
+            print(f"Tenant {tenant_id}: {'MISMATCH' if problems else 'OK'}")
+            failed = failed or bool(problems)
+    finally:
+        db.close()
+    return 1 if failed else 0
+
+
+def export_snapshot(args) -> int:
+    if not PYARROW_AVAILABLE:
+        print("export-snapshot needs pyarrow, which is missing from this environment; "
+              "install the backend requirements (pip install -r requirements.txt)", file=sys.stderr)
+        return 2
+    db = SessionLocal()
+    try:
+        service = SnapshotService(db)
+        for tenant_id in _tenant_ids(db, args.tenant):
+            written = service.export(tenant_id, args.out, full=args.full)
+            print(f"Tenant {tenant_id}: " + ", ".join(f"{name} {count}" for name, count in written.items()))
+    finally:
+        db.close()
+    return 0
+
+
+def import_products(args) -> int:
+    format = args.format or ("ndjson" if args.file.lower().endswith((".ndjson", ".jsonl")) else "csv")
+    db = SessionLocal()
+    try:
+        with open(args.file, "rb") as stream:
+            result = ProductImportService(db).import_stream(args.tenant, stream, format)
+    finally:
+        db.close()
+    for error in result.error_rows:
+        print(f"Line {error.line}: {error.error}", file=sys.stderr)
+    if result.errors > len(result.error_rows):
+        print(f"... and {result.errors - len(result.error_rows)} more errors", file=sys.stderr)
+    print(f"Tenant {args.tenant}: {result.rows} rows, {result.created} created, {result.updated} updated, "
+          f"{result.errors} errors")
+    return 1 if result.errors else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="POS admin commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="Recompute report rollups from sales history")
+    rebuild.add_argument("--tenant", type=int, help="Only this tenant (default: all)")
+    rebuild.set_defaults(func=rebuild_rollups)
+
+    verify = commands.add_parser("verify-rollups", help="Check report rollups against the sales tables")
+    verify.add_argument("--tenant", type=int, help="Only this tenant (default: all)")
+    verify.set_defaults(func=verify_rollups)
+
+    snapshot = commands.add_parser("export-snapshot", help="Append new sales history rows to Parquet files")
+    snapshot.add_argument("--out", required=True, help="Snapshot directory")
+    snapshot.add_argument("--tenant", type=int, help="Only this tenant (default: all)")
+    snapshot.add_argument("--full", action="store_true", help="Discard the tenant's snapshot and export everything")
+    snapshot.set_defaults(func=export_snapshot)
+
+    products = commands.add_parser("import-products", help="Create or update products from a CSV or NDJSON file")
+    products.add_argument("file", help="CSV or NDJSON file")
+    products.add_argument("--tenant", type=int, required=True)
+    products.add_argument("--format", choices=["csv", "ndjson"], help="Default: from the file extension")
+    products.set_defaults(func=import_products)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
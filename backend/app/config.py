@@ -6,6 +6,31 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # How long a duplicate waits for the in-flight request
+    IDEMPOTENCY_LEASE_SECONDS: float = 60.0  # In-progress claims left by a crashed request expire after this
+    SALE_BATCH_CHUNK_SIZE: int = 100  # Offline sales committed per transaction
+    REPORT_MAX_RANGE_DAYS: int = 366  # Widest range a single report request may cover
+    REPORT_CACHE_MAX_ENTRIES: int = 2048
+    REPORT_CACHE_TTL_SECONDS: float = 60.0  # Bounds staleness from writes in other processes
+    DASHBOARD_CACHE_TTL_SECONDS: float = 15.0  # Shorter than reports: stock levels also change outside sales
+    CATALOG_CACHE_MAX_ENTRIES: int = 256  # Per-tenant catalog indexes kept in memory
+    CATALOG_CACHE_TTL_SECONDS: float = 300.0
+    PRODUCT_LIST_STOCK_WINDOW_SECONDS: int = 60  # How long a revalidated product list may show old stock
+    SEARCH_MIN_SIMILARITY: float = 0.3  # Share of the query's trigrams a product name must contain
+    EXPORT_CHUNK_SIZE: int = 2000  # Rows fetched per round trip by streaming exports
+    PRODUCT_IMPORT_BATCH_SIZE: int = 1000  # Imported rows upserted per transaction
+    PRODUCT_IMPORT_MAX_ERRORS: int = 1000  # Row errors listed in an import result; the rest are only counted
+    REPORT_JOBS_IN_PROCESS: bool = True  # False when only `python -m app.workers.report_jobs` runs jobs
+    REPORT_JOB_WORKERS: int = 2  # Threads per API process
+    REPORT_JOB_TENANT_LIMIT: int = 1  # Jobs of one tenant running at the same time
+    REPORT_JOB_TTL_HOURS: int = 24  # How long finished results are kept
+    REPORT_JOB_TIMEOUT_MINUTES: int = 60  # Running jobs older than this are treated as lost
+    REPORT_JOB_RESULT_DIR: str = "./report_results"  # Job results; shared by the API and report workers
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 10  # After this an event is marked failed and skipped
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_RETENTION_DAYS: int = 7
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.config import settings
+
+
+class TenantCache:
+    """In-process LRU cache of computed results, invalidated per tenant.
+
+    Every tenant has a write version. Entries remember the version they were
+    computed at and are ignored once the tenant's version moves on, so
+    invalidating a tenant is a single counter bump. Entries also expire after
+    `ttl` seconds, which bounds staleness from writes made by other processes.
+
+    Concurrent misses for the same key and version share one computation; a
+    lookup after an invalidation never joins one started before it.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[int, float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple, Future] = {}
+        self._versions: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def version(self, tenant_id: int) -> int:
+        return self._versions.get(tenant_id, 0)
+
+    def invalidate(self, tenant_id: int):
+        with self._lock:
+            self._versions[tenant_id] = self._versions.get(tenant_id, 0) + 1
+
+    def get_or_compute(
+        self, tenant_id: int, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        """Cached value for `key`, computed on a miss; `ttl` overrides the cache-wide TTL"""
+        full_key = (tenant_id, key)
+        with self._lock:
+            version = self._versions.get(tenant_id, 0)
+            entry = self._entries.get(full_key)
+            if entry and entry[0] == version and entry[1] > time.monotonic():
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return entry[2]
+
+            # Keyed by version too: a computation started before a write may have read pre-write rows
+            inflight_key = (tenant_id, key, version)
+            future = self._inflight.get(inflight_key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                future = self._inflight[inflight_key] = Future()
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[inflight_key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._inflight[inflight_key]
+            # A write during the computation already bumped the version, so
+            # the entry is stored stale and the next lookup recomputes. It
+            # never replaces an entry computed at a newer version.
+            current = self._entries.get(full_key)
+            if current is None or current[0] <= version:
+                self._entries[full_key] = (version, time.monotonic() + (self.ttl if ttl is None else ttl), value)
+                self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        future.set_result(value)
+        return value
+
+    def update(self, tenant_id: int, key: Hashable, apply: Callable[[Any], None]):
+        """Apply a write to the cached value of `key` in place instead of dropping it.
+
+        A computation of `key` still in flight may have read the rows before
+        the write, so the tenant is invalidated instead and that result is
+        stored stale. `apply` runs under the cache lock and must be quick.
+        """
+        full_key = (tenant_id, key)
+        with self._lock:
+            version = self._versions.get(tenant_id, 0)
+            entry = self._entries.get(full_key)
+            if (tenant_id, key, version) in self._inflight:
+                self._versions[tenant_id] = version + 1
+            elif entry and entry[0] == version:
+                apply(entry[2])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions
+            }
+
+
+report_cache = TenantCache(settings.REPORT_CACHE_MAX_ENTRIES, settings.REPORT_CACHE_TTL_SECONDS)
+# Whole-catalog lookup structures, one entry per tenant and kind; invalidated by product writes only
+catalog_cache = TenantCache(settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS)
+# Product search indexes; kept apart from catalog_cache because product writes update them in place
+search_cache = TenantCache(settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS)
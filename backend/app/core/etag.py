@@ -0,0 +1,33 @@
+import time
+from typing import Optional
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"  # Clients may keep the body but must revalidate it
+
+
+def version_etag(*parts) -> str:
+    """Weak ETag built from what a response depends on: tenant, versions, query parameters"""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def time_window(seconds: int) -> int:
+    """Number of the current `seconds`-long window, for ETag parts that may lag by that much
+    instead of being versioned on every write"""
+    return int(time.time() // seconds)
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Tag `response` with `etag`; return a 304 to send instead when If-None-Match holds it.
+
+    Build `etag` from the counter versions before reading the data: a write
+    committed in between then gives newer data under the older tag, which
+    costs the client one extra download instead of hiding the write.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    header = request.headers.get("if-none-match")
+    if header:
+        tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        if "*" in tags or etag.removeprefix("W/") in tags:
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
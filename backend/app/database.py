@@ -14,3 +14,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def dialect_insert(db):
+    """Return the dialect-specific insert() so callers can use ON CONFLICT upserts"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
@@ -6,5 +6,11 @@ from app.models.sale import Sale, SaleItem
 from app.models.stock_movement import StockMovement
 from app.models.settings import TenantSettings
 from app.models.supplier import Supplier
+from app.models.counter import TenantCounter
+from app.models.idempotency import IdempotencyKey
+from app.models.outbox import OutboxEvent
+from app.models.report_job import ReportJob
+from app.models.tombstone import CatalogTombstone
+from app.models.rollup import DailySalesRollup, HourlySalesRollup, ProductDailySales, CashierDailySales
 
-__all__ = ["Tenant", "User", "Category", "Product", "Sale", "SaleItem", "StockMovement", "TenantSettings", "Supplier"]
+__all__ = ["Tenant", "User", "Category", "Product", "Sale", "SaleItem", "StockMovement", "TenantSettings", "Supplier", "TenantCounter", "IdempotencyKey", "OutboxEvent", "ReportJob", "CatalogTombstone", "DailySalesRollup", "HourlySalesRollup", "ProductDailySales", "CashierDailySales"]
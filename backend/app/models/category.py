@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -13,9 +13,12 @@ class Category(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq = Column(Integer, nullable=False, default=0)
 
     products = relationship("Product", back_populates="category")
 
     __table_args__ = (
         UniqueConstraint("tenant_id", "name", name="uq_category_tenant_name"),
+        Index("idx_categories_tenant_change_seq", "tenant_id", "change_seq"),
     )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+
+from app.database import Base
+
+
+class TenantCounter(Base):
+    __tablename__ = "tenant_counters"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String(100), primary_key=True)  # e.g. sale_number:20240101
+    value = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, ForeignKey, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -24,10 +24,14 @@ class Product(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq = Column(Integer, nullable=False, default=0)  # Tenant "catalog" counter value of the last write
 
     category = relationship("Category", back_populates="products")
 
     __table_args__ = (
         UniqueConstraint("tenant_id", "sku", name="uq_product_tenant_sku"),
         UniqueConstraint("tenant_id", "barcode", name="uq_product_tenant_barcode"),
+        Index("idx_products_tenant_active", "tenant_id", "id", postgresql_where=text("is_active")),
+        Index("idx_products_tenant_change_seq", "tenant_id", "change_seq"),
+        # The trigram GIN indexes on name and sku need pg_trgm and are created by migration 018 only
     )
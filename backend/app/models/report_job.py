@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text
+
+from app.database import Base
+
+
+class ReportJob(Base):
+    """A report computed in the background; the result is kept until expires_at"""
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    kind = Column(String(50), nullable=False)  # range, export
+    params = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, done, failed
+    error = Column(Text)
+    content_type = Column(String(100))
+    filename = Column(String(255))
+    result_path = Column(String(500))  # Under REPORT_JOB_RESULT_DIR
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    expires_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("idx_report_jobs_tenant_status", "tenant_id", "status", "id"),
+        Index("idx_report_jobs_expires", "expires_at"),
+        Index("idx_report_jobs_queued", "tenant_id", "id", postgresql_where=text("status = 'queued'")),
+    )
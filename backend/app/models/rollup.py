@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, String, Numeric, Date, ForeignKey
+
+from app.database import Base
+
+
+class DailySalesRollup(Base):
+    """Completed sales per tenant, business date and payment method"""
+    __tablename__ = "daily_sales_rollup"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    business_date = Column(Date, primary_key=True)
+    payment_method = Column(String(50), primary_key=True)  # "" when the sale had none
+    sale_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    vat = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class HourlySalesRollup(Base):
+    """Completed sales per tenant and UTC hour"""
+    __tablename__ = "hourly_sales_rollup"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    business_date = Column(Date, primary_key=True)  # UTC date
+    hour = Column(Integer, primary_key=True)  # UTC hour, 0-23
+    sale_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class ProductDailySales(Base):
+    """Completed sale lines per tenant, business date and product"""
+    __tablename__ = "product_daily_sales"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    business_date = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    vat = Column(Numeric(14, 2), nullable=False, default=0)
+    cost = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class CashierDailySales(Base):
+    """Completed sales and their lines per tenant, business date and cashier"""
+    __tablename__ = "cashier_daily_sales"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    business_date = Column(Date, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    sale_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)  # Sum of line totals
+    vat = Column(Numeric(14, 2), nullable=False, default=0)
+    cost = Column(Numeric(14, 2), nullable=False, default=0)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, ForeignKey, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -21,11 +21,23 @@ class Sale(Base):
     change_given = Column(Numeric(10, 2))
     notes = Column(Text)
     status = Column(String(50), default="completed")  # completed, refunded, cancelled
+    client_id = Column(String(100))  # Terminal-generated ID of sales ingested offline
     created_at = Column(DateTime, default=datetime.utcnow)
 
     items = relationship("SaleItem", back_populates="sale", cascade="all, delete-orphan")
     user = relationship("User")
 
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "sale_number", name="uq_sale_tenant_number"),
+        UniqueConstraint("tenant_id", "client_id", name="uq_sale_tenant_client_id"),
+        Index("idx_sales_tenant_created_id", "tenant_id", "created_at", "id"),
+        Index("idx_sales_tenant_payment_created", "tenant_id", "payment_method", "created_at"),
+        Index("idx_sales_tenant_user_created", "tenant_id", "user_id", "created_at"),
+        Index("idx_sales_tenant_status_open", "tenant_id", "status", "created_at",
+              postgresql_where=text("status <> 'completed'")),
+        Index("idx_sales_tenant_total", "tenant_id", "total"),
+    )
+
 
 class SaleItem(Base):
     __tablename__ = "sale_items"
@@ -36,9 +48,15 @@ class SaleItem(Base):
     product_name = Column(String(255), nullable=False)
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Numeric(10, 2), nullable=False)
+    unit_cost = Column(Numeric(10, 2))  # Product cost price when sold; NULL when it had none
     discount_amount = Column(Numeric(10, 2), default=0)
     vat_rate = Column(Numeric(5, 2), nullable=False)
     vat_amount = Column(Numeric(10, 2), nullable=False)
     total = Column(Numeric(10, 2), nullable=False)
 
     sale = relationship("Sale", back_populates="items")
+
+    __table_args__ = (
+        Index("idx_sale_items_sale", "sale_id"),  # Created by migration 003
+        Index("idx_sale_items_product", "product_id"),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 
 from app.database import Base
 
@@ -16,3 +16,8 @@ class StockMovement(Base):
     notes = Column(Text)
     user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_stock_movements_tenant_product_created", "tenant_id", "product_id", "created_at"),
+        Index("idx_stock_movements_tenant_created", "tenant_id", "created_at"),
+    )
@@ -16,6 +16,7 @@ class Tenant(Base):
     phone = Column(String(50))
     email = Column(String(255))
     currency = Column(String(3), default="GBP")
+    timezone = Column(String(64), default="UTC")  # IANA name, used for local-time reports
     created_at = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
 
@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+
+from app.database import Base
+
+
+class CatalogTombstone(Base):
+    """A hard-deleted catalog row, kept so terminals syncing by change_seq learn about the delete"""
+    __tablename__ = "catalog_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String(20), nullable=False)  # category
+    entity_id = Column(Integer, nullable=False)
+    change_seq = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_catalog_tombstones_tenant_change_seq", "tenant_id", "change_seq"),
+    )
@@ -0,0 +1,37 @@
+from typing import List, Optional
+from decimal import Decimal
+from pydantic import BaseModel
+from datetime import date, datetime
+
+from app.schemas.report import ProductSalesReport
+from app.schemas.sale import SaleSummary
+
+
+class PeriodComparison(BaseModel):
+    """A period up to today against the same number of days of the period before"""
+    start_date: date
+    revenue: Decimal
+    sale_count: int
+    previous_revenue: Decimal
+    previous_sale_count: int
+    revenue_change_percent: Optional[float] = None  # None when the previous period had no revenue
+
+
+class InventoryKpis(BaseModel):
+    active_products: int
+    stock_units: int
+    low_stock_count: int
+    out_of_stock_count: int
+
+
+class Dashboard(BaseModel):
+    date: date
+    generated_at: datetime
+    today: PeriodComparison  # Against yesterday
+    week: PeriodComparison  # Week to date against the same weekdays of last week
+    month: PeriodComparison  # Month to date against the same days of last month
+    average_ticket: Decimal  # Today
+    last_sale_at: Optional[datetime] = None
+    inventory: InventoryKpis
+    top_products: List[ProductSalesReport]  # Last 7 days by revenue
+    recent_sales: List[SaleSummary]
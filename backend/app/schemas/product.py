@@ -76,6 +76,68 @@ class ProductResponse(BaseModel):
         populate_by_name = True
 
 
+class ProductScan(BaseModel):
+    """What the till needs after a scan; stock is left out as it changes with every sale"""
+    id: int
+    name: str
+    sku: Optional[str] = None
+    barcode: Optional[str] = None
+    price: Decimal
+    vat_rate: Decimal
+    category_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ProductSync(ProductScan):
+    """A product as terminals keep it in their local catalog"""
+    image_url: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    change_seq: int
+
+
+class CategorySync(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    change_seq: int
+
+    class Config:
+        from_attributes = True
+
+
+class CatalogChanges(BaseModel):
+    products: List[ProductSync]  # Added or changed, active
+    categories: List[CategorySync]
+    deleted_products: List[int]  # Deactivated since the cursor
+    deleted_categories: List[int]
+    cursor: int  # Pass as ?since= on the next pull
+    has_more: bool  # Pull again right away with the new cursor
+
+
+class CatalogSnapshot(BaseModel):
+    cursor: int  # Pull /products/changes?since= from here
+    products: List[ProductSync]
+    categories: List[CategorySync]
+
+
 class ProductListResponse(BaseModel):
     items: List[ProductResponse]
     total: int
+
+
+class ProductImportError(BaseModel):
+    line: int  # Line in the file; the CSV header is line 1
+    sku: Optional[str] = None
+    barcode: Optional[str] = None
+    error: str
+
+
+class ProductImportResult(BaseModel):
+    rows: int
+    created: int
+    updated: int
+    errors: int
+    error_rows: List[ProductImportError]  # The first PRODUCT_IMPORT_MAX_ERRORS of them
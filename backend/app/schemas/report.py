@@ -1,7 +1,7 @@
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from decimal import Decimal
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, datetime
 
 
 class DailySummary(BaseModel):
@@ -20,6 +20,13 @@ class ProductSalesReport(BaseModel):
     revenue: Decimal
 
 
+class CategorySalesReport(BaseModel):
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+    quantity_sold: int
+    revenue: Decimal
+
+
 class SalesByDateReport(BaseModel):
     start_date: date
     end_date: date
@@ -28,3 +35,74 @@ class SalesByDateReport(BaseModel):
     total_vat: Decimal
     daily_breakdown: List[DailySummary]
     top_products: List[ProductSalesReport]
+
+
+class SalesHeatmap(BaseModel):
+    start_date: date
+    end_date: date
+    timezone: str
+    transactions: List[List[int]]  # [weekday, Monday = 0][local hour]
+    revenue: List[List[Decimal]]
+
+
+class AbcItem(BaseModel):
+    product_id: int
+    product_name: str
+    value: Decimal
+    cumulative_share: float
+    abc_class: str
+
+
+class AbcReport(BaseModel):
+    start_date: date
+    end_date: date
+    metric: str
+    a_threshold: float
+    b_threshold: float
+    total_value: Decimal
+    total_products: int
+    class_counts: Dict[str, int]
+    items: List[AbcItem]
+
+
+class MarginItem(BaseModel):
+    key: Optional[str] = None  # Product, category or cashier id, or the ISO date
+    name: Optional[str] = None
+    net_revenue: Decimal  # Line totals without VAT
+    cost: Decimal
+    gross_margin: Decimal
+    margin_percent: Optional[float] = None  # None without revenue
+
+
+class MarginReport(BaseModel):
+    start_date: date
+    end_date: date
+    group_by: str
+    net_revenue: Decimal
+    cost: Decimal
+    gross_margin: Decimal
+    margin_percent: Optional[float] = None
+    total_items: int
+    items: List[MarginItem]
+
+
+class ReportJobCreate(BaseModel):
+    kind: Literal["range", "export"]
+    start_date: date
+    end_date: date
+    rows: Literal["lines", "sales"] = "lines"  # export only
+    format: Literal["csv", "ndjson"] = "csv"  # export only
+
+
+class ReportJobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
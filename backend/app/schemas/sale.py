@@ -1,7 +1,7 @@
-from typing import Optional, List
+from typing import Optional, List, Literal
 from decimal import Decimal
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import date, datetime
 
 
 class SaleItemCreate(BaseModel):
@@ -18,6 +18,19 @@ class SaleCreate(BaseModel):
     notes: Optional[str] = None
 
 
+class OfflineSaleCreate(SaleCreate):
+    client_id: str = Field(..., min_length=1, max_length=100)  # Unique per sale, generated by the terminal
+    client_created_at: Optional[datetime] = None  # When the sale happened on the till
+
+
+class SaleBatchCreate(BaseModel):
+    sales: List[OfflineSaleCreate] = Field(..., max_length=1000)
+
+
+class SaleStatusUpdate(BaseModel):
+    status: Literal["completed", "refunded", "cancelled"]
+
+
 class SaleItemResponse(BaseModel):
     id: int
     product_id: Optional[int]
@@ -53,4 +66,49 @@ class SaleResponse(BaseModel):
 
 class SaleListResponse(BaseModel):
     items: List[SaleResponse]
-    total: int
+    total: Optional[int] = None  # Omitted when include_total=false
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+
+
+class SaleBatchResult(BaseModel):
+    client_id: str
+    status: str  # created, duplicate, error
+    sale_id: Optional[int] = None
+    sale_number: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SaleBatchResponse(BaseModel):
+    results: List[SaleBatchResult]
+    created: int
+    duplicates: int
+    errors: int
+
+
+class SaleFilters(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None  # Inclusive
+    payment_method: Optional[str] = None
+    user_id: Optional[int] = None
+    status: Optional[str] = None
+    min_total: Optional[Decimal] = None
+    max_total: Optional[Decimal] = None
+
+
+class SaleSummary(BaseModel):
+    id: int
+    sale_number: str
+    total: Decimal
+    payment_method: Optional[str]
+    status: str
+    user_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SaleSummaryListResponse(BaseModel):
+    items: List[SaleSummary]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
@@ -1,6 +1,7 @@
 from typing import Optional, Dict
 from decimal import Decimal
-from pydantic import BaseModel, EmailStr
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from pydantic import BaseModel, EmailStr, field_validator
 
 
 class BusinessInfo(BaseModel):
@@ -10,6 +11,16 @@ class BusinessInfo(BaseModel):
     email: Optional[EmailStr] = None
     vat_number: Optional[str] = None
     currency: str = "GBP"
+    timezone: str = "UTC"  # IANA name, e.g. Europe/Sofia
+
+    @field_validator("timezone")
+    @classmethod
+    def known_timezone(cls, value: str) -> str:
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone {value}")
+        return value
 
 
 class VatRates(BaseModel):
@@ -24,7 +35,12 @@ class ReceiptTemplate(BaseModel):
     show_vat_breakdown: bool = True
 
 
+class StockPolicy(BaseModel):
+    allow_negative: bool = True  # False rejects sales that would oversell
+
+
 class AllSettings(BaseModel):
     business: BusinessInfo
     vat_rates: VatRates
     receipt: ReceiptTemplate
+    stock_policy: StockPolicy
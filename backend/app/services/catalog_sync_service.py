@@ -0,0 +1,90 @@
+import gzip
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+
+from app.core.cache import catalog_cache
+from app.models.category import Category
+from app.models.product import Product
+from app.models.tombstone import CatalogTombstone
+from app.schemas.product import CatalogChanges, CatalogSnapshot, CategorySync, ProductSync
+from app.services.counter_service import CounterService, CATALOG_COUNTER
+
+PRODUCT_COLUMNS = [
+    Product.id, Product.name, Product.sku, Product.barcode, Product.price, Product.vat_rate, Product.category_id,
+    Product.image_url, Product.is_active, Product.updated_at, Product.change_seq
+]
+CATEGORY_COLUMNS = [Category.id, Category.name, Category.description, Category.updated_at, Category.change_seq]
+
+
+class CatalogSyncService:
+    """Products and categories for terminals that keep a local catalog.
+
+    Every catalog write takes the next value of the tenant's "catalog"
+    counter as its change_seq. The counter row stays locked until the write
+    commits, so a change becomes visible only after every change with a
+    lower seq: a terminal that has applied everything up to a cursor never
+    misses a row committed later. Stock is left out; it changes with every
+    sale and is read live.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_changes(self, tenant_id: int, since: int, limit: int = 500) -> CatalogChanges:
+        """Changes with change_seq above `since`, oldest first, at most `limit` of them"""
+        products = self.db.execute(
+            select(*PRODUCT_COLUMNS).where(Product.tenant_id == tenant_id, Product.change_seq > since)
+            .order_by(Product.change_seq).limit(limit + 1)
+        ).all()
+        categories = self.db.execute(
+            select(*CATEGORY_COLUMNS).where(Category.tenant_id == tenant_id, Category.change_seq > since)
+            .order_by(Category.change_seq).limit(limit + 1)
+        ).all()
+        tombstones = self.db.execute(
+            select(CatalogTombstone.entity, CatalogTombstone.entity_id, CatalogTombstone.change_seq).where(
+                CatalogTombstone.tenant_id == tenant_id, CatalogTombstone.change_seq > since
+            ).order_by(CatalogTombstone.change_seq).limit(limit + 1)
+        ).all()
+
+        # Every change has its own seq, so the `limit` lowest of the three lists are the next page
+        changes = sorted(
+            [("product", row) for row in products] + [("category", row) for row in categories]
+            + [("tombstone", row) for row in tombstones],
+            key=lambda change: change[1].change_seq
+        )
+        page = changes[:limit]
+        result = CatalogChanges(
+            products=[], categories=[], deleted_products=[], deleted_categories=[],
+            cursor=page[-1][1].change_seq if page else since,
+            has_more=len(changes) > limit
+        )
+        for kind, row in page:
+            if kind == "product":
+                if row.is_active:
+                    result.products.append(ProductSync.model_validate(row))
+                else:
+                    result.deleted_products.append(row.id)
+            elif kind == "category":
+                result.categories.append(CategorySync.model_validate(row))
+            elif row.entity == "category":
+                result.deleted_categories.append(row.entity_id)
+        return result
+
+    def get_snapshot(self, tenant_id: int) -> bytes:
+        """The whole active catalog as gzip-compressed CatalogSnapshot JSON, cached until the next catalog write"""
+        return catalog_cache.get_or_compute(tenant_id, "snapshot", lambda: self._snapshot(tenant_id))
+
+    def _snapshot(self, tenant_id: int) -> bytes:
+        # The cursor is read before the rows: a change committed in between is
+        # both in the snapshot and pulled again, which terminals apply harmlessly
+        cursor, = CounterService(self.db).current_values(tenant_id, CATALOG_COUNTER)
+        products = self.db.execute(
+            select(*PRODUCT_COLUMNS).where(Product.tenant_id == tenant_id, Product.is_active == True)
+        ).all()
+        categories = self.db.execute(select(*CATEGORY_COLUMNS).where(Category.tenant_id == tenant_id)).all()
+        snapshot = CatalogSnapshot(
+            cursor=cursor,
+            products=[ProductSync.model_validate(row) for row in products],
+            categories=[CategorySync.model_validate(row) for row in categories]
+        )
+        return gzip.compress(snapshot.model_dump_json().encode(), compresslevel=6)
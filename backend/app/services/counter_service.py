@@ -0,0 +1,39 @@
+from typing import Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+
+from app.database import dialect_insert
+from app.models.counter import TenantCounter
+
+# Counters that version a tenant's data; writers bump them in the write's own transaction
+CATALOG_COUNTER = "catalog"  # Products and categories; the value is also their change_seq
+SETTINGS_COUNTER = "settings"
+SUPPLIERS_COUNTER = "suppliers"
+
+
+class CounterService:
+    """Per-tenant named counters allocated with a single upsert.
+
+    The counter row stays locked until the caller commits, so values are
+    handed out in commit order and never repeat.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def next_value(self, tenant_id: int, name: str, count: int = 1) -> int:
+        """Reserve `count` values and return the last one"""
+        insert = dialect_insert(self.db)
+        stmt = insert(TenantCounter).values(tenant_id=tenant_id, name=name, value=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TenantCounter.tenant_id, TenantCounter.name],
+            set_={"value": TenantCounter.value + count}
+        ).returning(TenantCounter.value)
+        return self.db.execute(stmt).scalar_one()
+
+    def current_values(self, tenant_id: int, *names: str) -> Tuple[int, ...]:
+        """Committed values of `names`, in order; 0 for a counter never used"""
+        values = dict(self.db.execute(select(TenantCounter.name, TenantCounter.value).where(
+            TenantCounter.tenant_id == tenant_id, TenantCounter.name.in_(names)
+        )).all())
+        return tuple(values.get(name, 0) for name in names)
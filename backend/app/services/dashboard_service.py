@@ -0,0 +1,112 @@
+from typing import List, Optional, Tuple
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case
+
+from app.config import settings
+from app.core.cache import report_cache
+from app.models.product import Product
+from app.models.rollup import DailySalesRollup
+from app.schemas.dashboard import Dashboard, PeriodComparison, InventoryKpis
+from app.schemas.sale import SaleSummary
+from app.services.report_service import ReportService
+from app.services.sale_service import SaleService
+
+
+def _change_percent(current: Decimal, previous: Decimal) -> Optional[float]:
+    return round(float((current - previous) / previous * 100), 2) if previous else None
+
+
+def _periods(today: date) -> List[Tuple[str, date, date, date, date]]:
+    """(name, start, end, previous start, previous end) of each compared period"""
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    previous_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    previous_month_end = min(previous_month_start + (today - month_start), month_start - timedelta(days=1))
+    return [
+        ("today", today, today, today - timedelta(days=1), today - timedelta(days=1)),
+        ("week", week_start, today, week_start - timedelta(days=7), today - timedelta(days=7)),
+        ("month", month_start, today, previous_month_start, previous_month_end),
+    ]
+
+
+class DashboardService:
+    """Owner dashboard KPIs in a fixed number of queries, cached per tenant for a short TTL"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_dashboard(self, tenant_id: int, today: date) -> Dashboard:
+        return report_cache.get_or_compute(
+            tenant_id, ("dashboard", today),
+            lambda: self._dashboard(tenant_id, today),
+            ttl=settings.DASHBOARD_CACHE_TTL_SECONDS
+        )
+
+    def _dashboard(self, tenant_id: int, today: date) -> Dashboard:
+        periods = _periods(today)
+        comparisons = self._comparisons(tenant_id, periods)
+
+        inventory = self.db.query(
+            func.count(Product.id),
+            func.coalesce(func.sum(Product.stock_quantity), 0),
+            func.coalesce(func.sum(case((Product.stock_quantity <= Product.min_stock_level, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Product.stock_quantity <= 0, 1), else_=0)), 0)
+        ).filter(
+            Product.tenant_id == tenant_id,
+            Product.is_active == True
+        ).one()
+
+        recent, _, _ = SaleService(self.db).get_sale_summaries(tenant_id, limit=5, include_total=False)
+        top_products = ReportService(self.db).get_sales_by_product(
+            tenant_id, today - timedelta(days=6), today, limit=5
+        )
+
+        today_kpis = comparisons["today"]
+        return Dashboard(
+            date=today,
+            generated_at=datetime.utcnow(),
+            today=today_kpis,
+            week=comparisons["week"],
+            month=comparisons["month"],
+            average_ticket=(today_kpis.revenue / today_kpis.sale_count).quantize(Decimal("0.01"))
+            if today_kpis.sale_count else Decimal("0"),
+            last_sale_at=recent[0].created_at if recent else None,
+            inventory=InventoryKpis(
+                active_products=inventory[0],
+                stock_units=inventory[1],
+                low_stock_count=inventory[2],
+                out_of_stock_count=inventory[3]
+            ),
+            top_products=top_products,
+            recent_sales=[SaleSummary.model_validate(row) for row in recent]
+        )
+
+    def _comparisons(self, tenant_id: int, periods) -> dict:
+        """Revenue and sale count of every period and its predecessor from one pass over the daily rollup"""
+        columns = []
+        for _, start, end, previous_start, previous_end in periods:
+            for first, last in ((start, end), (previous_start, previous_end)):
+                in_period = DailySalesRollup.business_date.between(first, last)
+                columns.append(func.sum(case((in_period, DailySalesRollup.revenue), else_=0)))
+                columns.append(func.sum(case((in_period, DailySalesRollup.sale_count), else_=0)))
+
+        row = self.db.query(*columns).filter(
+            DailySalesRollup.tenant_id == tenant_id,
+            DailySalesRollup.business_date.between(min(p[3] for p in periods), max(p[2] for p in periods))
+        ).one()
+
+        comparisons = {}
+        for index, (name, start, _, _, _) in enumerate(periods):
+            revenue, count, previous_revenue, previous_count = row[index * 4:index * 4 + 4]
+            revenue, previous_revenue = Decimal(revenue or 0), Decimal(previous_revenue or 0)
+            comparisons[name] = PeriodComparison(
+                start_date=start,
+                revenue=revenue,
+                sale_count=count or 0,
+                previous_revenue=previous_revenue,
+                previous_sale_count=previous_count or 0,
+                revenue_change_percent=_change_percent(revenue, previous_revenue)
+            )
+        return comparisons
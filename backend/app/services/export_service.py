@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, List, Sequence
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.sale import Sale, SaleItem
+
+SALE_COLUMNS = [
+    Sale.id, Sale.sale_number, Sale.created_at, Sale.status, Sale.payment_method, Sale.user_id,
+    Sale.subtotal, Sale.discount_amount, Sale.vat_amount, Sale.total, Sale.cash_received,
+    Sale.change_given, Sale.client_id
+]
+
+LINE_COLUMNS = [
+    Sale.id.label("sale_id"), Sale.sale_number, Sale.created_at, Sale.status, Sale.payment_method,
+    SaleItem.id.label("item_id"), SaleItem.product_id, SaleItem.product_name, SaleItem.quantity,
+    SaleItem.unit_price, SaleItem.discount_amount, SaleItem.vat_rate, SaleItem.vat_amount, SaleItem.total
+]
+
+BUFFER_BYTES = 64 * 1024  # Rows are encoded into chunks of about this size
+
+
+def _iso_rows(rows: Iterable[Sequence]) -> Iterator[Sequence]:
+    """Write datetimes as ISO 8601; their positions are taken from the first row"""
+    positions = None
+    for row in rows:
+        if positions is None:
+            positions = [i for i, v in enumerate(row) if isinstance(v, (datetime, date))]
+        if positions:
+            row = list(row)
+            for i in positions:
+                if row[i] is not None:
+                    row[i] = row[i].isoformat()
+        yield row
+
+
+def encode_csv(columns: Sequence[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in _iso_rows(rows):
+        writer.writerow(row)
+        if buffer.tell() >= BUFFER_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def encode_ndjson(columns: Sequence[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    """One JSON object per line; decimals are written as strings to keep them exact"""
+    parts: List[str] = []
+    size = 0
+    for row in _iso_rows(rows):
+        line = json.dumps(dict(zip(columns, row)), default=str, separators=(",", ":"))
+        parts.append(line)
+        size += len(line) + 1
+        if size >= BUFFER_BYTES:
+            yield ("\n".join(parts) + "\n").encode()
+            parts, size = [], 0
+    if parts:
+        yield ("\n".join(parts) + "\n").encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class ExportService:
+    """Streams sales or sale lines of a date range for accounting exports.
+
+    Rows are read through a server-side cursor in EXPORT_CHUNK_SIZE batches
+    and encoded as they arrive, so memory does not grow with the range.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def stream(
+        self, tenant_id: int, start_date: date, end_date: date,
+        rows: str = "lines", fmt: str = "csv", compress: bool = False
+    ) -> Iterator[bytes]:
+        if start_date > end_date:
+            raise ValueError("start_date must not be after end_date")
+
+        columns = LINE_COLUMNS if rows == "lines" else SALE_COLUMNS
+        stmt = select(*columns).where(
+            Sale.tenant_id == tenant_id,
+            Sale.created_at >= datetime.combine(start_date, datetime.min.time()),
+            Sale.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        )
+        if rows == "lines":
+            stmt = stmt.join(SaleItem, SaleItem.sale_id == Sale.id).order_by(Sale.created_at, Sale.id, SaleItem.id)
+        else:
+            stmt = stmt.order_by(Sale.created_at, Sale.id)
+
+        result = self.db.execute(stmt.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE))
+        names = list(result.keys())
+        encode = encode_csv if fmt == "csv" else encode_ndjson
+        chunks = encode(names, result)
+        return gzip_chunks(chunks) if compress else chunks
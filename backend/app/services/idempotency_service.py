@@ -0,0 +1,89 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.config import settings
+from app.models.idempotency import IdempotencyKey
+
+
+class IdempotencyConflictError(ValueError):
+    """The key was already used for a different request body"""
+
+
+class IdempotencyInProgressError(ValueError):
+    """The original request is still running after the wait timeout"""
+
+
+class IdempotencyService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def fingerprint(payload: BaseModel) -> str:
+        return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+    def begin(self, tenant_id: int, key: str, request_hash: str) -> IdempotencyKey:
+        """Claim `key` for this request.
+
+        Returns a new in-progress record when the caller should run the
+        request, or the completed record whose response must be replayed.
+        A duplicate of an in-flight request waits until the first one
+        finishes, up to IDEMPOTENCY_WAIT_SECONDS. The claim is only leased
+        for IDEMPOTENCY_LEASE_SECONDS, so a request that died without
+        releasing it blocks retries for that long at most.
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        while True:
+            now = datetime.utcnow()
+            # Evict expired keys of this tenant, including abandoned in-progress claims
+            self.db.query(IdempotencyKey).filter(
+                IdempotencyKey.tenant_id == tenant_id,
+                IdempotencyKey.expires_at < now
+            ).delete(synchronize_session=False)
+
+            record = IdempotencyKey(
+                tenant_id=tenant_id,
+                key=key,
+                request_hash=request_hash,
+                status="in_progress",
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+            )
+            self.db.add(record)
+            try:
+                self.db.commit()
+                return record
+            except IntegrityError:
+                self.db.rollback()
+
+            existing = self.db.query(IdempotencyKey).populate_existing().filter(
+                IdempotencyKey.tenant_id == tenant_id,
+                IdempotencyKey.key == key
+            ).first()
+            if existing is None:
+                continue  # Evicted in the meantime, claim again
+            if existing.request_hash != request_hash:
+                raise IdempotencyConflictError("Idempotency-Key was already used with a different request")
+            if existing.status == "completed":
+                return existing
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgressError("A request with this Idempotency-Key is still in progress")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    def complete(self, record: IdempotencyKey, response_body: str):
+        """Store the response; it is committed together with the caller's transaction"""
+        record.status = "completed"
+        record.response_body = response_body
+        record.expires_at = datetime.utcnow() + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+
+    def release(self, record: IdempotencyKey):
+        """Drop the claim of a failed request so a retry can run it again"""
+        try:
+            self.db.delete(record)
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()  # The lease still runs out
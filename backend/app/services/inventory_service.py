@@ -1,9 +1,11 @@
 from typing import List
 from sqlalchemy.orm import Session
 
+from app.core.cache import report_cache
 from app.models.product import Product
 from app.models.stock_movement import StockMovement
 from app.schemas.inventory import StockAdjustment
+from app.services.stock_service import StockService, InsufficientStockError
 
 
 class InventoryService:
@@ -40,7 +42,11 @@ class InventoryService:
         if not product:
             raise ValueError("Product not found")
 
-        product.stock_quantity += data.quantity
+        try:
+            StockService(self.db).apply(tenant_id, {product.id: data.quantity})
+        except InsufficientStockError:
+            self.db.rollback()
+            raise
 
         movement = StockMovement(
             tenant_id=tenant_id,
@@ -52,6 +58,7 @@ class InventoryService:
         )
         self.db.add(movement)
         self.db.commit()
+        report_cache.invalidate(tenant_id)  # The dashboard shows stock levels
         self.db.refresh(product)
         return product
 
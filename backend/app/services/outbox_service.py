@@ -0,0 +1,36 @@
+import json
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+
+from app.models.outbox import OutboxEvent
+
+
+class OutboxService:
+    """Writes side-effect events in the caller's transaction.
+
+    Events are applied later by the outbox worker (app/workers/outbox_worker.py),
+    so adding a consumer does not slow down checkout.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, tenant_id: int, event_type: str, payloads: List[dict]):
+        """Add one event per payload; they are committed with the caller's transaction"""
+        if not payloads:
+            return
+        self.db.execute(insert(OutboxEvent), [
+            {"tenant_id": tenant_id, "event_type": event_type, "payload": json.dumps(payload)}
+            for payload in payloads
+        ])
+
+    def purge_processed(self, older_than_days: int) -> int:
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        deleted = self.db.query(OutboxEvent).filter(
+            OutboxEvent.status == "done",
+            OutboxEvent.processed_at < cutoff
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
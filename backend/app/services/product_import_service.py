@@ -0,0 +1,267 @@
+import csv
+import io
+import itertools
+import json
+from datetime import datetime
+from typing import BinaryIO, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import report_cache, catalog_cache, search_cache
+from app.database import dialect_insert
+from app.models.category import Category
+from app.models.product import Product
+from app.schemas.product import ProductCreate, ProductImportError, ProductImportResult
+from app.services.counter_service import CounterService, CATALOG_COUNTER
+
+DECIMAL_FIELDS = ("price", "cost_price", "vat_rate")
+# Bytes that are not UTF-8 decode to U+FFFD, and the line is refused rather than failing the whole import
+NOT_UTF8 = "Not valid UTF-8; save the file as UTF-8 (\"CSV UTF-8\" in Excel)"
+
+
+def read_csv(stream: BinaryIO) -> Iterator[Tuple[int, Union[dict, str]]]:
+    """(line, row) for each CSV record, or (line, error message) for one that
+    is not UTF-8; blank cells are left out.
+
+    The delimiter is `;` when the header has more of those than commas, as
+    spreadsheets save with a decimal-comma locale, and decimal commas are
+    then read as points.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    header = text.readline()
+    semicolons = header.count(";") > header.count(",")
+    reader = csv.DictReader(itertools.chain([header], text), delimiter=";" if semicolons else ",")
+    for record in reader:
+        if any("\ufffd" in str(item) for item in itertools.chain(*record.items())):
+            yield reader.line_num, NOT_UTF8
+            continue
+        row = {key.strip(): value.strip() for key, value in record.items()
+               if key and isinstance(value, str) and value.strip()}
+        if semicolons:
+            for field in DECIMAL_FIELDS:
+                if field in row:
+                    row[field] = row[field].replace(",", ".")
+        yield reader.line_num, row
+
+
+def read_ndjson(stream: BinaryIO) -> Iterator[Tuple[int, Union[dict, str]]]:
+    """(line, row) for each JSON object line, or (line, error message) for a line that is not one or not UTF-8"""
+    for number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace"), start=1):
+        if not line.strip():
+            continue
+        if "\ufffd" in line:
+            yield number, NOT_UTF8
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, f"Invalid JSON: {e}"
+            continue
+        yield number, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+class _Row(NamedTuple):
+    line: int
+    values: dict  # Every product column, defaults filled in, for an insert
+    fields: FrozenSet[str]  # Columns the file gave, the only ones an update overwrites
+    category: Optional[str]  # Category name, resolved to category_id when the batch is written
+
+
+class ProductImportService:
+    """Create or update products from a CSV or NDJSON file.
+
+    Columns are the ProductCreate fields plus `category`, a category name
+    that is created when the tenant has none by that name. Rows are matched
+    to existing products by SKU, or by barcode when they have no SKU, and
+    written in batches with ON CONFLICT upserts on those unique constraints,
+    one commit per batch. The file is read one row at a time, so memory
+    stays flat however large it is; only the first PRODUCT_IMPORT_MAX_ERRORS
+    errors are listed.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_stream(
+        self, tenant_id: int, stream: BinaryIO, format: str = "csv", batch_size: Optional[int] = None
+    ) -> ProductImportResult:
+        if format not in READERS:
+            raise ValueError(f"Unsupported format: {format}")
+        batch_size = batch_size or settings.PRODUCT_IMPORT_BATCH_SIZE
+        result = ProductImportResult(rows=0, created=0, updated=0, errors=0, error_rows=[])
+        self._categories = self._load_categories(tenant_id)
+
+        batch: List[_Row] = []
+        keys = set()
+        rows = 0
+        for line, raw in READERS[format](stream):
+            rows += 1
+            row = self._validate(line, raw)
+            if isinstance(row, ProductImportError):
+                self._error(result, row)
+                continue
+            row_keys = self._keys(row)
+            if keys & row_keys:
+                # A product repeated in the file: write the earlier row first so this one updates it
+                self._flush(tenant_id, batch, result)
+                batch, keys = [], set()
+            batch.append(row)
+            keys |= row_keys
+            if len(batch) >= batch_size:
+                self._flush(tenant_id, batch, result)
+                batch, keys = [], set()
+        self._flush(tenant_id, batch, result)
+        result.rows = rows
+        return result
+
+    def _load_categories(self, tenant_id: int) -> Dict[str, int]:
+        return dict(self.db.execute(select(Category.name, Category.id).where(Category.tenant_id == tenant_id)).all())
+
+    def _validate(self, line: int, raw: Union[dict, str]) -> Union[_Row, ProductImportError]:
+        if isinstance(raw, str):
+            return ProductImportError(line=line, error=raw)
+        raw = dict(raw)
+        category = raw.pop("category", None)
+        try:
+            data = ProductCreate.model_validate(raw)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            return ProductImportError(line=line, sku=_text(raw.get("sku")), barcode=_text(raw.get("barcode")),
+                                      error=error)
+
+        def failed(error: str) -> ProductImportError:
+            return ProductImportError(line=line, sku=data.sku, barcode=data.barcode, error=error)
+
+        if not data.sku and not data.barcode:
+            return failed("sku or barcode is required to match the product")
+        fields = set(data.model_fields_set)
+        category = str(category).strip() if category is not None else None
+        if category is not None:
+            fields.add("category_id")
+        elif data.category_id is not None and data.category_id not in self._categories.values():
+            return failed(f"Category {data.category_id} not found")
+        return _Row(line, data.model_dump(), frozenset(fields), category or None)
+
+    @staticmethod
+    def _keys(row: _Row) -> set:
+        return {(field, row.values[field]) for field in ("sku", "barcode") if row.values[field]}
+
+    def _flush(self, tenant_id: int, batch: List[_Row], result: ProductImportResult):
+        if not batch:
+            return
+        try:
+            created, updated, errors = self._write(tenant_id, batch)
+            self.db.commit()
+        except IntegrityError:
+            # Another writer took a SKU or barcode meanwhile; write row by row to pin down which
+            self.db.rollback()
+            self._categories = self._load_categories(tenant_id)
+            created, updated, errors = 0, 0, []
+            for row in batch:
+                try:
+                    one = self._write(tenant_id, [row])
+                    self.db.commit()
+                except IntegrityError as e:
+                    self.db.rollback()
+                    self._categories = self._load_categories(tenant_id)
+                    one = (0, 0, [self._row_error(row, f"Conflicts with another product: {e.orig}")])
+                created, updated, errors = created + one[0], updated + one[1], errors + one[2]
+        result.created += created
+        result.updated += updated
+        for error in errors:
+            self._error(result, error)
+        report_cache.invalidate(tenant_id)
+        catalog_cache.invalidate(tenant_id)
+        search_cache.invalidate(tenant_id)
+
+    def _write(self, tenant_id: int, batch: List[_Row]) -> Tuple[int, int, List[ProductImportError]]:
+        """Upsert `batch` without committing; returns created and updated counts and the rows refused"""
+        skus = {row.values["sku"] for row in batch if row.values["sku"]}
+        barcodes = {row.values["barcode"] for row in batch if row.values["barcode"]}
+        missing = sorted({row.category for row in batch if row.category} - self._categories.keys())
+        # Reserve change_seq values before locking the matched products: single product writes lock the
+        # counter row first and their product row at commit, and the opposite order could deadlock with them.
+        # Rows refused below leave gaps, which sync cursors don't mind.
+        reserved = len(missing) + len(batch)
+        seq = CounterService(self.db).next_value(tenant_id, CATALOG_COUNTER, reserved) - reserved
+        by_sku, by_barcode = {}, {}
+        for product in self.db.execute(
+            select(Product.id, Product.sku, Product.barcode).where(
+                Product.tenant_id == tenant_id, or_(Product.sku.in_(skus), Product.barcode.in_(barcodes))
+            ).order_by(Product.id).with_for_update()
+        ):
+            if product.sku in skus:
+                by_sku[product.sku] = product
+            if product.barcode in barcodes:
+                by_barcode[product.barcode] = product
+
+        if missing:
+            categories = [Category(tenant_id=tenant_id, name=name, change_seq=seq + i + 1)
+                          for i, name in enumerate(missing)]
+            seq += len(missing)
+            self.db.add_all(categories)
+            self.db.flush()
+            self._categories.update((c.name, c.id) for c in categories)
+
+        created, updated, errors = 0, 0, []
+        groups: Dict[Tuple[str, FrozenSet[str]], List[dict]] = {}
+        for row in batch:
+            sku, barcode = row.values["sku"], row.values["barcode"]
+            same_sku, same_barcode = by_sku.get(sku), by_barcode.get(barcode)
+            if same_sku and same_barcode and same_sku.id != same_barcode.id:
+                errors.append(self._row_error(
+                    row, f"SKU belongs to product {same_sku.id} but barcode to product {same_barcode.id}"
+                ))
+                continue
+            if sku and not same_sku and same_barcode and same_barcode.sku:
+                errors.append(self._row_error(
+                    row, f"Barcode belongs to product {same_barcode.id} with SKU {same_barcode.sku}"
+                ))
+                continue
+            # Match on SKU unless only the barcode finds the product, which then gets the SKU
+            target = "sku" if sku and not (same_barcode and not same_sku) else "barcode"
+            values = dict(row.values, tenant_id=tenant_id, is_active=True)
+            if row.category:
+                values["category_id"] = self._categories[row.category]
+            groups.setdefault((target, row.fields), []).append(values)
+            if same_sku or same_barcode:
+                updated += 1
+            else:
+                created += 1
+
+        if groups:
+            now = datetime.utcnow()
+            insert = dialect_insert(self.db)
+            for (target, fields), rows in groups.items():
+                for values in rows:
+                    seq += 1
+                    values.update(change_seq=seq, updated_at=now)
+                stmt = insert(Product)
+                overwrite = fields | {"is_active", "change_seq", "updated_at"}
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Product.tenant_id, getattr(Product, target)],
+                    set_={field: stmt.excluded[field] for field in overwrite}
+                )
+                self.db.execute(stmt, rows)
+        return created, updated, errors
+
+    @staticmethod
+    def _row_error(row: _Row, error: str) -> ProductImportError:
+        return ProductImportError(line=row.line, sku=row.values["sku"], barcode=row.values["barcode"], error=error)
+
+    @staticmethod
+    def _error(result: ProductImportResult, error: ProductImportError):
+        result.errors += 1
+        if len(result.error_rows) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+            result.error_rows.append(error)
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None else str(value)
@@ -0,0 +1,212 @@
+import heapq
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, or_, text
+
+from app.config import settings
+from app.core.cache import search_cache
+from app.models.product import Product
+
+_WORD = re.compile(r"\w+")
+
+# Engines whose database has pg_trgm, keyed by URL; checked once per process
+_trigram_databases: Dict[str, bool] = {}
+
+
+@lru_cache(maxsize=65536)
+def _word_trigrams(word: str) -> FrozenSet[str]:
+    padded = f"  {word} "  # Padded the way pg_trgm pads words
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def trigrams(value: str) -> Set[str]:
+    """Trigrams of every word of `value`, lower-cased"""
+    grams = set()
+    for word in _WORD.findall(value.lower()):
+        grams |= _word_trigrams(word)
+    return grams
+
+
+def _prefix_rank(name: str, query: str) -> int:
+    """2 when the name starts with the query, 1 when one of its later words does"""
+    if name.startswith(query):
+        return 2
+    return 1 if f" {query}" in name else 0
+
+
+class _Document(NamedTuple):
+    name: str  # Lower-cased
+    grams: FrozenSet[str]
+    codes: Tuple[str, ...]
+
+
+class ProductSearchIndex:
+    """In-process trigram inverted index over the active products of one tenant.
+
+    Used where pg_trgm is not available. Scores follow pg_trgm: the share of
+    the query's trigrams found in the product (word similarity) must reach
+    the threshold, and the similarity of the two trigram sets breaks ties.
+    Writes are applied with `put` and `remove` while the index is cached.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str, Optional[str], Optional[str]]] = ()):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._documents: Dict[int, _Document] = {}
+        self._codes: Dict[str, int] = {}
+        postings: Dict[str, List[int]] = {}
+        for product_id, name, sku, barcode in rows:
+            for gram in self._document(product_id, name, sku, barcode).grams:
+                postings.setdefault(gram, []).append(product_id)
+        self._postings = {gram: set(ids) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def put(self, product_id: int, name: str, sku: Optional[str], barcode: Optional[str], is_active: bool = True):
+        with self._lock:
+            self._remove(product_id)
+            if is_active:
+                self._add(product_id, name, sku, barcode)
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self._remove(product_id)
+
+    def search(self, query: str, limit: int, min_similarity: float) -> List[int]:
+        """Ids of the best matches, name prefixes first, then by similarity; a matching code wins outright"""
+        query = query.strip()
+        lowered = query.lower()
+        grams = trigrams(query)
+        with self._lock:
+            exact = self._codes.get(query)
+            if exact is not None:
+                return [exact]
+            if not grams:
+                return []
+
+            common = Counter()
+            for gram in grams:
+                ids = self._postings.get(gram)
+                if ids:
+                    common.update(ids)
+
+            needed = len(grams) * min_similarity
+            candidates = []
+            for product_id, count in common.items():
+                if count < needed:
+                    continue
+                document = self._documents[product_id]
+                candidates.append((
+                    _prefix_rank(document.name, lowered),
+                    count / len(grams),
+                    count / (len(grams) + len(document.grams) - count),
+                    -len(document.name),
+                    product_id
+                ))
+        return [c[-1] for c in heapq.nlargest(limit, candidates)]
+
+    def _add(self, product_id: int, name: str, sku: Optional[str], barcode: Optional[str]):
+        for gram in self._document(product_id, name, sku, barcode).grams:
+            self._postings.setdefault(gram, set()).add(product_id)
+
+    def _document(self, product_id: int, name: str, sku: Optional[str], barcode: Optional[str]) -> _Document:
+        """Register the product's document and codes; the caller adds it to the postings"""
+        document = _Document(name.lower(), frozenset(trigrams(f"{name} {sku or ''}")),
+                             tuple(c for c in (sku, barcode) if c))
+        if sku:
+            self._codes.setdefault(sku, product_id)
+        if barcode:
+            self._codes[barcode] = product_id  # A barcode wins over an equal SKU
+        self._documents[product_id] = document
+        return document
+
+    def _remove(self, product_id: int):
+        document = self._documents.pop(product_id, None)
+        if document is None:
+            return
+        for gram in document.grams:
+            ids = self._postings[gram]
+            ids.discard(product_id)
+            if not ids:
+                del self._postings[gram]
+        for code in document.codes:
+            if self._codes.get(code) == product_id:
+                del self._codes[code]
+
+
+class ProductSearch:
+    """Ranked product search: pg_trgm GIN indexes on PostgreSQL, ProductSearchIndex elsewhere.
+
+    A query equal to a barcode or SKU returns that product alone: it is what
+    a scanner sends, and code trigrams are shared by most of the catalog, so
+    ranking it by similarity would score nearly every product.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search_ids(self, tenant_id: int, query: str, limit: int = 20) -> List[int]:
+        if self._trigram_available():
+            return self._search_trigram(tenant_id, query.strip(), limit)
+        index = search_cache.get_or_compute(tenant_id, "products", lambda: self._load_index(tenant_id))
+        return index.search(query, limit, settings.SEARCH_MIN_SIMILARITY)
+
+    def _trigram_available(self) -> bool:
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return False
+        url = str(bind.url)
+        if url not in _trigram_databases:
+            _trigram_databases[url] = self.db.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).first() is not None
+        return _trigram_databases[url]
+
+    def _search_trigram(self, tenant_id: int, query: str, limit: int) -> List[int]:
+        exact = self.db.execute(select(Product.id).where(
+            Product.tenant_id == tenant_id,
+            Product.is_active == True,
+            or_(Product.barcode == query, Product.sku == query)
+        ).order_by((Product.barcode == query).desc()).limit(1)).scalar()
+        if exact is not None:
+            return [exact]
+
+        # %> is "word similarity above the threshold" and is served by the GIN indexes of migration 018
+        self.db.execute(select(func.set_config(
+            "pg_trgm.word_similarity_threshold", str(settings.SEARCH_MIN_SIMILARITY), True
+        )))
+        lowered = query.lower()
+        name = func.lower(Product.name)
+        rows = self.db.execute(
+            select(Product.id).where(
+                Product.tenant_id == tenant_id,
+                Product.is_active == True,
+                or_(Product.name.op("%>")(query), Product.sku.op("%>")(query))
+            ).order_by(
+                case(
+                    (name.startswith(lowered, autoescape=True), 2),
+                    (name.contains(f" {lowered}", autoescape=True), 1),
+                    else_=0
+                ).desc(),
+                func.greatest(
+                    func.word_similarity(query, Product.name),
+                    func.word_similarity(query, func.coalesce(Product.sku, ""))
+                ).desc(),
+                func.similarity(query, Product.name).desc(),
+                func.length(Product.name),
+                Product.id.desc()
+            ).limit(limit)
+        )
+        return [row[0] for row in rows]
+
+    def _load_index(self, tenant_id: int) -> ProductSearchIndex:
+        return ProductSearchIndex(self.db.execute(
+            select(Product.id, Product.name, Product.sku, Product.barcode).where(
+                Product.tenant_id == tenant_id, Product.is_active == True
+            )
+        ))
@@ -1,24 +1,45 @@
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional
+from decimal import Decimal
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
 
+from app.core.cache import report_cache, catalog_cache, search_cache
 from app.models.product import Product
 from app.models.category import Category
+from app.models.tombstone import CatalogTombstone
 from app.schemas.product import ProductCreate, ProductUpdate, CategoryCreate, CategoryUpdate
+from app.services.counter_service import CounterService, CATALOG_COUNTER
+from app.services.product_search import ProductSearch
+
+
+class ScanProduct(NamedTuple):
+    id: int
+    name: str
+    sku: Optional[str]
+    barcode: Optional[str]
+    price: Decimal
+    vat_rate: Decimal
+    category_id: Optional[int]
 
 
 class ProductService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _next_change(self, tenant_id: int, count: int = 1) -> int:
+        """Reserve change_seq values for catalog writes; call right before commit, it locks the counter row"""
+        return CounterService(self.db).next_value(tenant_id, CATALOG_COUNTER, count)
+
     # Categories
     def get_categories(self, tenant_id: int) -> List[Category]:
         return self.db.query(Category).filter(Category.tenant_id == tenant_id).all()
 
     def create_category(self, tenant_id: int, data: CategoryCreate) -> Category:
         category = Category(tenant_id=tenant_id, **data.model_dump())
+        category.change_seq = self._next_change(tenant_id)
         self.db.add(category)
         self.db.commit()
+        catalog_cache.invalidate(tenant_id)
         self.db.refresh(category)
         return category
 
@@ -30,7 +51,9 @@ class ProductService:
             return None
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(category, key, value)
+        category.change_seq = self._next_change(tenant_id)
         self.db.commit()
+        catalog_cache.invalidate(tenant_id)
         self.db.refresh(category)
         return category
 
@@ -40,8 +63,18 @@ class ProductService:
         ).first()
         if not category:
             return False
+        # Its products lose their category; each gets its own change_seq so a sync page never splits a seq
+        products = self.db.query(Product).filter(
+            Product.tenant_id == tenant_id, Product.category_id == category_id
+        ).all()
+        seq = self._next_change(tenant_id, len(products) + 1) - len(products)
+        for offset, product in enumerate(products, start=1):
+            product.category_id = None
+            product.change_seq = seq + offset
+        self.db.add(CatalogTombstone(tenant_id=tenant_id, entity="category", entity_id=category_id, change_seq=seq))
         self.db.delete(category)
         self.db.commit()
+        catalog_cache.invalidate(tenant_id)  # Its products lose their category_id
         return True
 
     # Products
@@ -59,22 +92,48 @@ class ProductService:
         ).first()
 
     def search_products(self, tenant_id: int, query: str, limit: int = 20) -> List[Product]:
-        return self.db.query(Product).options(joinedload(Product.category)).filter(
+        """Active products matching `query`, best first (see ProductSearch for the ranking)"""
+        ids = ProductSearch(self.db).search_ids(tenant_id, query, limit)
+        if not ids:
+            return []
+        products = {p.id: p for p in self.db.query(Product).options(joinedload(Product.category)).filter(
             Product.tenant_id == tenant_id,
             Product.is_active == True,
-            or_(
-                Product.name.ilike(f'%{query}%'),
-                Product.sku.ilike(f'%{query}%'),
-                Product.barcode == query
-            )
-        ).limit(limit).all()
+            Product.id.in_(ids)
+        )}
+        return [products[i] for i in ids if i in products]
+
+    def find_by_code(self, tenant_id: int, code: str) -> Optional[ScanProduct]:
+        """Active product whose barcode, or failing that SKU, is `code`.
+
+        Served from a per-tenant dict loaded on first use and dropped on
+        product writes, so a scan costs a dict lookup instead of a query.
+        """
+        index = catalog_cache.get_or_compute(tenant_id, "codes", lambda: self._load_code_index(tenant_id))
+        return index.get(code)
+
+    def _load_code_index(self, tenant_id: int) -> Dict[str, ScanProduct]:
+        records = [ScanProduct(*row) for row in self.db.query(
+            Product.id, Product.name, Product.sku, Product.barcode, Product.price, Product.vat_rate, Product.category_id
+        ).filter(
+            Product.tenant_id == tenant_id,
+            Product.is_active == True,
+            or_(Product.barcode.isnot(None), Product.sku.isnot(None))
+        )]
+        index = {r.sku: r for r in records if r.sku}
+        index.update((r.barcode, r) for r in records if r.barcode)  # A barcode wins over an equal SKU
+        return index
 
     def create_product(self, tenant_id: int, data: ProductCreate) -> Product:
         product = Product(tenant_id=tenant_id, **data.model_dump())
+        product.change_seq = self._next_change(tenant_id)
         self.db.add(product)
         self.db.commit()
+        report_cache.invalidate(tenant_id)
+        catalog_cache.invalidate(tenant_id)
         self.db.refresh(product)
-        
+        self._reindex(tenant_id, product)
+
         # Ensure category is loaded for response model if category_id is present
         if product.category_id:
             self.db.query(Product).options(joinedload(Product.category)).filter(Product.id == product.id).first()
@@ -87,14 +146,28 @@ class ProductService:
             return None
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(product, key, value)
+        product.change_seq = self._next_change(tenant_id)
         self.db.commit()
+        report_cache.invalidate(tenant_id)  # Reports show product names; the dashboard stock levels
+        catalog_cache.invalidate(tenant_id)
         self.db.refresh(product)
+        self._reindex(tenant_id, product)
         return product
 
     def delete_product(self, tenant_id: int, product_id: int) -> bool:
         product = self.get_product(tenant_id, product_id)
         if not product:
             return False
-        product.is_active = False  # Soft delete
+        product.is_active = False  # Soft delete; sync reports inactive products as deleted
+        product.change_seq = self._next_change(tenant_id)
         self.db.commit()
+        report_cache.invalidate(tenant_id)
+        catalog_cache.invalidate(tenant_id)
+        search_cache.update(tenant_id, "products", lambda index: index.remove(product_id))
         return True
+
+    @staticmethod
+    def _reindex(tenant_id: int, product: Product):
+        # Read the attributes here: the update runs under the cache lock and must not hit the database
+        row = (product.id, product.name, product.sku, product.barcode, product.is_active)
+        search_cache.update(tenant_id, "products", lambda index: index.put(*row))
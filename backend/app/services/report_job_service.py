@@ -0,0 +1,81 @@
+import os
+import uuid
+from typing import Iterable, Optional
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.report_job import ReportJob
+from app.schemas.report import ReportJobCreate
+
+
+class ReportJobService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def submit(self, tenant_id: int, user_id: int, data: ReportJobCreate) -> ReportJob:
+        """Queue a report job; a worker picks it up"""
+        if data.start_date > data.end_date:
+            raise ValueError("start_date must not be after end_date")
+        self.purge_expired()
+        job = ReportJob(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            kind=data.kind,
+            params=data.model_dump_json(exclude={"kind"}),
+            status="queued"
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_job(self, tenant_id: int, job_id: int) -> Optional[ReportJob]:
+        return self.db.query(ReportJob).filter(
+            ReportJob.id == job_id, ReportJob.tenant_id == tenant_id
+        ).first()
+
+    @staticmethod
+    def result_file(job: ReportJob) -> str:
+        return os.path.join(settings.REPORT_JOB_RESULT_DIR, job.result_path)
+
+    @staticmethod
+    def write_result(job: ReportJob, chunks: Iterable[bytes]) -> str:
+        """Stream `chunks` into the job's result file and return its path relative to REPORT_JOB_RESULT_DIR"""
+        relative = os.path.join(str(job.tenant_id), f"{job.id}-{uuid.uuid4().hex}")
+        path = os.path.join(settings.REPORT_JOB_RESULT_DIR, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(path + ".part", "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(path + ".part", path)
+        except BaseException:
+            if os.path.exists(path + ".part"):
+                os.unlink(path + ".part")
+            raise
+        return relative
+
+    def purge_expired(self) -> int:
+        """Delete expired results and fail jobs whose worker disappeared"""
+        now = datetime.utcnow()
+        self.db.query(ReportJob).filter(
+            ReportJob.status == "running",
+            ReportJob.started_at < now - timedelta(minutes=settings.REPORT_JOB_TIMEOUT_MINUTES)
+        ).update({
+            "status": "failed",
+            "error": "The worker running this job stopped",
+            "finished_at": now,
+            "expires_at": now + timedelta(hours=settings.REPORT_JOB_TTL_HOURS)
+        }, synchronize_session=False)
+        expired = self.db.query(ReportJob.result_path).filter(
+            ReportJob.expires_at < now, ReportJob.result_path.isnot(None)
+        ).all()
+        deleted = self.db.query(ReportJob).filter(ReportJob.expires_at < now).delete(synchronize_session=False)
+        self.db.commit()
+        for row in expired:
+            try:
+                os.unlink(os.path.join(settings.REPORT_JOB_RESULT_DIR, row.result_path))
+            except FileNotFoundError:
+                pass
+        return deleted
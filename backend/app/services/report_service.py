@@ -1,62 +1,188 @@
-from typing import List
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from decimal import Decimal
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, case, cast, extract, null, select, tuple_, Float, Numeric
 
-from app.models.sale import Sale, SaleItem
-from app.schemas.report import DailySummary, ProductSalesReport
+from app.config import settings
+from app.core.cache import report_cache
+from app.models.tenant import Tenant
+from app.models.product import Product
+from app.models.category import Category
+from app.models.user import User
+from app.models.rollup import DailySalesRollup, HourlySalesRollup, ProductDailySales, CashierDailySales
+from app.schemas.report import (
+    DailySummary, ProductSalesReport, CategorySalesReport, SalesHeatmap, AbcItem, AbcReport, MarginItem, MarginReport
+)
+
+
+def _check_range(start_date: date, end_date: date, max_days: Optional[int] = settings.REPORT_MAX_RANGE_DAYS):
+    if start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+    if max_days and (end_date - start_date).days + 1 > max_days:
+        raise ValueError(f"Date range is limited to {max_days} days; submit a report job for longer ranges")
+
+
+def _ceil_hour(value: datetime) -> datetime:
+    floor = value.replace(minute=0, second=0, microsecond=0)
+    return floor if floor == value else floor + timedelta(hours=1)
+
+
+def _offset_segments(tz: ZoneInfo, utc_start: datetime, utc_end: datetime) -> List[Tuple[datetime, int]]:
+    """(UTC start, offset in minutes) for each stretch of [utc_start, utc_end) with a constant offset"""
+    def offset(moment: datetime) -> int:
+        return int(moment.astimezone(tz).utcoffset().total_seconds() // 60)
+
+    segments = [(utc_start, offset(utc_start))]
+    day = utc_start
+    while day < utc_end:
+        next_day = min(day + timedelta(days=1), utc_end)
+        if offset(next_day) != segments[-1][1]:
+            hour = day + timedelta(hours=1)
+            while offset(hour) == segments[-1][1]:
+                hour += timedelta(hours=1)
+            segments.append((hour, offset(hour)))
+        day = next_day
+    return segments
+
+
+def _abc_amount(metric: str):
+    if metric == "margin":
+        return ProductDailySales.revenue - ProductDailySales.vat - ProductDailySales.cost
+    return ProductDailySales.revenue
+
+
+def _margin_percent(net: Decimal, margin: Decimal) -> Optional[float]:
+    return round(float(margin / net * 100), 2) if net else None
+
+
+class _AbcRanking(NamedTuple):
+    ids: List[int]
+    shares: List[float]
+    classes: List[str]
+    counts: Dict[str, int]
+    total: Decimal
 
 
 class ReportService:
+    """Sales reports served from the rollup tables.
+
+    Public report methods go through report_cache; sale writes invalidate
+    the tenant's entries.
+    """
+
     def __init__(self, db: Session):
         self.db = db
 
     def get_daily_summary(self, tenant_id: int, report_date: date) -> DailySummary:
-        start = datetime.combine(report_date, datetime.min.time())
-        end = datetime.combine(report_date, datetime.max.time())
+        return report_cache.get_or_compute(
+            tenant_id, ("daily", report_date),
+            lambda: self.get_daily_breakdown(tenant_id, report_date, report_date)[0]
+        )
 
-        sales = self.db.query(Sale).filter(
-            Sale.tenant_id == tenant_id,
-            Sale.status == "completed",
-            Sale.created_at.between(start, end)
-        ).all()
+    def get_daily_breakdown(
+        self, tenant_id: int, start_date: date, end_date: date,
+        max_days: Optional[int] = settings.REPORT_MAX_RANGE_DAYS
+    ) -> List[DailySummary]:
+        """One summary per day of the range from a single grouped query; empty days are zero-filled"""
+        _check_range(start_date, end_date, max_days)
+
+        zero = Decimal("0")
+        rows = self.db.query(
+            DailySalesRollup.business_date,
+            func.sum(DailySalesRollup.sale_count).label("total_sales"),
+            func.sum(DailySalesRollup.revenue).label("total_revenue"),
+            func.sum(DailySalesRollup.vat).label("total_vat"),
+            func.sum(case((DailySalesRollup.payment_method == "cash", DailySalesRollup.revenue), else_=0)).label("cash"),
+            func.sum(case((DailySalesRollup.payment_method == "card", DailySalesRollup.revenue), else_=0)).label("card")
+        ).filter(
+            DailySalesRollup.tenant_id == tenant_id,
+            DailySalesRollup.business_date.between(start_date, end_date)
+        ).group_by(DailySalesRollup.business_date).all()
+        by_date = {r.business_date: r for r in rows}
 
-        total_revenue = sum(s.total for s in sales) or Decimal("0")
-        total_vat = sum(s.vat_amount for s in sales) or Decimal("0")
-        cash_sales = sum(s.total for s in sales if s.payment_method == "cash") or Decimal("0")
-        card_sales = sum(s.total for s in sales if s.payment_method == "card") or Decimal("0")
-
-        return DailySummary(
-            date=report_date,
-            total_sales=len(sales),
-            total_revenue=total_revenue,
-            total_vat=total_vat,
-            cash_sales=cash_sales,
-            card_sales=card_sales
+        daily = []
+        current = start_date
+        while current <= end_date:
+            r = by_date.get(current)
+            daily.append(DailySummary(
+                date=current,
+                total_sales=r.total_sales if r else 0,
+                total_revenue=r.total_revenue if r else zero,
+                total_vat=r.total_vat if r else zero,
+                cash_sales=r.cash if r else zero,
+                card_sales=r.card if r else zero
+            ))
+            current += timedelta(days=1)
+        return daily
+
+    def _product_totals(self, tenant_id: int, start_date: date, end_date: date):
+        quantity = func.sum(ProductDailySales.quantity).label("qty")
+        revenue = func.sum(ProductDailySales.revenue).label("revenue")
+        query = self.db.query(quantity, revenue).select_from(ProductDailySales).join(
+            Product, Product.id == ProductDailySales.product_id
+        ).filter(
+            ProductDailySales.tenant_id == tenant_id,
+            Product.tenant_id == tenant_id,
+            ProductDailySales.business_date.between(start_date, end_date)
+        ).having(func.sum(ProductDailySales.quantity) > 0)
+        return query, quantity, revenue
+
+    def get_sales_by_product(
+        self, tenant_id: int, start_date: date, end_date: date,
+        order_by: str = "revenue", skip: int = 0, limit: int = 20
+    ) -> List[ProductSalesReport]:
+        """Products ranked by revenue or quantity, read from the product rollup"""
+        return report_cache.get_or_compute(
+            tenant_id, ("by-product", start_date, end_date, order_by, skip, limit),
+            lambda: self._sales_by_product(tenant_id, start_date, end_date, order_by, skip, limit)
         )
 
-    def get_sales_by_product(self, tenant_id: int, start_date: date, end_date: date) -> List[ProductSalesReport]:
-        start = datetime.combine(start_date, datetime.min.time())
-        end = datetime.combine(end_date, datetime.max.time())
-
-        results = self.db.query(
-            SaleItem.product_id,
-            SaleItem.product_name,
-            func.sum(SaleItem.quantity).label("qty"),
-            func.sum(SaleItem.total).label("revenue")
-        ).join(Sale).filter(
-            Sale.tenant_id == tenant_id,
-            Sale.status == "completed",
-            Sale.created_at.between(start, end)
-        ).group_by(SaleItem.product_id, SaleItem.product_name).order_by(
-            func.sum(SaleItem.total).desc()
-        ).limit(20).all()
+    def _sales_by_product(
+        self, tenant_id: int, start_date: date, end_date: date, order_by: str, skip: int, limit: int
+    ) -> List[ProductSalesReport]:
+        query, quantity, revenue = self._product_totals(tenant_id, start_date, end_date)
+        results = query.add_columns(ProductDailySales.product_id, Product.name).group_by(
+            ProductDailySales.product_id, Product.name
+        ).order_by(
+            (quantity if order_by == "quantity" else revenue).desc(), ProductDailySales.product_id
+        ).offset(skip).limit(limit).all()
 
         return [
             ProductSalesReport(
-                product_id=r.product_id or 0,
-                product_name=r.product_name,
+                product_id=r.product_id,
+                product_name=r.name,
+                quantity_sold=r.qty or 0,
+                revenue=r.revenue or Decimal("0")
+            )
+            for r in results
+        ]
+
+    def get_sales_by_category(
+        self, tenant_id: int, start_date: date, end_date: date,
+        order_by: str = "revenue", skip: int = 0, limit: int = 20
+    ) -> List[CategorySalesReport]:
+        """Product rollup summed per product's current category"""
+        return report_cache.get_or_compute(
+            tenant_id, ("by-category", start_date, end_date, order_by, skip, limit),
+            lambda: self._sales_by_category(tenant_id, start_date, end_date, order_by, skip, limit)
+        )
+
+    def _sales_by_category(
+        self, tenant_id: int, start_date: date, end_date: date, order_by: str, skip: int, limit: int
+    ) -> List[CategorySalesReport]:
+        query, quantity, revenue = self._product_totals(tenant_id, start_date, end_date)
+        results = query.add_columns(Product.category_id, Category.name).outerjoin(
+            Category, Category.id == Product.category_id
+        ).group_by(Product.category_id, Category.name).order_by(
+            (quantity if order_by == "quantity" else revenue).desc(), Product.category_id
+        ).offset(skip).limit(limit).all()
+
+        return [
+            CategorySalesReport(
+                category_id=r.category_id,
+                category_name=r.name,
                 quantity_sold=r.qty or 0,
                 revenue=r.revenue or Decimal("0")
             )
@@ -64,20 +190,257 @@ class ReportService:
         ]
 
     def get_date_range_report(self, tenant_id: int, start_date: date, end_date: date) -> dict:
-        daily = []
-        current = start_date
-        while current <= end_date:
-            daily.append(self.get_daily_summary(tenant_id, current))
-            current += timedelta(days=1)
+        return report_cache.get_or_compute(
+            tenant_id, ("range", start_date, end_date),
+            lambda: self.compute_date_range_report(tenant_id, start_date, end_date)
+        )
 
+    def compute_date_range_report(
+        self, tenant_id: int, start_date: date, end_date: date,
+        max_days: Optional[int] = settings.REPORT_MAX_RANGE_DAYS
+    ) -> dict:
+        """Uncached range report; report jobs call it with max_days=None"""
+        daily = self.get_daily_breakdown(tenant_id, start_date, end_date, max_days)
         top_products = self.get_sales_by_product(tenant_id, start_date, end_date)
 
         return {
             "start_date": start_date,
             "end_date": end_date,
             "total_sales": sum(d.total_sales for d in daily),
-            "total_revenue": sum(d.total_revenue for d in daily),
-            "total_vat": sum(d.total_vat for d in daily),
+            "total_revenue": sum((d.total_revenue for d in daily), Decimal("0")),
+            "total_vat": sum((d.total_vat for d in daily), Decimal("0")),
             "daily_breakdown": daily,
             "top_products": top_products
         }
+
+    def get_heatmap(self, tenant_id: int, start_date: date, end_date: date) -> SalesHeatmap:
+        _check_range(start_date, end_date)
+        return report_cache.get_or_compute(
+            tenant_id, ("heatmap", start_date, end_date),
+            lambda: self._heatmap(tenant_id, start_date, end_date)
+        )
+
+    def _heatmap(self, tenant_id: int, start_date: date, end_date: date) -> SalesHeatmap:
+        """Weekday x hour matrix in the tenant's local time, bucketed in SQL from the hourly rollup.
+
+        The range is split where the tenant's UTC offset changes (DST). One
+        query groups the UTC hourly rows by offset segment, UTC weekday and
+        hour, so at most 168 rows per segment come back; each is then shifted
+        by its segment's offset. In zones with a non-whole-hour offset a UTC
+        hour counts towards the local hour it starts in.
+        """
+        tz_name = self.db.query(Tenant.timezone).filter(Tenant.id == tenant_id).scalar() or "UTC"
+        tz = ZoneInfo(tz_name)
+        utc_start = _ceil_hour(datetime.combine(start_date, time.min, tz).astimezone(timezone.utc))
+        utc_end = _ceil_hour(datetime.combine(end_date + timedelta(days=1), time.min, tz).astimezone(timezone.utc))
+        segments = _offset_segments(tz, utc_start, utc_end)
+
+        bucket = tuple_(HourlySalesRollup.business_date, HourlySalesRollup.hour)
+        weekday = extract("dow", HourlySalesRollup.business_date)  # Sunday = 0
+        group = [weekday, HourlySalesRollup.hour]
+        if len(segments) > 1:
+            group.append(case(
+                *[(bucket < (b.date(), b.hour), i) for i, (b, _) in enumerate(segments[1:])],
+                else_=len(segments) - 1
+            ))
+
+        rows = self.db.query(
+            *group,
+            func.sum(HourlySalesRollup.sale_count),
+            func.sum(HourlySalesRollup.revenue)
+        ).filter(
+            HourlySalesRollup.tenant_id == tenant_id,
+            bucket >= (utc_start.date(), utc_start.hour),
+            bucket < (utc_end.date(), utc_end.hour)
+        ).group_by(*group).all()
+
+        transactions = [[0] * 24 for _ in range(7)]
+        revenue = [[Decimal("0")] * 24 for _ in range(7)]
+        for r in rows:
+            utc_weekday, utc_hour, sale_count, amount = int(r[0]), int(r[1]), r[-2], r[-1]
+            segment = int(r[2]) if len(group) > 2 else 0
+            day_shift, minute = divmod(utc_hour * 60 + segments[segment][1], 24 * 60)
+            local_weekday = (utc_weekday - 1 + day_shift) % 7  # Monday = 0
+            transactions[local_weekday][minute // 60] += sale_count
+            revenue[local_weekday][minute // 60] += Decimal(amount)
+
+        return SalesHeatmap(
+            start_date=start_date,
+            end_date=end_date,
+            timezone=tz_name,
+            transactions=transactions,
+            revenue=revenue
+        )
+
+    def get_abc_report(
+        self, tenant_id: int, start_date: date, end_date: date, metric: str = "revenue",
+        a_threshold: float = 0.8, b_threshold: float = 0.95, skip: int = 0, limit: int = 100
+    ) -> AbcReport:
+        """ABC classification of the active catalog.
+
+        The ranking of the whole catalog is cached per tenant, window and
+        thresholds; names and exact values are loaded for the requested page only.
+        """
+        _check_range(start_date, end_date)
+        if not 0 < a_threshold < b_threshold <= 1:
+            raise ValueError("Thresholds must satisfy 0 < a_threshold < b_threshold <= 1")
+        ranking = report_cache.get_or_compute(
+            tenant_id, ("abc", start_date, end_date, metric, a_threshold, b_threshold),
+            lambda: self._abc_ranking(tenant_id, start_date, end_date, metric, a_threshold, b_threshold)
+        )
+
+        page = range(skip, min(skip + limit, len(ranking.ids)))
+        page_ids = [ranking.ids[i] for i in page]
+        names = dict(self.db.query(Product.id, Product.name).filter(Product.id.in_(page_ids)).all())
+        values = dict(self.db.query(ProductDailySales.product_id, func.sum(_abc_amount(metric))).filter(
+            ProductDailySales.tenant_id == tenant_id,
+            ProductDailySales.business_date.between(start_date, end_date),
+            ProductDailySales.product_id.in_(page_ids)
+        ).group_by(ProductDailySales.product_id).all())
+
+        return AbcReport(
+            start_date=start_date,
+            end_date=end_date,
+            metric=metric,
+            a_threshold=a_threshold,
+            b_threshold=b_threshold,
+            total_value=ranking.total,
+            total_products=len(ranking.ids),
+            class_counts=ranking.counts,
+            items=[
+                AbcItem(
+                    product_id=ranking.ids[i],
+                    product_name=names.get(ranking.ids[i], ""),
+                    value=values.get(ranking.ids[i]) or Decimal("0"),
+                    cumulative_share=ranking.shares[i],
+                    abc_class=ranking.classes[i]
+                )
+                for i in page
+            ]
+        )
+
+    def _abc_ranking(
+        self, tenant_id: int, start_date: date, end_date: date, metric: str, a_threshold: float, b_threshold: float
+    ) -> "_AbcRanking":
+        """Rank, accumulate and classify the whole catalog in one query with window functions.
+
+        A product's class depends on the share of the products ranked above
+        it, so the top product is always A. Only ids, shares and classes
+        come back, which keeps 100k-product catalogs cheap to fetch and cache.
+        """
+        sold = select(
+            ProductDailySales.product_id, func.sum(_abc_amount(metric)).label("value")
+        ).where(
+            ProductDailySales.tenant_id == tenant_id,
+            ProductDailySales.business_date.between(start_date, end_date)
+        ).group_by(ProductDailySales.product_id).subquery()
+        totals = select(
+            Product.id, func.coalesce(sold.c.value, 0).label("value")
+        ).select_from(Product).outerjoin(sold, sold.c.product_id == Product.id).where(
+            Product.tenant_id == tenant_id,
+            Product.is_active == True
+        ).subquery()
+
+        rank = (totals.c.value.desc(), totals.c.id)
+        running = func.sum(totals.c.value).over(order_by=rank)
+        grand = func.sum(totals.c.value).over()
+        before = running - totals.c.value
+        abc_class = case(
+            (grand <= 0, "C"),
+            (before < grand * a_threshold, "A"),
+            (before < grand * b_threshold, "B"),
+            else_="C"
+        )
+        share = case((grand > 0, cast(running, Float) / cast(grand, Float)), else_=0.0)
+        rows = self.db.execute(select(
+            totals.c.id, share, abc_class, cast(grand, Numeric(14, 2))
+        ).order_by(*rank)).all()
+
+        counts = {"A": 0, "B": 0, "C": 0}
+        for row in rows:
+            counts[row[2]] += 1
+        return _AbcRanking(
+            ids=[row[0] for row in rows],
+            shares=[row[1] for row in rows],
+            classes=[row[2] for row in rows],
+            counts=counts,
+            total=rows[0][3] if rows else Decimal("0")
+        )
+
+    def get_margin_report(
+        self, tenant_id: int, start_date: date, end_date: date, group_by: str = "product",
+        skip: int = 0, limit: int = 100
+    ) -> MarginReport:
+        """Gross margin per product, category, day or cashier from the cost snapshots in the rollups.
+
+        Margin is line revenue without VAT minus cost; sale-level discounts are
+        not spread over lines and are not deducted.
+        """
+        _check_range(start_date, end_date)
+        return report_cache.get_or_compute(
+            tenant_id, ("margin", start_date, end_date, group_by, skip, limit),
+            lambda: self._margin_report(tenant_id, start_date, end_date, group_by, skip, limit)
+        )
+
+    def _margin_report(
+        self, tenant_id: int, start_date: date, end_date: date, group_by: str, skip: int, limit: int
+    ) -> MarginReport:
+        if group_by in ("day", "cashier"):
+            # The cashier rollup also holds lines whose product was removed
+            source = CashierDailySales
+            stmt = select().select_from(CashierDailySales)
+            if group_by == "day":
+                key, name = CashierDailySales.business_date, null()
+            else:
+                stmt = stmt.join(User, User.id == CashierDailySales.user_id).where(User.tenant_id == tenant_id)
+                key, name = CashierDailySales.user_id, func.coalesce(User.full_name, User.email)
+        else:
+            source = ProductDailySales
+            stmt = select().select_from(ProductDailySales).join(
+                Product, Product.id == ProductDailySales.product_id
+            ).where(Product.tenant_id == tenant_id)
+            if group_by == "category":
+                stmt = stmt.outerjoin(Category, Category.id == Product.category_id)
+                key, name = Product.category_id, Category.name
+            else:
+                key, name = ProductDailySales.product_id, Product.name
+
+        net = func.sum(source.revenue - source.vat).label("net")
+        cost = func.sum(source.cost).label("cost")
+        grouped = stmt.add_columns(key.label("key"), name.label("name"), net, cost).where(
+            source.tenant_id == tenant_id,
+            source.business_date.between(start_date, end_date)
+        ).group_by(*([key] if group_by == "day" else [key, name])).subquery()
+
+        total_items, total_net, total_cost = self.db.execute(select(
+            func.count(), func.coalesce(func.sum(grouped.c.net), 0), func.coalesce(func.sum(grouped.c.cost), 0)
+        )).one()
+        margin = grouped.c.net - grouped.c.cost
+        order = (grouped.c.key,) if group_by == "day" else (margin.desc(), grouped.c.key)
+        rows = self.db.execute(
+            select(grouped.c.key, grouped.c.name, grouped.c.net, grouped.c.cost).order_by(*order).offset(skip).limit(limit)
+        ).all()
+
+        total_net, total_cost = Decimal(total_net), Decimal(total_cost)
+        items = []
+        for r in rows:
+            row_net, row_cost = Decimal(r.net or 0), Decimal(r.cost or 0)
+            items.append(MarginItem(
+                key=str(r.key) if r.key is not None else None,
+                name=r.name,
+                net_revenue=row_net,
+                cost=row_cost,
+                gross_margin=row_net - row_cost,
+                margin_percent=_margin_percent(row_net, row_net - row_cost)
+            ))
+        return MarginReport(
+            start_date=start_date,
+            end_date=end_date,
+            group_by=group_by,
+            net_revenue=total_net,
+            cost=total_cost,
+            gross_margin=total_net - total_cost,
+            margin_percent=_margin_percent(total_net, total_net - total_cost),
+            total_items=total_items,
+            items=items
+        )
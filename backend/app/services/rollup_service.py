@@ -0,0 +1,315 @@
+from typing import List, Optional
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, insert, extract
+
+from app.core.cache import report_cache
+from app.database import dialect_insert
+from app.models.sale import Sale, SaleItem
+from app.models.rollup import DailySalesRollup, HourlySalesRollup, ProductDailySales, CashierDailySales
+
+
+class RollupService:
+    """Keeps the report aggregate tables in step with the sales tables.
+
+    apply_sales is called in the same transaction as the sale write or
+    status change; rebuild and verify recompute from the raw tables.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply_sales(self, tenant_id: int, sales: List[Sale], lines: List[dict], sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) completed sales from the rollups.
+
+        `lines` are the sale lines of `sales` as dicts with business_date,
+        user_id, product_id, quantity, revenue, vat and cost.
+        """
+        daily = defaultdict(lambda: [0, Decimal("0"), Decimal("0")])
+        hourly = defaultdict(lambda: [0, Decimal("0")])
+        cashiers = defaultdict(lambda: [0, Decimal("0"), Decimal("0"), Decimal("0")])
+        for sale in sales:
+            row = daily[(sale.created_at.date(), sale.payment_method or "")]
+            row[0] += sign
+            row[1] += sign * sale.total
+            row[2] += sign * sale.vat_amount
+            row = hourly[(sale.created_at.date(), sale.created_at.hour)]
+            row[0] += sign
+            row[1] += sign * sale.total
+            cashiers[(sale.created_at.date(), sale.user_id)][0] += sign
+
+        products = defaultdict(lambda: [0, Decimal("0"), Decimal("0"), Decimal("0")])
+        for line in lines:
+            row = cashiers[(line["business_date"], line["user_id"])]
+            row[1] += sign * line["revenue"]
+            row[2] += sign * line["vat"]
+            row[3] += sign * line["cost"]
+            if line["product_id"] is None:
+                continue
+            row = products[(line["business_date"], line["product_id"])]
+            row[0] += sign * line["quantity"]
+            row[1] += sign * line["revenue"]
+            row[2] += sign * line["vat"]
+            row[3] += sign * line["cost"]
+
+        insert = dialect_insert(self.db)
+        if daily:
+            stmt = insert(DailySalesRollup).values([
+                {
+                    "tenant_id": tenant_id,
+                    "business_date": business_date,
+                    "payment_method": method,
+                    "sale_count": count,
+                    "revenue": revenue,
+                    "vat": vat
+                }
+                for (business_date, method), (count, revenue, vat) in sorted(daily.items())
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DailySalesRollup.tenant_id, DailySalesRollup.business_date, DailySalesRollup.payment_method],
+                set_={
+                    "sale_count": DailySalesRollup.sale_count + stmt.excluded.sale_count,
+                    "revenue": DailySalesRollup.revenue + stmt.excluded.revenue,
+                    "vat": DailySalesRollup.vat + stmt.excluded.vat
+                }
+            )
+            self.db.execute(stmt)
+
+        if hourly:
+            stmt = insert(HourlySalesRollup).values([
+                {
+                    "tenant_id": tenant_id,
+                    "business_date": business_date,
+                    "hour": hour,
+                    "sale_count": count,
+                    "revenue": revenue
+                }
+                for (business_date, hour), (count, revenue) in sorted(hourly.items())
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[HourlySalesRollup.tenant_id, HourlySalesRollup.business_date, HourlySalesRollup.hour],
+                set_={
+                    "sale_count": HourlySalesRollup.sale_count + stmt.excluded.sale_count,
+                    "revenue": HourlySalesRollup.revenue + stmt.excluded.revenue
+                }
+            )
+            self.db.execute(stmt)
+
+        if products:
+            stmt = insert(ProductDailySales).values([
+                {
+                    "tenant_id": tenant_id,
+                    "business_date": business_date,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "revenue": revenue,
+                    "vat": vat,
+                    "cost": cost
+                }
+                for (business_date, product_id), (quantity, revenue, vat, cost) in sorted(products.items())
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProductDailySales.tenant_id, ProductDailySales.business_date, ProductDailySales.product_id],
+                set_={
+                    "quantity": ProductDailySales.quantity + stmt.excluded.quantity,
+                    "revenue": ProductDailySales.revenue + stmt.excluded.revenue,
+                    "vat": ProductDailySales.vat + stmt.excluded.vat,
+                    "cost": ProductDailySales.cost + stmt.excluded.cost
+                }
+            )
+            self.db.execute(stmt)
+
+        if cashiers:
+            stmt = insert(CashierDailySales).values([
+                {
+                    "tenant_id": tenant_id,
+                    "business_date": business_date,
+                    "user_id": user_id,
+                    "sale_count": count,
+                    "revenue": revenue,
+                    "vat": vat,
+                    "cost": cost
+                }
+                for (business_date, user_id), (count, revenue, vat, cost) in sorted(cashiers.items())
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CashierDailySales.tenant_id, CashierDailySales.business_date, CashierDailySales.user_id],
+                set_={
+                    "sale_count": CashierDailySales.sale_count + stmt.excluded.sale_count,
+                    "revenue": CashierDailySales.revenue + stmt.excluded.revenue,
+                    "vat": CashierDailySales.vat + stmt.excluded.vat,
+                    "cost": CashierDailySales.cost + stmt.excluded.cost
+                }
+            )
+            self.db.execute(stmt)
+
+    def _daily_from_sales(self, tenant_id: int):
+        return select(
+            Sale.tenant_id,
+            func.date(Sale.created_at).label("business_date"),
+            func.coalesce(Sale.payment_method, "").label("payment_method"),
+            func.count(Sale.id).label("sale_count"),
+            func.sum(Sale.total).label("revenue"),
+            func.sum(Sale.vat_amount).label("vat")
+        ).where(
+            Sale.tenant_id == tenant_id,
+            Sale.status == "completed"
+        ).group_by(Sale.tenant_id, func.date(Sale.created_at), func.coalesce(Sale.payment_method, ""))
+
+    def _hourly_from_sales(self, tenant_id: int):
+        return select(
+            Sale.tenant_id,
+            func.date(Sale.created_at).label("business_date"),
+            extract("hour", Sale.created_at).label("hour"),
+            func.count(Sale.id).label("sale_count"),
+            func.sum(Sale.total).label("revenue")
+        ).where(
+            Sale.tenant_id == tenant_id,
+            Sale.status == "completed"
+        ).group_by(Sale.tenant_id, func.date(Sale.created_at), extract("hour", Sale.created_at))
+
+    def _products_from_sales(self, tenant_id: int):
+        return select(
+            Sale.tenant_id,
+            func.date(Sale.created_at).label("business_date"),
+            SaleItem.product_id,
+            func.sum(SaleItem.quantity).label("quantity"),
+            func.sum(SaleItem.total).label("revenue"),
+            func.sum(SaleItem.vat_amount).label("vat"),
+            func.sum(_line_cost()).label("cost")
+        ).select_from(SaleItem).join(Sale, Sale.id == SaleItem.sale_id).where(
+            Sale.tenant_id == tenant_id,
+            Sale.status == "completed",
+            SaleItem.product_id.isnot(None)
+        ).group_by(Sale.tenant_id, func.date(Sale.created_at), SaleItem.product_id)
+
+    def _cashiers_from_sales(self, tenant_id: int):
+        lines = select(
+            SaleItem.sale_id,
+            func.sum(SaleItem.total).label("revenue"),
+            func.sum(SaleItem.vat_amount).label("vat"),
+            func.sum(_line_cost()).label("cost")
+        ).join(Sale, Sale.id == SaleItem.sale_id).where(
+            Sale.tenant_id == tenant_id,
+            Sale.status == "completed"
+        ).group_by(SaleItem.sale_id).subquery()
+        return select(
+            Sale.tenant_id,
+            func.date(Sale.created_at).label("business_date"),
+            Sale.user_id,
+            func.count(Sale.id).label("sale_count"),
+            func.coalesce(func.sum(lines.c.revenue), 0).label("revenue"),
+            func.coalesce(func.sum(lines.c.vat), 0).label("vat"),
+            func.coalesce(func.sum(lines.c.cost), 0).label("cost")
+        ).select_from(Sale).outerjoin(lines, lines.c.sale_id == Sale.id).where(
+            Sale.tenant_id == tenant_id,
+            Sale.status == "completed"
+        ).group_by(Sale.tenant_id, func.date(Sale.created_at), Sale.user_id)
+
+    def rebuild(self, tenant_id: int):
+        """Recompute every rollup row of a tenant from its sales"""
+        self.db.query(DailySalesRollup).filter(DailySalesRollup.tenant_id == tenant_id).delete()
+        self.db.query(HourlySalesRollup).filter(HourlySalesRollup.tenant_id == tenant_id).delete()
+        self.db.query(ProductDailySales).filter(ProductDailySales.tenant_id == tenant_id).delete()
+        self.db.query(CashierDailySales).filter(CashierDailySales.tenant_id == tenant_id).delete()
+        self.db.execute(insert(DailySalesRollup).from_select(
+            ["tenant_id", "business_date", "payment_method", "sale_count", "revenue", "vat"],
+            self._daily_from_sales(tenant_id)
+        ))
+        self.db.execute(insert(HourlySalesRollup).from_select(
+            ["tenant_id", "business_date", "hour", "sale_count", "revenue"],
+            self._hourly_from_sales(tenant_id)
+        ))
+        self.db.execute(insert(ProductDailySales).from_select(
+            ["tenant_id", "business_date", "product_id", "quantity", "revenue", "vat", "cost"],
+            self._products_from_sales(tenant_id)
+        ))
+        self.db.execute(insert(CashierDailySales).from_select(
+            ["tenant_id", "business_date", "user_id", "sale_count", "revenue", "vat", "cost"],
+            self._cashiers_from_sales(tenant_id)
+        ))
+        self.db.commit()
+        report_cache.invalidate(tenant_id)
+
+    def verify(self, tenant_id: int) -> List[str]:
+        """Compare the rollups with the raw tables and describe every difference"""
+        problems = _diff(
+            "daily_sales_rollup",
+            {
+                (str(r.business_date), r.payment_method or "-"): (r.sale_count, r.revenue, r.vat)
+                for r in self.db.execute(self._daily_from_sales(tenant_id))
+            },
+            {
+                (str(r.business_date), r.payment_method or "-"): (r.sale_count, r.revenue, r.vat)
+                for r in self.db.query(DailySalesRollup).filter(
+                    DailySalesRollup.tenant_id == tenant_id,
+                    DailySalesRollup.sale_count != 0
+                )
+            }
+        )
+        problems += _diff(
+            "hourly_sales_rollup",
+            {
+                (str(r.business_date), int(r.hour)): (r.sale_count, r.revenue, 0)
+                for r in self.db.execute(self._hourly_from_sales(tenant_id))
+            },
+            {
+                (str(r.business_date), r.hour): (r.sale_count, r.revenue, 0)
+                for r in self.db.query(HourlySalesRollup).filter(
+                    HourlySalesRollup.tenant_id == tenant_id,
+                    HourlySalesRollup.sale_count != 0
+                )
+            }
+        )
+        problems += _diff(
+            "product_daily_sales",
+            {
+                (str(r.business_date), r.product_id): (r.quantity, r.revenue, r.vat, r.cost)
+                for r in self.db.execute(self._products_from_sales(tenant_id))
+            },
+            {
+                (str(r.business_date), r.product_id): (r.quantity, r.revenue, r.vat, r.cost)
+                for r in self.db.query(ProductDailySales).filter(
+                    ProductDailySales.tenant_id == tenant_id,
+                    ProductDailySales.quantity != 0
+                )
+            }
+        )
+        problems += _diff(
+            "cashier_daily_sales",
+            {
+                (str(r.business_date), r.user_id): (r.sale_count, r.revenue, r.vat, r.cost)
+                for r in self.db.execute(self._cashiers_from_sales(tenant_id))
+            },
+            {
+                (str(r.business_date), r.user_id): (r.sale_count, r.revenue, r.vat, r.cost)
+                for r in self.db.query(CashierDailySales).filter(
+                    CashierDailySales.tenant_id == tenant_id,
+                    CashierDailySales.sale_count != 0
+                )
+            }
+        )
+        return problems
+
+
+def _line_cost():
+    # Lines of products without a cost price count as zero cost
+    return SaleItem.quantity * func.coalesce(SaleItem.unit_cost, 0)
+
+
+def _diff(table: str, expected: dict, actual: dict) -> List[str]:
+    problems = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        want, got = expected.get(key), actual.get(key)
+        width = len(want or got)
+        want, got = _normalise(want, width), _normalise(got, width)
+        if want != got:
+            problems.append(f"{table} {key[0]} {key[1]}: expected {want}, found {got}")
+    return problems
+
+
+def _normalise(row: Optional[tuple], width: int = 3) -> tuple:
+    """(count, amounts...) with every amount rounded to cents; a missing row is all zeros"""
+    count, *amounts = row if row is not None else (0,) * width
+    return (count, *(Decimal(amount or 0).quantize(Decimal("0.01")) for amount in amounts))
@@ -1,119 +1,422 @@
-from typing import List, Optional
-from decimal import Decimal
-from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import base64
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import datetime, time, timedelta, timezone
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import insert, select, func, tuple_
+from sqlalchemy.exc import IntegrityError
 
+from app.core.cache import report_cache
 from app.models.sale import Sale, SaleItem
 from app.models.product import Product
-from app.models.stock_movement import StockMovement
-from app.schemas.sale import SaleCreate
+from app.schemas.sale import SaleCreate, OfflineSaleCreate, SaleBatchResult, SaleFilters
+from app.services.stock_service import StockService
+from app.services.counter_service import CounterService
+from app.services.settings_service import SettingsService
+from app.services.outbox_service import OutboxService
+from app.services.rollup_service import RollupService
+
+
+CENT = Decimal("0.01")
+
+
+def _to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalise client timestamps to naive UTC, as stored in created_at"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(created_at: datetime, sale_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{sale_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, sale_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(sale_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
 
 
 class SaleService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _generate_sale_number(self, tenant_id: int) -> str:
-        today = datetime.utcnow().strftime("%Y%m%d")
-        count = self.db.query(Sale).filter(
-            Sale.tenant_id == tenant_id,
-            func.date(Sale.created_at) == func.date(datetime.utcnow())
-        ).count()
-        return f"INV-{today}-{count + 1:04d}"
+    def _generate_sale_numbers(self, tenant_id: int, created: List[datetime]) -> List[str]:
+        # One counter allocation per business day, however many sales it covers
+        per_day = defaultdict(list)
+        for index, created_at in enumerate(created):
+            per_day[created_at.strftime("%Y%m%d")].append(index)
 
-    def create_sale(self, tenant_id: int, user_id: int, data: SaleCreate) -> Sale:
+        numbers = [None] * len(created)
+        counters = CounterService(self.db)
+        for day, indexes in per_day.items():
+            last = counters.next_value(tenant_id, f"sale_number:{day}", len(indexes))
+            for offset, index in enumerate(indexes):
+                numbers[index] = f"INV-{day}-{last - len(indexes) + offset + 1:04d}"
+        return numbers
+
+    def _load_products(self, tenant_id: int, product_ids: List[int]) -> Dict[int, Product]:
+        # One IN (...) query for the whole basket. Rows are locked in primary key
+        # order so two tills selling overlapping baskets cannot deadlock.
+        products = self.db.query(Product).filter(
+            Product.id.in_(sorted(set(product_ids))),
+            Product.tenant_id == tenant_id
+        ).order_by(Product.id).with_for_update().all()
+        return {p.id: p for p in products}
+
+    def _price(self, data: SaleCreate, products: Dict[int, Product]) -> dict:
         subtotal = Decimal("0")
         vat_total = Decimal("0")
-        sale_items = []
+        lines = []
+        sold = defaultdict(int)
 
-        # Process items
         for item_data in data.items:
-            product = self.db.query(Product).filter(
-                Product.id == item_data.product_id,
-                Product.tenant_id == tenant_id
-            ).first()
+            product = products.get(item_data.product_id)
             if not product:
                 raise ValueError(f"Product {item_data.product_id} not found")
 
             item_subtotal = product.price * item_data.quantity - item_data.discount_amount
-            item_vat = item_subtotal * product.vat_rate / Decimal("100")
+            item_subtotal = item_subtotal.quantize(CENT, ROUND_HALF_UP)
+            # Rounded per line, so the sale, its items and the report rollups all add up the same cents
+            item_vat = (item_subtotal * product.vat_rate / Decimal("100")).quantize(CENT, ROUND_HALF_UP)
             item_total = item_subtotal + item_vat
 
             subtotal += item_subtotal
             vat_total += item_vat
+            sold[product.id] += item_data.quantity
 
-            sale_items.append({
-                "product": product,
-                "data": item_data,
-                "item_vat": item_vat,
-                "item_total": item_total
+            lines.append({
+                "product_id": product.id,
+                "product_name": product.name,
+                "quantity": item_data.quantity,
+                "unit_price": product.price,
+                "unit_cost": product.cost_price,  # Snapshot; later cost changes do not touch past margins
+                "discount_amount": item_data.discount_amount,
+                "vat_rate": product.vat_rate,
+                "vat_amount": item_vat,
+                "total": item_total
             })
 
-        # Calculate totals
-        total = subtotal + vat_total - data.discount_amount
+        if not lines:
+            raise ValueError("Sale has no items")
+
+        total = (subtotal + vat_total - data.discount_amount).quantize(CENT, ROUND_HALF_UP)
         change_given = None
         if data.payment_method == "cash" and data.cash_received:
             change_given = data.cash_received - total
 
-        # Create sale
-        sale = Sale(
-            tenant_id=tenant_id,
-            user_id=user_id,
-            sale_number=self._generate_sale_number(tenant_id),
-            subtotal=subtotal,
-            discount_amount=data.discount_amount,
-            vat_amount=vat_total,
-            total=total,
-            payment_method=data.payment_method,
-            cash_received=data.cash_received,
-            change_given=change_given,
-            notes=data.notes
-        )
-        self.db.add(sale)
-        self.db.flush()
-
-        # Create sale items and update stock
-        for item in sale_items:
-            product = item["product"]
-            item_data = item["data"]
-
-            sale_item = SaleItem(
-                sale_id=sale.id,
-                product_id=product.id,
-                product_name=product.name,
-                quantity=item_data.quantity,
-                unit_price=product.price,
-                discount_amount=item_data.discount_amount,
-                vat_rate=product.vat_rate,
-                vat_amount=item["item_vat"],
-                total=item["item_total"]
-            )
-            self.db.add(sale_item)
-
-            # Update stock
-            product.stock_quantity -= item_data.quantity
-
-            # Create stock movement
-            movement = StockMovement(
-                tenant_id=tenant_id,
-                product_id=product.id,
-                quantity=-item_data.quantity,
-                type="sale",
-                reference_id=sale.id,
-                user_id=user_id
-            )
-            self.db.add(movement)
+        return {
+            "sale": {
+                "subtotal": subtotal,
+                "discount_amount": data.discount_amount,
+                "vat_amount": vat_total,
+                "total": total,
+                "payment_method": data.payment_method,
+                "cash_received": data.cash_received,
+                "change_given": change_given,
+                "notes": data.notes
+            },
+            "lines": lines,
+            "sold": sold
+        }
+
+    def _write_sales(
+        self, tenant_id: int, user_id: int, priced: List[dict], allow_negative: Optional[bool] = None
+    ) -> List[Sale]:
+        """Persist priced sales with a fixed number of statements, whatever the count.
+
+        Stock for all sales is decremented by one conditional UPDATE, so an
+        oversell rejects every sale in `priced`. Everything else a sale
+        triggers goes through the outbox as a sale.completed event.
+        """
+        sold = defaultdict(int)
+        for p in priced:
+            for product_id, quantity in p["sold"].items():
+                sold[product_id] += quantity
+        levels = StockService(self.db).apply(tenant_id, {pid: -qty for pid, qty in sold.items()}, allow_negative)
+
+        numbers = self._generate_sale_numbers(tenant_id, [p["created_at"] for p in priced])
+        sales = [
+            Sale(tenant_id=tenant_id, user_id=user_id, sale_number=number,
+                 created_at=p["created_at"], client_id=p.get("client_id"), **p["sale"])
+            for p, number in zip(priced, numbers)
+        ]
+        self.db.add_all(sales)
+        self.db.flush()  # One batched INSERT ... RETURNING for all sales
 
+        self.db.execute(insert(SaleItem), [
+            {"sale_id": sale.id, **line}
+            for sale, p in zip(sales, priced)
+            for line in p["lines"]
+        ])
+
+        # Stock level right after each sale, walking back from the final levels
+        events = []
+        for sale, p in reversed(list(zip(sales, priced))):
+            events.append({
+                "sale_id": sale.id,
+                "user_id": user_id,
+                "created_at": sale.created_at.isoformat(),
+                "sold": p["sold"],
+                "stock_levels": {pid: levels.get(pid) for pid in p["sold"]}
+            })
+            for product_id, quantity in p["sold"].items():
+                if product_id in levels:
+                    levels[product_id] += quantity
+        OutboxService(self.db).enqueue(tenant_id, "sale.completed", events[::-1])
+        RollupService(self.db).apply_sales(tenant_id, sales, [
+            self._rollup_line(sale, line["product_id"], line["quantity"], line["total"], line["vat_amount"],
+                              line["unit_cost"])
+            for sale, p in zip(sales, priced)
+            for line in p["lines"]
+        ])
+        return sales
+
+    @staticmethod
+    def _rollup_line(sale: Sale, product_id: Optional[int], quantity: int, total: Decimal,
+                     vat_amount: Decimal, unit_cost: Optional[Decimal]) -> dict:
+        return {
+            "business_date": sale.created_at.date(),
+            "user_id": sale.user_id,
+            "product_id": product_id,
+            "quantity": quantity,
+            "revenue": total,
+            "vat": vat_amount,
+            "cost": (unit_cost or Decimal("0")) * quantity
+        }
+
+    def create_sale(self, tenant_id: int, user_id: int, data: SaleCreate) -> Sale:
+        try:
+            sale = self.add_sale(tenant_id, user_id, data)
+        except ValueError:
+            self.db.rollback()
+            raise
         self.db.commit()
+        report_cache.invalidate(tenant_id)
         self.db.refresh(sale)
         return sale
 
-    def get_sales(self, tenant_id: int, skip: int = 0, limit: int = 50) -> tuple[List[Sale], int]:
-        query = self.db.query(Sale).filter(Sale.tenant_id == tenant_id).order_by(Sale.created_at.desc())
-        total = query.count()
-        items = query.offset(skip).limit(limit).all()
-        return items, total
+    def add_sale(self, tenant_id: int, user_id: int, data: SaleCreate) -> Sale:
+        """Write a sale and its side effects without committing.
+
+        On ValueError the caller must roll back: stock may already be updated.
+        """
+        products = self._load_products(tenant_id, [i.product_id for i in data.items])
+        priced = self._price(data, products)
+        priced["created_at"] = datetime.utcnow()
+        return self._write_sales(tenant_id, user_id, [priced])[0]
+
+    def ingest_batch(
+        self, tenant_id: int, user_id: int, sales: List[OfflineSaleCreate], chunk_size: int = 100
+    ) -> List[SaleBatchResult]:
+        """Replay sales queued offline by a terminal, in order.
+
+        Each chunk is priced and validated against one locked product fetch,
+        written with bulk inserts and committed once. Sales whose client_id
+        was already ingested are skipped; invalid sales are reported without
+        failing their neighbours.
+        """
+        results = []
+        seen = {
+            row.client_id: row
+            for row in self.db.query(Sale.client_id, Sale.id, Sale.sale_number).filter(
+                Sale.tenant_id == tenant_id,
+                Sale.client_id.in_({s.client_id for s in sales})
+            )
+        }
+        allow_negative = SettingsService(self.db).get_stock_policy(tenant_id).allow_negative
+
+        for start in range(0, len(sales), chunk_size):
+            chunk = sales[start:start + chunk_size]
+            products = self._load_products(tenant_id, [i.product_id for s in chunk for i in s.items])
+            levels = {pid: p.stock_quantity for pid, p in products.items()}
+
+            chunk_results = []
+            accepted = []
+            for data in chunk:
+                if data.client_id in seen:
+                    # Sales created earlier in this chunk get their IDs once written
+                    existing = seen[data.client_id]
+                    chunk_results.append(SaleBatchResult(
+                        client_id=data.client_id, status="duplicate",
+                        sale_id=existing and existing.id, sale_number=existing and existing.sale_number
+                    ))
+                    continue
+                try:
+                    priced = self._price(data, products)
+                    # Stock is checked in order against the locked levels
+                    if not allow_negative:
+                        short = sorted(pid for pid, qty in priced["sold"].items() if levels[pid] < qty)
+                        if short:
+                            raise ValueError(f"Insufficient stock for products: {', '.join(map(str, short))}")
+                    for pid, qty in priced["sold"].items():
+                        levels[pid] -= qty
+                except ValueError as e:
+                    chunk_results.append(SaleBatchResult(client_id=data.client_id, status="error", error=str(e)))
+                    continue
+                priced["created_at"] = _to_utc(data.client_created_at) or datetime.utcnow()
+                priced["client_id"] = data.client_id
+                seen[data.client_id] = None
+                accepted.append(priced)
+                chunk_results.append(SaleBatchResult(client_id=data.client_id, status="created"))
+
+            try:
+                written = self._write_sales(tenant_id, user_id, accepted, allow_negative) if accepted else []
+            except (ValueError, IntegrityError):
+                # Stock moved or a client_id was ingested concurrently; replay sale by sale
+                self.db.rollback()
+                chunk_results = self._ingest_one_by_one(tenant_id, user_id, chunk, allow_negative, seen)
+            else:
+                created = iter(written)
+                for result in chunk_results:
+                    if result.status == "created":
+                        seen[result.client_id] = next(created)
+                    if result.status != "error" and result.sale_id is None:
+                        sale = seen[result.client_id]
+                        result.sale_id, result.sale_number = sale.id, sale.sale_number
+            self.db.commit()
+            report_cache.invalidate(tenant_id)
+            results.extend(chunk_results)
+
+        return results
+
+    def _ingest_one_by_one(
+        self, tenant_id: int, user_id: int, chunk: List[OfflineSaleCreate], allow_negative: bool, seen: dict
+    ) -> List[SaleBatchResult]:
+        results = []
+        for data in chunk:
+            if seen.get(data.client_id) is not None:
+                existing = seen[data.client_id]
+                results.append(SaleBatchResult(
+                    client_id=data.client_id, status="duplicate",
+                    sale_id=existing.id, sale_number=existing.sale_number
+                ))
+                continue
+            try:
+                with self.db.begin_nested():
+                    products = self._load_products(tenant_id, [i.product_id for i in data.items])
+                    priced = self._price(data, products)
+                    priced["created_at"] = _to_utc(data.client_created_at) or datetime.utcnow()
+                    priced["client_id"] = data.client_id
+                    sale = self._write_sales(tenant_id, user_id, [priced], allow_negative)[0]
+            except IntegrityError:
+                results.append(SaleBatchResult(client_id=data.client_id, status="duplicate"))
+                continue
+            except ValueError as e:
+                results.append(SaleBatchResult(client_id=data.client_id, status="error", error=str(e)))
+                continue
+            seen[data.client_id] = sale
+            results.append(SaleBatchResult(
+                client_id=data.client_id, status="created", sale_id=sale.id, sale_number=sale.sale_number
+            ))
+        return results
+
+    @staticmethod
+    def _apply_filters(query, filters: Optional[SaleFilters]):
+        if not filters:
+            return query
+        if filters.date_from:
+            query = query.filter(Sale.created_at >= datetime.combine(filters.date_from, time.min))
+        if filters.date_to:
+            query = query.filter(Sale.created_at < datetime.combine(filters.date_to + timedelta(days=1), time.min))
+        if filters.payment_method:
+            query = query.filter(Sale.payment_method == filters.payment_method)
+        if filters.user_id:
+            query = query.filter(Sale.user_id == filters.user_id)
+        if filters.status:
+            query = query.filter(Sale.status == filters.status)
+        if filters.min_total is not None:
+            query = query.filter(Sale.total >= filters.min_total)
+        if filters.max_total is not None:
+            query = query.filter(Sale.total <= filters.max_total)
+        return query
+
+    @staticmethod
+    def _page(query, skip: int, limit: int, cursor: Optional[str]):
+        query = query.order_by(Sale.created_at.desc(), Sale.id.desc())
+        if cursor:
+            created_at, sale_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Sale.created_at, Sale.id) < tuple_(created_at, sale_id))
+        else:
+            query = query.offset(skip)
+        return query.limit(limit + 1)
+
+    @staticmethod
+    def _next_cursor(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, None
+
+    def get_sales(
+        self,
+        tenant_id: int,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        filters: Optional[SaleFilters] = None
+    ) -> Tuple[List[Sale], Optional[int], Optional[str]]:
+        """Return (sales, total, next_cursor), newest first.
+
+        With a cursor the page starts right after the (created_at, id) it
+        encodes, so deep pages cost the same as the first one; `skip` is
+        then ignored. Items are loaded for the whole page in one extra query.
+        """
+        query = self._apply_filters(self.db.query(Sale).filter(Sale.tenant_id == tenant_id), filters)
+        total = query.count() if include_total else None
+        items = self._page(query.options(selectinload(Sale.items)), skip, limit, cursor).all()
+        items, next_cursor = self._next_cursor(items, limit)
+        return items, total, next_cursor
+
+    def get_sale_summaries(
+        self,
+        tenant_id: int,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        filters: Optional[SaleFilters] = None
+    ) -> Tuple[list, Optional[int], Optional[str]]:
+        """Like get_sales, but selects only the history-screen columns as plain rows"""
+        query = self._apply_filters(select(
+            Sale.id, Sale.sale_number, Sale.total, Sale.payment_method,
+            Sale.status, Sale.user_id, Sale.created_at
+        ).where(Sale.tenant_id == tenant_id), filters)
+        total = None
+        if include_total:
+            total = self.db.execute(select(func.count()).select_from(query.subquery())).scalar_one()
+        rows = self.db.execute(self._page(query, skip, limit, cursor)).all()
+        rows, next_cursor = self._next_cursor(rows, limit)
+        return rows, total, next_cursor
 
     def get_sale(self, tenant_id: int, sale_id: int) -> Optional[Sale]:
         return self.db.query(Sale).filter(Sale.id == sale_id, Sale.tenant_id == tenant_id).first()
+
+    def update_status(self, tenant_id: int, sale_id: int, status: str) -> Optional[Sale]:
+        """Change a sale's status and move it in or out of the report rollups.
+
+        Stock is not touched; returned goods are booked with an inventory adjustment.
+        """
+        sale = self.db.query(Sale).filter(
+            Sale.id == sale_id, Sale.tenant_id == tenant_id
+        ).with_for_update().first()
+        if not sale:
+            return None
+        if sale.status == status:
+            return sale
+
+        if "completed" in (sale.status, status):
+            lines = [
+                self._rollup_line(sale, item.product_id, item.quantity, item.total, item.vat_amount, item.unit_cost)
+                for item in sale.items
+            ]
+            RollupService(self.db).apply_sales(tenant_id, [sale], lines, sign=-1 if sale.status == "completed" else 1)
+        sale.status = status
+        self.db.commit()
+        report_cache.invalidate(tenant_id)
+        self.db.refresh(sale)
+        return sale
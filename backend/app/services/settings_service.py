@@ -2,9 +2,11 @@ import json
 from typing import Optional
 from sqlalchemy.orm import Session
 
+from app.core.cache import report_cache
 from app.models.settings import TenantSettings
 from app.models.tenant import Tenant
-from app.schemas.settings import BusinessInfo, VatRates, ReceiptTemplate
+from app.schemas.settings import BusinessInfo, VatRates, ReceiptTemplate, StockPolicy
+from app.services.counter_service import CounterService, SETTINGS_COUNTER
 
 
 class SettingsService:
@@ -28,6 +30,7 @@ class SettingsService:
         else:
             setting = TenantSettings(tenant_id=tenant_id, key=key, value=value)
             self.db.add(setting)
+        CounterService(self.db).next_value(tenant_id, SETTINGS_COUNTER)
         self.db.commit()
 
     def get_business_info(self, tenant_id: int) -> BusinessInfo:
@@ -38,7 +41,8 @@ class SettingsService:
             phone=tenant.phone,
             email=tenant.email,
             vat_number=tenant.vat_number,
-            currency=tenant.currency
+            currency=tenant.currency,
+            timezone=tenant.timezone or "UTC"
         )
 
     def update_business_info(self, tenant_id: int, data: BusinessInfo) -> BusinessInfo:
@@ -49,7 +53,10 @@ class SettingsService:
         tenant.email = data.email
         tenant.vat_number = data.vat_number
         tenant.currency = data.currency
+        tenant.timezone = data.timezone
+        CounterService(self.db).next_value(tenant_id, SETTINGS_COUNTER)
         self.db.commit()
+        report_cache.invalidate(tenant_id)  # Local-time reports depend on the timezone
         return data
 
     def get_vat_rates(self, tenant_id: int) -> VatRates:
@@ -71,3 +78,13 @@ class SettingsService:
     def update_receipt_template(self, tenant_id: int, data: ReceiptTemplate) -> ReceiptTemplate:
         self._set(tenant_id, "receipt_template", data.model_dump_json())
         return data
+
+    def get_stock_policy(self, tenant_id: int) -> StockPolicy:
+        raw = self._get(tenant_id, "stock_policy")
+        if raw:
+            return StockPolicy(**json.loads(raw))
+        return StockPolicy()
+
+    def update_stock_policy(self, tenant_id: int, data: StockPolicy) -> StockPolicy:
+        self._set(tenant_id, "stock_policy", data.model_dump_json())
+        return data
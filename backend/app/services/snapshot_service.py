@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select, Integer, Numeric, DateTime, Date
+
+from app.config import settings
+from app.models.sale import Sale, SaleItem
+from app.models.stock_movement import StockMovement
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+WATERMARK_FILE = "_watermarks.json"
+
+
+def _tables():
+    """(name, id column, tenant column, partition column name, columns, join clauses) per exported table"""
+    return [
+        ("sales", Sale.id, Sale.tenant_id, "created_at", list(Sale.__table__.columns), []),
+        ("sale_items", SaleItem.id, Sale.tenant_id, "sale_created_at",
+         list(SaleItem.__table__.columns) + [Sale.created_at.label("sale_created_at")],
+         [SaleItem.sale_id == Sale.id]),
+        ("stock_movements", StockMovement.id, StockMovement.tenant_id, "created_at",
+         list(StockMovement.__table__.columns), []),
+    ]
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Numeric):
+        return pa.decimal128(column.type.precision, column.type.scale)
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+class SnapshotService:
+    """Writes a tenant's sales history as Parquet files for analytics.
+
+    Layout: <out>/tenant=<id>/<table>/month=YYYY-MM/part-<first id>.parquet.
+    Each run appends new part files with the rows whose id is above the
+    watermark of the previous run; the watermarks are stored next to the
+    data. Rows are read with yield_per and written batch by batch, so a
+    run holds at most EXPORT_CHUNK_SIZE rows in memory.
+
+    Rows are exported once, when they are first seen; later changes such
+    as a sale's status going to refunded need a full export. Run it off-peak:
+    a row from a transaction still open during the run can commit with an id
+    below the new watermark and would then be skipped.
+    """
+
+    def __init__(self, db: Session):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is not installed; install the backend requirements to export snapshots")
+        self.db = db
+
+    def export(self, tenant_id: int, out_dir: str, full: bool = False) -> Dict[str, int]:
+        """Export rows newer than the stored watermarks and return the row count per table"""
+        root = os.path.join(out_dir, f"tenant={tenant_id}")
+        if full and os.path.isdir(root):
+            shutil.rmtree(root)
+        os.makedirs(root, exist_ok=True)
+
+        watermarks = self._read_watermarks(root)
+        written = {}
+        for name, id_column, tenant_column, month_key, columns, joins in _tables():
+            since = watermarks.get(name, 0)
+            stmt = select(*columns).where(id_column > since, tenant_column == tenant_id, *joins).order_by(id_column)
+            count, last_id = self._write_table(
+                os.path.join(root, name), stmt, columns, month_key, f"part-{since + 1:012d}.parquet"
+            )
+            written[name] = count
+            if last_id is not None:
+                watermarks[name] = last_id
+
+        self._write_watermarks(root, watermarks)
+        return written
+
+    def _write_table(self, table_dir: str, stmt, columns: List, month_key: str, filename: str):
+        schema = pa.schema([(c.key, _arrow_type(c)) for c in columns])
+        writers: Dict[str, "pq.ParquetWriter"] = {}
+        count = 0
+        last_id: Optional[int] = None
+        try:
+            result = self.db.execute(stmt.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE))
+            for rows in result.partitions():
+                by_month: Dict[str, list] = {}
+                for row in rows:
+                    month = getattr(row, month_key).strftime("%Y-%m")
+                    by_month.setdefault(month, []).append(row)
+                for month, month_rows in by_month.items():
+                    writer = writers.get(month)
+                    if writer is None:
+                        path = os.path.join(table_dir, f"month={month}")
+                        os.makedirs(path, exist_ok=True)
+                        writer = writers[month] = pq.ParquetWriter(os.path.join(path, filename), schema)
+                    writer.write_batch(pa.record_batch(
+                        [pa.array([row[i] for row in month_rows], type=field.type) for i, field in enumerate(schema)],
+                        schema=schema
+                    ))
+                count += len(rows)
+                last_id = rows[-1].id
+        finally:
+            for writer in writers.values():
+                writer.close()
+        return count, last_id
+
+    @staticmethod
+    def _read_watermarks(root: str) -> Dict[str, int]:
+        path = os.path.join(root, WATERMARK_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_watermarks(root: str, watermarks: Dict[str, int]):
+        # Written last, so an interrupted run is redone from the previous watermarks
+        path = os.path.join(root, WATERMARK_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(watermarks, f)
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,52 @@
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import update, case, or_
+
+from app.models.product import Product
+from app.services.settings_service import SettingsService
+
+
+class InsufficientStockError(ValueError):
+    def __init__(self, product_ids: List[int]):
+        self.product_ids = product_ids
+        super().__init__(f"Insufficient stock for products: {', '.join(map(str, product_ids))}")
+
+
+class StockService:
+    """Applies stock deltas with a single conditional UPDATE ... RETURNING.
+
+    The new quantity is computed by the database, so concurrent tills never
+    lose each other's updates. Callers own the transaction: on error the
+    caller must roll back, since rows that passed the check were updated.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, tenant_id: int, deltas: Dict[int, int], allow_negative: Optional[bool] = None) -> Dict[int, int]:
+        """Add `deltas` ({product_id: quantity}) to stock and return the new levels"""
+        deltas = {product_id: qty for product_id, qty in deltas.items() if qty}
+        if not deltas:
+            return {}
+        if allow_negative is None:
+            allow_negative = SettingsService(self.db).get_stock_policy(tenant_id).allow_negative
+
+        delta = case(deltas, value=Product.id)
+        stmt = update(Product).where(
+            Product.tenant_id == tenant_id,
+            Product.id.in_(sorted(deltas))
+        ).values(
+            stock_quantity=Product.stock_quantity + delta
+        ).returning(Product.id, Product.stock_quantity)
+
+        if not allow_negative:
+            # Only decrements are checked; restocking a negative product is always allowed
+            stmt = stmt.where(or_(delta >= 0, Product.stock_quantity + delta >= 0))
+
+        rows = self.db.execute(stmt, execution_options={"synchronize_session": False}).all()
+        levels = {row.id: row.stock_quantity for row in rows}
+
+        missing = sorted(set(deltas) - set(levels))
+        if missing:
+            raise InsufficientStockError(missing)
+        return levels
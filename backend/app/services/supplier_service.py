@@ -5,6 +5,7 @@ from sqlalchemy import or_, func
 from app.models.supplier import Supplier
 from app.models.product import Product
 from app.schemas.supplier import SupplierCreate, SupplierUpdate
+from app.services.counter_service import CounterService, SUPPLIERS_COUNTER
 
 
 class SupplierService:
@@ -45,6 +46,7 @@ class SupplierService:
         """Create a new supplier"""
         supplier = Supplier(tenant_id=tenant_id, **data.model_dump())
         self.db.add(supplier)
+        self._bump(tenant_id)
         self.db.commit()
         self.db.refresh(supplier)
         return supplier
@@ -58,6 +60,7 @@ class SupplierService:
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(supplier, key, value)
         
+        self._bump(tenant_id)
         self.db.commit()
         self.db.refresh(supplier)
         return supplier
@@ -69,6 +72,11 @@ class SupplierService:
             return False
         
         self.db.delete(supplier)
+        self._bump(tenant_id)
         self.db.commit()
         return True
 
+    def _bump(self, tenant_id: int):
+        """Move the suppliers version on, so list ETags change; part of the write's transaction"""
+        CounterService(self.db).next_value(tenant_id, SUPPLIERS_COUNTER)
+
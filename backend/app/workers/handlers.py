@@ -0,0 +1,58 @@
+"""Consumers of outbox events.
+
+Each handler is called as handler(db, tenant_id, payload) inside the worker's
+transaction; raising makes the worker retry the event later.
+"""
+import logging
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.models.stock_movement import StockMovement
+from app.services.outbox_service import OutboxService
+
+logger = logging.getLogger(__name__)
+
+
+def journal_stock_movements(db: Session, tenant_id: int, payload: dict):
+    """Write the stock movements of a completed sale"""
+    db.execute(insert(StockMovement), [
+        {
+            "tenant_id": tenant_id,
+            "product_id": int(product_id),
+            "quantity": -quantity,
+            "type": "sale",
+            "reference_id": payload["sale_id"],
+            "user_id": payload["user_id"],
+            "created_at": datetime.fromisoformat(payload["created_at"])
+        }
+        for product_id, quantity in sorted(payload["sold"].items(), key=lambda kv: int(kv[0]))
+    ])
+
+
+def detect_low_stock(db: Session, tenant_id: int, payload: dict):
+    """Publish product.low_stock for products this sale pushed to or below their minimum"""
+    sold = {int(product_id): quantity for product_id, quantity in payload["sold"].items()}
+    levels = {int(product_id): level for product_id, level in payload["stock_levels"].items()}
+    products = db.query(Product.id, Product.name, Product.min_stock_level).filter(
+        Product.tenant_id == tenant_id,
+        Product.id.in_(sold)
+    ).all()
+
+    # Only report the crossing, not every later sale of an already low product
+    crossed = [
+        p for p in products
+        if levels.get(p.id) is not None and levels[p.id] <= p.min_stock_level < levels[p.id] + sold[p.id]
+    ]
+    if crossed:
+        logger.warning("Low stock for tenant %s: %s", tenant_id, ", ".join(p.name for p in crossed))
+        OutboxService(db).enqueue(tenant_id, "product.low_stock", [
+            {"product_id": p.id, "stock_quantity": levels[p.id], "min_stock_level": p.min_stock_level}
+            for p in crossed
+        ])
+
+
+HANDLERS = {
+    "sale.completed": [journal_stock_movements, detect_low_stock],
+}
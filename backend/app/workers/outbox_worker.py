@@ -0,0 +1,122 @@
+"""Drains the outbox and applies sale side effects.
+
+    python -m app.workers.outbox_worker
+
+Events of one tenant are applied strictly in insertion order: a failing event
+is retried with exponential backoff and holds back the tenant's later events
+until it succeeds or is given up on after OUTBOX_MAX_ATTEMPTS. On PostgreSQL
+several workers can run side by side; a transaction-level advisory lock keeps
+each tenant on one worker at a time.
+"""
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.outbox import OutboxEvent
+from app.services.outbox_service import OutboxService
+from app.workers.handlers import HANDLERS
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_NAMESPACE = 8001  # First key of pg_try_advisory_xact_lock(int, int)
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        handlers: Dict[str, List[Callable]] = HANDLERS,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS
+    ):
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+    def run_once(self) -> int:
+        """Process one batch per tenant with due events; return the number of events applied"""
+        db = self.session_factory()
+        try:
+            tenant_ids = [row[0] for row in db.query(OutboxEvent.tenant_id).filter(
+                OutboxEvent.status == "pending",
+                OutboxEvent.available_at <= datetime.utcnow()
+            ).distinct().all()]
+            db.rollback()
+            return sum(self._drain_tenant(db, tenant_id) for tenant_id in tenant_ids)
+        finally:
+            db.close()
+
+    def run_forever(self, poll_seconds: float = settings.OUTBOX_POLL_SECONDS):
+        last_purge = 0.0
+        while True:
+            try:
+                processed = self.run_once()
+                if time.monotonic() - last_purge > 600:
+                    db = self.session_factory()
+                    try:
+                        OutboxService(db).purge_processed(settings.OUTBOX_RETENTION_DAYS)
+                    finally:
+                        db.close()
+                    last_purge = time.monotonic()
+            except Exception:
+                logger.exception("Outbox worker iteration failed")
+                processed = 0
+            if not processed:
+                time.sleep(poll_seconds)
+
+    def _lock_tenant(self, db: Session, tenant_id: int) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return True
+        return db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:ns, :tenant_id)"),
+            {"ns": ADVISORY_LOCK_NAMESPACE, "tenant_id": tenant_id}
+        ).scalar()
+
+    def _drain_tenant(self, db: Session, tenant_id: int) -> int:
+        if not self._lock_tenant(db, tenant_id):
+            db.rollback()
+            return 0  # Another worker owns this tenant right now
+
+        events = db.query(OutboxEvent).filter(
+            OutboxEvent.tenant_id == tenant_id,
+            OutboxEvent.status == "pending"
+        ).order_by(OutboxEvent.id).limit(self.batch_size).all()
+
+        processed = 0
+        now = datetime.utcnow()
+        for event in events:
+            if event.available_at > now:
+                break  # Waiting for a retry; later events must not overtake it
+            try:
+                with db.begin_nested():
+                    payload = json.loads(event.payload)
+                    for handler in self.handlers.get(event.event_type, []):
+                        handler(db, event.tenant_id, payload)
+            except Exception as e:
+                event.attempts += 1
+                event.last_error = repr(e)
+                if event.attempts >= self.max_attempts:
+                    event.status = "failed"
+                    logger.error("Outbox event %s failed permanently: %r", event.id, e)
+                    continue
+                event.available_at = now + timedelta(seconds=min(2 ** event.attempts, 300))
+                logger.warning("Outbox event %s failed, retrying: %r", event.id, e)
+                break
+            event.status = "done"
+            event.processed_at = now
+            processed += 1
+
+        db.commit()
+        return processed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    OutboxWorker().run_forever()
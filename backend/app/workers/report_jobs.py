@@ -0,0 +1,215 @@
+"""Runs queued report jobs.
+
+    python -m app.workers.report_jobs
+
+With REPORT_JOBS_IN_PROCESS (the default) every API process also runs jobs
+on a pool of REPORT_JOB_WORKERS threads, woken when a job is submitted. The
+standalone worker polls instead and keeps heavy reports off the API
+processes entirely; run it with REPORT_JOBS_IN_PROCESS=false on the API.
+
+At most REPORT_JOB_TENANT_LIMIT jobs of one tenant run at a time, across all
+processes: claims are serialized per tenant with an advisory lock on
+PostgreSQL (SQLite serializes writers anyway).
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.report_job import ReportJob
+from app.schemas.report import SalesByDateReport
+from app.services.export_service import ExportService
+from app.services.report_job_service import ReportJobService
+from app.services.report_service import ReportService
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_NAMESPACE = 8002  # First key of pg_try_advisory_xact_lock(int, int)
+
+
+def _run_range(db: Session, tenant_id: int, params: dict) -> tuple:
+    report = ReportService(db).compute_date_range_report(
+        tenant_id, _date(params["start_date"]), _date(params["end_date"]), max_days=None
+    )
+    body = SalesByDateReport.model_validate(report).model_dump_json().encode()
+    return [body], "application/json", f"report_{params['start_date']}_{params['end_date']}.json"
+
+
+def _run_export(db: Session, tenant_id: int, params: dict) -> tuple:
+    chunks = ExportService(db).stream(
+        tenant_id, _date(params["start_date"]), _date(params["end_date"]),
+        params["rows"], params["format"], compress=True
+    )
+    return chunks, "application/gzip", f"{params['rows']}_{params['start_date']}_{params['end_date']}.{params['format']}.gz"
+
+
+def _date(value: str):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+RUNNERS = {
+    "range": _run_range,
+    "export": _run_export,
+}
+
+
+class ReportJobWorker:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        tenant_limit: int = settings.REPORT_JOB_TENANT_LIMIT
+    ):
+        self.session_factory = session_factory
+        self.tenant_limit = tenant_limit
+
+    def run_once(self) -> bool:
+        """Claim and run one job; return False when nothing could be claimed"""
+        db = self.session_factory()
+        try:
+            job = self.claim(db)
+            if job is None:
+                return False
+            self._run(db, job)
+            return True
+        finally:
+            db.close()
+
+    def run_forever(self, poll_seconds: float = 1.0):
+        last_purge = 0.0
+        while True:
+            try:
+                ran = self.run_once()
+                if time.monotonic() - last_purge > 600:
+                    db = self.session_factory()
+                    try:
+                        ReportJobService(db).purge_expired()
+                    finally:
+                        db.close()
+                    last_purge = time.monotonic()
+            except Exception:
+                logger.exception("Report job worker iteration failed")
+                ran = False
+            if not ran:
+                time.sleep(poll_seconds)
+
+    def _lock_tenant(self, db: Session, tenant_id: int) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return True
+        return db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:ns, :tenant_id)"),
+            {"ns": ADVISORY_LOCK_NAMESPACE, "tenant_id": tenant_id}
+        ).scalar()
+
+    def claim(self, db: Session) -> Optional[ReportJob]:
+        """Mark the oldest queued job of a tenant below its concurrency limit as running"""
+        tenant_ids = [row[0] for row in db.query(ReportJob.tenant_id).filter(
+            ReportJob.status == "queued"
+        ).group_by(ReportJob.tenant_id).order_by(func.min(ReportJob.id)).all()]
+        db.rollback()
+
+        live_since = datetime.utcnow() - timedelta(minutes=settings.REPORT_JOB_TIMEOUT_MINUTES)
+        for tenant_id in tenant_ids:
+            if not self._lock_tenant(db, tenant_id):
+                db.rollback()
+                continue
+            running = db.query(func.count(ReportJob.id)).filter(
+                ReportJob.tenant_id == tenant_id,
+                ReportJob.status == "running",
+                ReportJob.started_at >= live_since
+            ).scalar()
+            job = None
+            if running < self.tenant_limit:
+                job = db.query(ReportJob).filter(
+                    ReportJob.tenant_id == tenant_id,
+                    ReportJob.status == "queued"
+                ).order_by(ReportJob.id).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.rollback()
+                continue
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            db.commit()
+            return job
+        return None
+
+    def _run(self, db: Session, job: ReportJob):
+        try:
+            chunks, content_type, filename = RUNNERS[job.kind](db, job.tenant_id, json.loads(job.params))
+            # Written to disk as the export streams, so the worker never holds the whole result
+            result_path = ReportJobService.write_result(job, chunks)
+        except Exception as e:
+            db.rollback()
+            logger.warning("Report job %s failed: %r", job.id, e)
+            job.status = "failed"
+            job.error = str(e)
+        else:
+            job.status = "done"
+            job.result_path = result_path
+            job.content_type = content_type
+            job.filename = filename
+        job.finished_at = datetime.utcnow()
+        job.expires_at = job.finished_at + timedelta(hours=settings.REPORT_JOB_TTL_HOURS)
+        db.commit()
+
+
+class ReportJobPool:
+    """Runs report jobs on a few threads inside the API process.
+
+    wake() is called after a job is committed. Each thread keeps claiming
+    jobs until none can be claimed; the dirty flag makes sure a job
+    submitted while the last thread is giving up is not left waiting.
+    """
+
+    def __init__(self, workers: int = settings.REPORT_JOB_WORKERS):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active = 0
+        self._dirty = False
+
+    def wake(self, session_factory: Callable[[], Session]):
+        with self._lock:
+            self._dirty = True
+            if self._active >= self.workers:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="report-job")
+            self._active += 1
+            self._executor.submit(self._drain, session_factory)
+
+    def _drain(self, session_factory: Callable[[], Session]):
+        worker = ReportJobWorker(session_factory)
+        while True:
+            with self._lock:
+                self._dirty = False
+            try:
+                while worker.run_once():
+                    pass
+            except Exception:
+                logger.exception("Report job pool iteration failed")
+            with self._lock:
+                if not self._dirty:
+                    self._active -= 1
+                    return
+
+    def shutdown(self):
+        """Wait for running jobs; the pool starts again on the next wake()"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+
+job_pool = ReportJobPool()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ReportJobWorker().run_forever()
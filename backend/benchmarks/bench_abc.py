@@ -0,0 +1,66 @@
+"""ABC classification over a large catalog.
+
+    python -m benchmarks.bench_abc
+
+Seeds 100k products with a quarter of per-product daily rollup rows and
+times ReportService.get_abc_report cold (ranking computed) and warm
+(ranking served from the report cache).
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, text
+
+from app.core.cache import report_cache
+from app.models.rollup import ProductDailySales
+from app.services.report_service import ReportService
+
+from benchmarks.common import bench_session, seed_tenant, timed, summarize
+
+PRODUCTS = 100_000
+DAYS = 90
+ROWS_PER_DAY = 5_000
+START = date(2024, 1, 1)
+
+
+def main():
+    with bench_session() as db:
+        tenant_id, _ = seed_tenant(db, products=PRODUCTS)
+        product_ids = [row[0] for row in db.execute(text("SELECT id FROM products ORDER BY id"))]
+        rng = random.Random(42)
+        weights = [1 / (rank + 1) for rank in range(PRODUCTS)]  # Long-tailed demand
+        for day in range(DAYS):
+            sold = set(rng.choices(product_ids, weights=weights, k=ROWS_PER_DAY))
+            rows = []
+            for product_id in sold:
+                quantity = rng.randint(1, 20)
+                revenue = Decimal(quantity * rng.randint(100, 5000)) / 100
+                rows.append({
+                    "tenant_id": tenant_id,
+                    "business_date": START + timedelta(days=day),
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "revenue": revenue,
+                    "vat": (revenue / 6).quantize(Decimal("0.01")),
+                    "cost": (revenue / 2).quantize(Decimal("0.01")),
+                })
+            db.execute(insert(ProductDailySales), rows)
+        db.commit()
+
+        service = ReportService(db)
+        end = START + timedelta(days=DAYS - 1)
+        print(f"{PRODUCTS} products, {DAYS} days of product rollup rows")
+
+        for metric in ("revenue", "margin"):
+            def cold():
+                report_cache.clear()
+                return service.get_abc_report(tenant_id, START, end, metric)
+
+            report = cold()
+            print(f"{metric:8} cold {summarize(timed(cold, 5))}   classes {report.class_counts}")
+            print(f"{metric:8} warm {summarize(timed(lambda: service.get_abc_report(tenant_id, START, end, metric), 20))}")
+
+
+if __name__ == "__main__":
+    main()
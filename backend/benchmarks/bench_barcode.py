@@ -0,0 +1,41 @@
+"""Barcode scans: catalog index against the search query.
+
+    python -m benchmarks.bench_barcode
+
+Seeds 50k products and times ProductService.find_by_code (cold: index
+loaded; warm: dict lookup) against search_products, which the till used
+for scans before.
+"""
+import random
+
+from app.core.cache import catalog_cache
+from app.services.product_service import ProductService
+
+from benchmarks.common import bench_session, seed_tenant, timed, summarize
+
+PRODUCTS = 50_000
+SCANS = 2_000
+
+
+def main():
+    with bench_session() as db:
+        tenant_id, _ = seed_tenant(db, products=PRODUCTS)
+        service = ProductService(db)
+        rng = random.Random(42)
+        codes = [f"{rng.randrange(PRODUCTS):013d}" for _ in range(SCANS)]
+        print(f"{PRODUCTS} products")
+
+        def cold():
+            catalog_cache.clear()
+            return service.find_by_code(tenant_id, codes[0])
+
+        print(f"index load   {summarize(timed(cold, 5))}")
+        lookups = iter(codes * 10)
+        samples = timed(lambda: service.find_by_code(tenant_id, next(lookups)), SCANS * 10)
+        print(f"index lookup {summarize(samples)}   (mean {sum(samples) / len(samples) * 1000:.1f} us)")
+        searches = iter(codes)
+        print(f"search query {summarize(timed(lambda: service.search_products(tenant_id, next(searches)), 200))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Terminal catalog download: paging through GET /products against snapshot + deltas.
+
+    python -m benchmarks.bench_catalog_sync
+
+Seeds 20k products and times a cold start the old way (every page of
+get_products, 100 per page with a count each) against building the
+compressed snapshot, then a delta pull after 50 product edits.
+"""
+import gzip
+import json
+import time
+
+from app.core.cache import catalog_cache
+from app.schemas.product import ProductResponse, ProductUpdate
+from app.services.catalog_sync_service import CatalogSyncService
+from app.services.product_service import ProductService
+
+from benchmarks.common import bench_session, seed_tenant, count_statements
+
+PRODUCTS = 20_000
+PAGE = 100
+
+
+def main():
+    with bench_session() as db:
+        tenant_id, _ = seed_tenant(db, products=PRODUCTS)
+        products = ProductService(db)
+        sync = CatalogSyncService(db)
+        print(f"{PRODUCTS} products")
+
+        start = time.perf_counter()
+        size = 0
+        with count_statements(db) as statements:
+            for skip in range(0, PRODUCTS, PAGE):
+                items, _ = products.get_products(tenant_id, skip, PAGE)
+                size += len(json.dumps([ProductResponse.model_validate(p).model_dump(mode="json") for p in items]))
+        print(f"paged list   {(time.perf_counter() - start) * 1000:8.0f} ms   {len(statements):5d} queries"
+              f"   {size / 1024:8.0f} KiB")
+
+        catalog_cache.clear()
+        start = time.perf_counter()
+        with count_statements(db) as statements:
+            body = sync.get_snapshot(tenant_id)
+        print(f"snapshot     {(time.perf_counter() - start) * 1000:8.0f} ms   {len(statements):5d} queries"
+              f"   {len(body) / 1024:8.0f} KiB gzip")
+        start = time.perf_counter()
+        sync.get_snapshot(tenant_id)
+        print(f"  cached     {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+        cursor = json.loads(gzip.decompress(body))["cursor"]
+        for product_id in range(1, 51):
+            products.update_product(tenant_id, product_id, ProductUpdate(price=9.99))
+        start = time.perf_counter()
+        with count_statements(db) as statements:
+            changes = sync.get_changes(tenant_id, cursor)
+        print(f"delta pull   {(time.perf_counter() - start) * 1000:8.2f} ms   {len(statements):5d} queries"
+              f"   {len(changes.products)} products   {len(changes.model_dump_json()) / 1024:5.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Checkout latency against basket size.
+
+    python -m benchmarks.bench_checkout
+
+Prints median / p95 latency of SaleService.create_sale and the number of SQL
+statements issued per checkout for each basket size.
+"""
+from sqlalchemy import text
+
+from app.schemas.sale import SaleCreate, SaleItemCreate
+from app.services.sale_service import SaleService
+
+from benchmarks.common import bench_session, count_statements, seed_tenant, summarize, timed
+
+BASKET_SIZES = [1, 5, 10, 20, 40, 80]
+REPEAT = 30
+
+
+def main():
+    with bench_session() as db:
+        tenant_id, user_id = seed_tenant(db, products=max(BASKET_SIZES))
+        product_ids = [row[0] for row in db.execute(
+            text("SELECT id FROM products ORDER BY id")
+        )]
+        service = SaleService(db)
+
+        print(f"{'basket':>6}  {'statements':>10}  latency")
+        for size in BASKET_SIZES:
+            basket = SaleCreate(
+                items=[SaleItemCreate(product_id=pid, quantity=1) for pid in product_ids[:size]],
+                payment_method="card"
+            )
+            with count_statements(db) as statements:
+                service.create_sale(tenant_id, user_id, basket)
+            samples = timed(lambda: service.create_sale(tenant_id, user_id, basket), REPEAT)
+            print(f"{size:>6}  {len(statements):>10}  {summarize(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Bulk product import throughput and memory.
+
+    python -m benchmarks.bench_product_import
+
+Writes a CSV of 50k products to a temporary file and imports it twice
+through ProductImportService (all inserts, then all updates), printing rows
+per second, then once more under tracemalloc for the peak Python memory
+(tracing slows the import, so it is not timed). A sample of the rows also
+goes through ProductService.create_product, one request per product,
+as onboarding scripts did before.
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.schemas.product import ProductCreate
+from app.services.product_import_service import ProductImportService
+from app.services.product_service import ProductService
+
+from benchmarks.common import bench_session, seed_tenant
+
+ROWS = 50_000
+ONE_BY_ONE = 1000
+
+
+def write_csv(path: str, rows: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("name,sku,barcode,price,cost_price,stock_quantity,category\n")
+        for i in range(rows):
+            f.write(f"Imported product {i},IMP-{i:06d},{2000000000000 + i},{1 + i % 50}.99,"
+                    f"{1 + i % 30}.00,{i % 200},Category {i % 40}\n")
+
+
+def main():
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_csv(path, ROWS)
+        print(f"{ROWS} rows, {os.path.getsize(path) / 1024 / 1024:.1f} MiB CSV")
+        with bench_session() as db:
+            tenant_id, _ = seed_tenant(db, products=1)
+            service = ProductImportService(db)
+            for label in ("insert", "update"):
+                start = time.perf_counter()
+                with open(path, "rb") as stream:
+                    result = service.import_stream(tenant_id, stream, "csv")
+                elapsed = time.perf_counter() - start
+                assert result.errors == 0
+                print(f"import {label}   {ROWS / elapsed:8.0f} rows/s   {elapsed:6.1f} s")
+
+            tracemalloc.start()
+            with open(path, "rb") as stream:
+                service.import_stream(tenant_id, stream, "csv")
+            print(f"peak memory     {tracemalloc.get_traced_memory()[1] / 1024 / 1024:8.1f} MiB")
+            tracemalloc.stop()
+
+            products = ProductService(db)
+            start = time.perf_counter()
+            for i in range(ONE_BY_ONE):
+                products.create_product(tenant_id, ProductCreate(
+                    name=f"Single product {i}", sku=f"ONE-{i:06d}", price="1.99", stock_quantity=1
+                ))
+            elapsed = time.perf_counter() - start
+            print(f"one by one      {ONE_BY_ONE / elapsed:8.0f} rows/s   ({ONE_BY_ONE} create_product calls)")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
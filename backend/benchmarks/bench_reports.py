@@ -0,0 +1,94 @@
+"""Date-range report latency over a year of sales.
+
+    python -m benchmarks.bench_reports
+
+Seeds a year of sales, builds the daily rollup and times a full-year
+GET /reports/range breakdown two ways: the old loop that ran one summary
+query per day against the sales table, and ReportService.get_daily_breakdown,
+which reads the whole range in one grouped query. Also times the
+year's weekday x hour heatmap from the hourly rollup.
+"""
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, func
+
+from app.models.sale import Sale
+from app.services.report_service import ReportService
+from app.services.rollup_service import RollupService
+
+from benchmarks.common import bench_session, seed_tenant, count_statements, timed, summarize
+
+DAYS = 365
+SALES_PER_DAY = 200
+REPEAT = 5
+START = date(2024, 1, 1)
+
+
+def seed_year(db, tenant_id, user_id):
+    rng = random.Random(42)
+    for day in range(DAYS):
+        opened = datetime.combine(START + timedelta(days=day), datetime.min.time())
+        rows = []
+        for n in range(SALES_PER_DAY):
+            total = Decimal(rng.randint(100, 20000)) / 100
+            rows.append({
+                "tenant_id": tenant_id,
+                "user_id": user_id,
+                "sale_number": f"{opened:%Y%m%d}-{n + 1:04d}",
+                "subtotal": total,
+                "vat_amount": (total / 6).quantize(Decimal("0.01")),
+                "total": total,
+                "payment_method": rng.choice(["cash", "card"]),
+                "status": "completed",
+                "created_at": opened + timedelta(seconds=rng.randint(0, 86399)),
+            })
+        db.execute(insert(Sale), rows)
+    db.commit()
+    RollupService(db).rebuild(tenant_id)
+
+
+def per_day_summaries(db, tenant_id):
+    """The pre-rollup implementation: one query per day over raw sales."""
+    daily = []
+    for day in range(DAYS):
+        current = START + timedelta(days=day)
+        start = datetime.combine(current, datetime.min.time())
+        sales = db.query(Sale).filter(
+            Sale.tenant_id == tenant_id,
+            Sale.created_at >= start,
+            Sale.created_at < start + timedelta(days=1),
+            Sale.status == "completed"
+        ).all()
+        daily.append((
+            len(sales),
+            sum((s.total for s in sales), Decimal("0")),
+            sum((s.total for s in sales if s.payment_method == "cash"), Decimal("0")),
+        ))
+    return daily
+
+
+def main():
+    with bench_session() as db:
+        tenant_id, user_id = seed_tenant(db, products=1)
+        seed_year(db, tenant_id, user_id)
+        print(f"{db.query(func.count(Sale.id)).scalar()} sales over {DAYS} days")
+
+        end = START + timedelta(days=DAYS - 1)
+        service = ReportService(db)
+
+        for label, fn in [
+            ("one query per day", lambda: per_day_summaries(db, tenant_id)),
+            ("single grouped query", lambda: service.get_daily_breakdown(tenant_id, START, end)),
+            ("weekday x hour heatmap", lambda: service._heatmap(tenant_id, START, end)),
+        ]:
+            with count_statements(db) as statements:
+                fn()
+            samples = timed(fn, REPEAT)
+            db.expunge_all()
+            print(f"{label:22} {summarize(samples)}   {len(statements)} statements")
+
+
+if __name__ == "__main__":
+    main()
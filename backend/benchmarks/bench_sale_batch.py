@@ -0,0 +1,68 @@
+"""Sustained offline-sale ingest throughput.
+
+    python -m benchmarks.bench_sale_batch
+
+Replays a queue of offline sales once through SaleService.create_sale (one
+transaction per sale, as terminals did before) and once through
+SaleService.ingest_batch, and prints sales per second for each.
+"""
+import random
+import time
+
+from sqlalchemy import text
+
+from app.schemas.sale import OfflineSaleCreate, SaleItemCreate
+from app.services.sale_service import SaleService
+
+from benchmarks.common import bench_session, seed_tenant
+
+QUEUE_SIZE = 2000
+BATCH_SIZE = 500
+CHUNK_SIZE = 100
+
+
+def make_queue(product_ids, prefix):
+    rng = random.Random(42)
+    return [
+        OfflineSaleCreate(
+            client_id=f"{prefix}:{n}",
+            items=[
+                SaleItemCreate(product_id=pid, quantity=rng.randint(1, 3))
+                for pid in rng.sample(product_ids, rng.randint(1, 8))
+            ],
+            payment_method=rng.choice(["cash", "card"])
+        )
+        for n in range(QUEUE_SIZE)
+    ]
+
+
+def main():
+    with bench_session() as db:
+        tenant_id, user_id = seed_tenant(db, products=500)
+        product_ids = [row[0] for row in db.execute(text("SELECT id FROM products ORDER BY id"))]
+        service = SaleService(db)
+
+        queue = make_queue(product_ids, "single")
+        start = time.perf_counter()
+        for sale in queue:
+            service.create_sale(tenant_id, user_id, sale)
+        single = time.perf_counter() - start
+
+        queue = make_queue(product_ids, "batch")
+        start = time.perf_counter()
+        for offset in range(0, QUEUE_SIZE, BATCH_SIZE):
+            service.ingest_batch(tenant_id, user_id, queue[offset:offset + BATCH_SIZE], CHUNK_SIZE)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        service.ingest_batch(tenant_id, user_id, queue[:BATCH_SIZE], CHUNK_SIZE)
+        replay = time.perf_counter() - start
+
+        print(f"{QUEUE_SIZE} sales")
+        print(f"one POST /sales per sale  {single:7.2f}s  {QUEUE_SIZE / single:8.0f} sales/s")
+        print(f"POST /sales/batch         {batched:7.2f}s  {QUEUE_SIZE / batched:8.0f} sales/s")
+        print(f"resend of {BATCH_SIZE} duplicates  {replay:7.2f}s  {BATCH_SIZE / replay:8.0f} sales/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Product search: relevance and latency of the ranked search against ILIKE.
+
+    python -m benchmarks.bench_search
+
+Generates a 50k product catalog from brand/kind/variant word lists and
+queries it with names of random products: the full name, its first two
+words, the name with one typo, and the SKU. Relevance is the share of
+queries with the target product first (hit@1) or in the 20 results
+(recall@20). The ILIKE baseline is the substring query search_products
+used before ranking. With BENCH_DATABASE_URL on a database with pg_trgm
+the ranked search runs on the trigram indexes, otherwise on the
+in-process index.
+"""
+import random
+from decimal import Decimal
+
+from sqlalchemy import insert, or_
+
+from app.core.cache import search_cache
+from app.models import Product
+from app.services.product_search import ProductSearch
+
+from benchmarks.common import bench_session, seed_tenant, timed, summarize
+
+PRODUCTS = 50_000
+QUERIES = 300
+LIMIT = 20
+
+BRANDS = ["Verea", "Devin", "Bankya", "Milka", "Nestle", "Zagorka", "Kamenitza", "Olympus", "Danone", "Tandem",
+          "Boni", "Krina", "Harmonica", "Bella", "Coca-Cola", "Pepsi", "Heinz", "Barilla", "Lavazza", "Jacobs"]
+KINDS = ["milk", "yogurt", "cheese", "butter", "water", "juice", "beer", "coffee", "tea", "chocolate", "biscuits",
+         "pasta", "rice", "flour", "sugar", "salami", "ham", "sausages", "ketchup", "mayonnaise", "bread", "wafers"]
+VARIANTS = ["classic", "light", "organic", "strawberry", "vanilla", "lemon", "smoked", "spicy", "whole grain",
+            "lactose free", "sparkling", "still", "dark", "hazelnut", "family pack", "mini", "premium", "bio"]
+SIZES = ["100g", "200g", "250g", "400g", "500g", "1kg", "330ml", "500ml", "1L", "1.5L", "2L", "6x500ml"]
+
+
+def _catalog(rng):
+    names = set()
+    while len(names) < PRODUCTS:
+        names.add(f"{rng.choice(BRANDS)} {rng.choice(KINDS)} {rng.choice(VARIANTS)} {rng.choice(SIZES)}"
+                  f"{'' if rng.random() < 0.7 else ' ' + str(rng.randrange(1, 100))}")
+    return sorted(names)
+
+
+def _typo(rng, name):
+    words = name.split()
+    i = max(range(len(words)), key=lambda w: len(words[w]))  # Misspell the longest word
+    word = words[i]
+    j = rng.randrange(1, len(words[i]) - 1)
+    words[i] = word[:j] + word[j + 1:] if rng.random() < 0.5 else word[:j] + word[j + 1] + word[j] + word[j + 2:]
+    return " ".join(words)
+
+
+def _ilike(db, tenant_id, query):
+    return [p.id for p in db.query(Product.id).filter(
+        Product.tenant_id == tenant_id,
+        Product.is_active == True,
+        or_(Product.name.ilike(f"%{query}%"), Product.sku.ilike(f"%{query}%"), Product.barcode == query)
+    ).limit(LIMIT)]
+
+
+def _relevance(search, queries):
+    first = found = 0
+    for query, target in queries:
+        ids = search(query)
+        first += bool(ids) and ids[0] == target
+        found += target in ids
+    return f"hit@1 {first / len(queries):6.1%}   recall@{LIMIT} {found / len(queries):6.1%}"
+
+
+def main():
+    rng = random.Random(7)
+    with bench_session() as db:
+        tenant_id, _ = seed_tenant(db, products=1)
+        category_id = db.query(Product.category_id).filter(Product.tenant_id == tenant_id).scalar()
+        db.execute(insert(Product), [
+            {
+                "tenant_id": tenant_id, "category_id": category_id, "name": name, "sku": f"BG-{i:06d}",
+                "barcode": f"38{i:011d}", "price": Decimal("2.49"), "vat_rate": Decimal("20.00"),
+                "stock_quantity": 10, "is_active": True,
+            }
+            for i, name in enumerate(_catalog(rng))
+        ])
+        db.commit()
+        products = db.query(Product.id, Product.name, Product.sku).filter(Product.tenant_id == tenant_id).all()
+        targets = rng.sample(products, QUERIES)
+        kinds = {
+            "full name": [(p.name, p.id) for p in targets],
+            "two words": [(" ".join(p.name.split()[:2]), None) for p in targets],
+            "typo": [(_typo(rng, p.name), p.id) for p in targets],
+            "sku": [(p.sku, p.id) for p in targets],
+        }
+
+        search = ProductSearch(db)
+        print(f"{len(products)} products, {QUERIES} queries per kind")
+
+        def cold():
+            search_cache.clear()
+            return search.search_ids(tenant_id, "warm up", LIMIT)
+
+        print(f"index load           {summarize(timed(cold, 3))}")
+        for kind, queries in kinds.items():
+            if kind == "two words":  # Many products share the words; only latency is meaningful
+                ranked = iter(q for q, _ in queries)
+                print(f"{kind:10} ranked   {summarize(timed(lambda: search.search_ids(tenant_id, next(ranked), LIMIT), QUERIES))}")
+                ilike = iter(q for q, _ in queries)
+                print(f"{kind:10} ILIKE    {summarize(timed(lambda: _ilike(db, tenant_id, next(ilike)), QUERIES))}")
+                continue
+            print(f"{kind:10} ranked   {_relevance(lambda q: search.search_ids(tenant_id, q, LIMIT), queries)}")
+            print(f"{kind:10} ILIKE    {_relevance(lambda q: _ilike(db, tenant_id, q), queries)}")
+            ranked = iter(q for q, _ in queries)
+            print(f"{kind:10} ranked   {summarize(timed(lambda: search.search_ids(tenant_id, next(ranked), LIMIT), QUERIES))}")
+            ilike = iter(q for q, _ in queries)
+            print(f"{kind:10} ILIKE    {summarize(timed(lambda: _ilike(db, tenant_id, next(ilike)), QUERIES))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite file by default. Set
+BENCH_DATABASE_URL to point them at a scratch Postgres database instead;
+the schema is created and dropped by the benchmark.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Callable, Iterator, List
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base
+from app.models import Tenant, User, Category, Product
+
+
+@contextmanager
+def bench_session() -> Iterator[Session]:
+    url = os.getenv("BENCH_DATABASE_URL")
+    tmp = None
+    if not url:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        url = f"sqlite:///{tmp.name}"
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        if tmp:
+            os.unlink(tmp.name)
+
+
+def seed_tenant(db: Session, products: int = 100, stock: int = 1_000_000) -> tuple:
+    """Create a tenant with an owner and `products` products, return (tenant_id, user_id)."""
+    tenant = Tenant(name="Bench Shop")
+    db.add(tenant)
+    db.flush()
+    user = User(tenant_id=tenant.id, email="bench@example.com", password_hash="x", role="owner")
+    category = Category(tenant_id=tenant.id, name="General")
+    db.add_all([user, category])
+    db.flush()
+    db.execute(insert(Product), [
+        {
+            "tenant_id": tenant.id,
+            "category_id": category.id,
+            "name": f"Product {i}",
+            "sku": f"SKU-{i:06d}",
+            "barcode": f"{i:013d}",
+            "price": Decimal("1.99") + i % 50,
+            "cost_price": Decimal("1.00") + i % 30,
+            "vat_rate": Decimal("20.00"),
+            "stock_quantity": stock,
+            "min_stock_level": 5,
+            "is_active": True,
+        }
+        for i in range(products)
+    ])
+    db.commit()
+    return tenant.id, user.id
+
+
+@contextmanager
+def count_statements(db: Session) -> Iterator[List[str]]:
+    """Collect every SQL statement sent to the database inside the block."""
+    statements: List[str] = []
+    engine = db.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def timed(fn: Callable[[], object], repeat: int) -> List[float]:
+    """Run `fn` `repeat` times and return the wall times in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms"
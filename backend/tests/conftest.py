@@ -1,18 +1,26 @@
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.config import settings
 from app.main import app
 from app.database import Base, get_db
+from app.core.cache import report_cache, catalog_cache, search_cache
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+settings.REPORT_JOB_RESULT_DIR = tempfile.mkdtemp(prefix="report_results_")
 
 
 @pytest.fixture(scope="function")
 def db():
+    report_cache.clear()  # Tenant ids restart with every fresh schema
+    catalog_cache.clear()
+    search_cache.clear()
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     try:
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from app.core.cache import TenantCache
+
+
+def test_lru_eviction_and_tenant_invalidation():
+    cache = TenantCache(max_entries=2, ttl=60)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    assert cache.get_or_compute(1, "a", lambda: compute("a")) == "a"
+    assert cache.get_or_compute(1, "b", lambda: compute("b")) == "b"
+    assert cache.get_or_compute(1, "a", lambda: compute("a")) == "a"  # hit, "b" is now oldest
+    cache.get_or_compute(2, "c", lambda: compute("c"))
+    assert cache.stats()["evictions"] == 1
+
+    cache.get_or_compute(1, "a", lambda: compute("a"))
+    cache.get_or_compute(1, "b", lambda: compute("b"))
+    assert calls == ["a", "b", "c", "b"]
+
+    cache.invalidate(1)
+    cache.get_or_compute(1, "b", lambda: compute("b"))
+    assert calls == ["a", "b", "c", "b", "b"]
+    assert cache.version(1) == 1 and cache.version(2) == 0
+
+
+def test_entries_expire_after_ttl():
+    cache = TenantCache(max_entries=10, ttl=0.05)
+    cache.get_or_compute(1, "a", lambda: 1)
+    time.sleep(0.1)
+    assert cache.get_or_compute(1, "a", lambda: 2) == 2
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = TenantCache(max_entries=10, ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "report"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(1, "k", slow))) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    while cache.stats()["coalesced"] < 7:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["report"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_failures_are_not_cached():
+    cache = TenantCache(max_entries=10, ttl=60)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute(1, "k", fail)
+    assert cache.get_or_compute(1, "k", lambda: "ok") == "ok"
+
+
+def test_write_during_computation_is_not_served_stale():
+    cache = TenantCache(max_entries=10, ttl=60)
+
+    def compute_then_write():
+        cache.invalidate(1)  # A sale commits while the report is being built
+        return "old"
+
+    assert cache.get_or_compute(1, "k", compute_then_write) == "old"
+    assert cache.get_or_compute(1, "k", lambda: "new") == "new"
+
+
+def test_lookup_after_invalidation_does_not_join_older_computation():
+    cache = TenantCache(max_entries=10, ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def before_write():
+        started.set()
+        release.wait(5)
+        return "old"
+
+    first = []
+    thread = threading.Thread(target=lambda: first.append(cache.get_or_compute(1, "k", before_write)))
+    thread.start()
+    started.wait(5)
+
+    cache.invalidate(1)  # The write lands while the first computation is still running
+    assert cache.get_or_compute(1, "k", lambda: "new") == "new"
+    assert cache.stats()["coalesced"] == 0
+
+    release.set()
+    thread.join()
+    assert first == ["old"]
+    assert cache.get_or_compute(1, "k", lambda: "recomputed") == "new"  # The late result did not replace it
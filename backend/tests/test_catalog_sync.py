@@ -0,0 +1,66 @@
+def _changes(client, headers, since, limit=500):
+    response = client.get(f"/api/v1/products/changes?since={since}&limit={limit}", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_changes_follow_catalog_writes(client, auth_headers):
+    category = client.post("/api/v1/products/categories", json={"name": "Drinks"}, headers=auth_headers).json()
+    cola = client.post("/api/v1/products", json={
+        "name": "Cola", "price": 2.00, "category_id": category["id"], "barcode": "111"
+    }, headers=auth_headers).json()
+    water = client.post("/api/v1/products", json={
+        "name": "Water", "price": 1.00, "category_id": category["id"]
+    }, headers=auth_headers).json()
+
+    first = _changes(client, auth_headers, 0)
+    assert [c["name"] for c in first["categories"]] == ["Drinks"]
+    assert [p["name"] for p in first["products"]] == ["Cola", "Water"]
+    assert first["cursor"] == 3 and not first["has_more"]
+    assert _changes(client, auth_headers, first["cursor"])["cursor"] == first["cursor"]
+
+    client.put(f"/api/v1/products/{cola['id']}", json={"price": 2.20}, headers=auth_headers)
+    client.delete(f"/api/v1/products/{water['id']}", headers=auth_headers)
+    second = _changes(client, auth_headers, first["cursor"])
+    assert [(p["id"], p["price"]) for p in second["products"]] == [(cola["id"], "2.20")]
+    assert second["deleted_products"] == [water["id"]]
+
+    # The category's products are sent again without it
+    client.delete(f"/api/v1/products/categories/{category['id']}", headers=auth_headers)
+    third = _changes(client, auth_headers, second["cursor"])
+    assert third["deleted_categories"] == [category["id"]]
+    assert {p["id"]: p["category_id"] for p in third["products"]} == {cola["id"]: None}
+    assert third["deleted_products"] == [water["id"]]
+
+
+def test_changes_page_by_cursor(client, auth_headers):
+    for i in range(5):
+        client.post("/api/v1/products", json={"name": f"P{i}", "price": 1.00}, headers=auth_headers)
+
+    names, cursor, pages = [], 0, 0
+    while True:
+        page = _changes(client, auth_headers, cursor, limit=2)
+        names += [p["name"] for p in page["products"]]
+        cursor, pages = page["cursor"], pages + 1
+        if not page["has_more"]:
+            break
+    assert names == [f"P{i}" for i in range(5)]
+    assert pages == 3
+
+
+def test_snapshot_is_compressed_and_continues_with_changes(client, auth_headers):
+    client.post("/api/v1/products", json={"name": "Kept", "price": 1.00}, headers=auth_headers)
+    removed = client.post("/api/v1/products", json={"name": "Removed", "price": 1.00}, headers=auth_headers).json()
+    client.delete(f"/api/v1/products/{removed['id']}", headers=auth_headers)
+
+    response = client.get("/api/v1/products/snapshot", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    snapshot = response.json()
+    assert [p["name"] for p in snapshot["products"]] == ["Kept"]
+    assert snapshot["cursor"] == 3
+
+    client.post("/api/v1/products", json={"name": "New", "price": 1.00}, headers=auth_headers)
+    assert [p["name"] for p in _changes(client, auth_headers, snapshot["cursor"])["products"]] == ["New"]
+    after = client.get("/api/v1/products/snapshot", headers=auth_headers).json()
+    assert [p["name"] for p in after["products"]] == ["Kept", "New"]
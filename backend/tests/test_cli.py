@@ -0,0 +1,8 @@
+from app import cli
+
+
+def test_export_snapshot_fails_without_pyarrow(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(cli, "PYARROW_AVAILABLE", False)
+    assert cli.main(["export-snapshot", "--out", str(tmp_path)]) == 2
+    assert "pyarrow" in capsys.readouterr().err
+    assert not list(tmp_path.iterdir())
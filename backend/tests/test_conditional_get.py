@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.core import etag as etag_module
+from tests.conftest import engine
+
+
+def _capture(call):
+    statements = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        response = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+    return response, statements
+
+
+def _get(client, url, headers, etag=None):
+    return _capture(lambda: client.get(url, headers={**headers, **({"If-None-Match": etag} if etag else {})}))
+
+
+def _assert_revalidates(client, headers, url, table):
+    first, _ = _get(client, url, headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again, statements = _get(client, url, headers, etag)
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag and not again.content
+    assert not [s for s in statements if f"FROM {table}" in s]  # Only the user and the counters are read
+    return etag
+
+
+def test_product_list_and_categories_revalidate(client, auth_headers, monkeypatch):
+    clock = [1_700_000_000.0]
+    monkeypatch.setattr(etag_module, "time", SimpleNamespace(time=lambda: clock[0]))
+    product = client.post("/api/v1/products", json={"name": "Tea", "price": 3.00, "stock_quantity": 10},
+                          headers=auth_headers).json()
+    products_etag = _assert_revalidates(client, auth_headers, "/api/v1/products", "products")
+    categories_etag = _assert_revalidates(client, auth_headers, "/api/v1/products/categories", "categories")
+
+    # Pages are tagged separately
+    other_page, _ = _get(client, "/api/v1/products?skip=50", auth_headers, products_etag)
+    assert other_page.status_code == 200
+
+    # A sale takes no counter lock and keeps the tag; stock shows up in the next window
+    sale, statements = _capture(lambda: client.post("/api/v1/sales", json={
+        "items": [{"product_id": product["id"], "quantity": 1}], "payment_method": "cash", "cash_received": 10
+    }, headers=auth_headers))
+    assert sale.status_code == 200
+    assert len([s for s in statements if s.startswith("INSERT INTO tenant_counters")]) == 1  # The sale number
+    assert _get(client, "/api/v1/products", auth_headers, products_etag)[0].status_code == 304
+    assert _get(client, "/api/v1/products/categories", auth_headers, categories_etag)[0].status_code == 304
+
+    clock[0] += settings.PRODUCT_LIST_STOCK_WINDOW_SECONDS
+    next_window, _ = _get(client, "/api/v1/products", auth_headers, products_etag)
+    assert next_window.status_code == 200
+    assert next_window.json()["items"][0]["stock_quantity"] == 9
+
+    client.post("/api/v1/products/categories", json={"name": "Hot drinks"}, headers=auth_headers)
+    assert _get(client, "/api/v1/products/categories", auth_headers, categories_etag)[0].status_code == 200
+
+
+def test_settings_and_suppliers_revalidate(client, auth_headers):
+    client.post("/api/v1/suppliers", json={"name": "Metro"}, headers=auth_headers)
+    suppliers_etag = _assert_revalidates(client, auth_headers, "/api/v1/suppliers", "suppliers")
+    settings_etag = _assert_revalidates(client, auth_headers, "/api/v1/settings", "tenant_settings")
+
+    client.put("/api/v1/settings/vat-rates", json={"standard": 20, "reduced": 9, "zero": 0}, headers=auth_headers)
+    assert _get(client, "/api/v1/settings", auth_headers, settings_etag)[0].status_code == 200
+    assert _get(client, "/api/v1/suppliers", auth_headers, suppliers_etag)[0].status_code == 304
+
+    supplier = client.get("/api/v1/suppliers", headers=auth_headers).json()[0]
+    client.put(f"/api/v1/suppliers/{supplier['id']}", json={"phone": "0888"}, headers=auth_headers)
+    changed, _ = _get(client, "/api/v1/suppliers", auth_headers, suppliers_etag)
+    assert changed.status_code == 200 and changed.json()[0]["phone"] == "0888"
@@ -0,0 +1,71 @@
+from sqlalchemy import event
+
+from tests.conftest import engine
+from tests.test_reports import _product, _sell
+
+
+def _count_queries(call):
+    statements = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        result = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+    return result, statements
+
+
+def test_dashboard_kpis(client, auth_headers):
+    product = _product(client, auth_headers)
+    client.post("/api/v1/products", json={
+        "name": "Scarce", "price": 5.00, "stock_quantity": 1, "min_stock_level": 3
+    }, headers=auth_headers)
+    _sell(client, auth_headers, product["id"], 1, "cash")
+    sale = _sell(client, auth_headers, product["id"], 2, "card")
+    today = sale["created_at"][:10]
+
+    response, statements = _count_queries(
+        lambda: client.get(f"/api/v1/dashboard?today={today}", headers=auth_headers)
+    )
+    assert response.status_code == 200
+    # User lookup, rollup comparison, inventory, recent sales, top products
+    assert len(statements) <= 5
+
+    dashboard = response.json()
+    assert dashboard["today"]["sale_count"] == 2
+    assert float(dashboard["today"]["revenue"]) == 36.00
+    assert dashboard["today"]["previous_sale_count"] == 0
+    assert dashboard["today"]["revenue_change_percent"] is None
+    assert dashboard["week"]["sale_count"] == 2
+    assert dashboard["month"]["sale_count"] == 2
+    assert float(dashboard["average_ticket"]) == 18.00
+    assert dashboard["inventory"] == {
+        "active_products": 2, "stock_units": 98, "low_stock_count": 1, "out_of_stock_count": 0
+    }
+    assert dashboard["top_products"][0]["product_id"] == product["id"]
+    assert [s["id"] for s in dashboard["recent_sales"]][0] == sale["id"]
+    assert dashboard["last_sale_at"] == sale["created_at"]
+
+
+def test_dashboard_is_cached_until_a_write(client, auth_headers):
+    product = _product(client, auth_headers)
+    sale = _sell(client, auth_headers, product["id"], 1, "cash")
+    url = f"/api/v1/dashboard?today={sale['created_at'][:10]}"
+
+    first = client.get(url, headers=auth_headers).json()
+    second, statements = _count_queries(lambda: client.get(url, headers=auth_headers).json())
+    assert second == first
+    assert len(statements) == 1  # Only the user lookup
+
+    client.post("/api/v1/inventory/adjust", json={"product_id": product["id"], "quantity": -99},
+                headers=auth_headers)
+    third = client.get(url, headers=auth_headers).json()
+    assert third["inventory"]["out_of_stock_count"] == 1
+
+    client.post("/api/v1/inventory/adjust", json={"product_id": product["id"], "quantity": 10},
+                headers=auth_headers)
+    _sell(client, auth_headers, product["id"], 1, "card")
+    assert client.get(url, headers=auth_headers).json()["today"]["sale_count"] == 2
@@ -0,0 +1,126 @@
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.models.sale import Sale, SaleItem
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.services.export_service import ExportService
+
+
+def _setup(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Exported, \"quoted\"",
+        "price": 2.50,
+        "vat_rate": 20,
+        "stock_quantity": 100
+    }, headers=auth_headers).json()
+    other = client.post("/api/v1/products", json={
+        "name": "Other", "price": 1.00, "vat_rate": 9, "stock_quantity": 100
+    }, headers=auth_headers).json()
+    sales = [
+        client.post("/api/v1/sales", json={
+            "items": [{"product_id": product["id"], "quantity": 2}, {"product_id": other["id"], "quantity": 1}],
+            "payment_method": "cash"
+        }, headers=auth_headers).json(),
+        client.post("/api/v1/sales", json={
+            "items": [{"product_id": other["id"], "quantity": 3}],
+            "payment_method": "card"
+        }, headers=auth_headers).json(),
+    ]
+    return product, sales
+
+
+def test_export_sale_lines_as_csv(client, auth_headers):
+    product, sales = _setup(client, auth_headers)
+    day = sales[0]["created_at"][:10]
+
+    response = client.get(f"/api/v1/reports/export?start_date={day}&end_date={day}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(int(r["sale_id"]), r["product_name"], int(r["quantity"])) for r in rows] == [
+        (sales[0]["id"], product["name"], 2),
+        (sales[0]["id"], "Other", 1),
+        (sales[1]["id"], "Other", 3),
+    ]
+    assert rows[0]["unit_price"] == "2.50"
+
+
+def test_export_sales_as_gzipped_ndjson(client, auth_headers):
+    _, sales = _setup(client, auth_headers)
+    day = sales[0]["created_at"][:10]
+
+    response = client.get(f"/api/v1/reports/export?start_date={day}&end_date={day}&rows=sales&format=ndjson&gzip=true",
+                          headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+
+    records = [json.loads(line) for line in gzip.decompress(response.content).decode().splitlines()]
+    assert [r["sale_number"] for r in records] == [s["sale_number"] for s in sales]
+    assert records[1]["total"] == "3.27"
+
+
+def test_export_rejects_inverted_range(client, auth_headers):
+    response = client.get("/api/v1/reports/export?start_date=2024-02-01&end_date=2024-01-01", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def _seed_sales(db, days, sales_per_day, lines_per_sale=3):
+    tenant = Tenant(name="Export Shop")
+    db.add(tenant)
+    db.flush()
+    user = User(tenant_id=tenant.id, email="export@example.com", password_hash="x", role="owner")
+    db.add(user)
+    db.flush()
+    sale_id, sales, lines = 0, [], []
+    for day in range(days):
+        for n in range(sales_per_day):
+            sale_id += 1
+            sales.append({
+                "id": sale_id, "tenant_id": tenant.id, "user_id": user.id, "sale_number": f"S{sale_id:08d}",
+                "subtotal": Decimal("30.00"), "vat_amount": Decimal("6.00"), "total": Decimal("36.00"),
+                "payment_method": "card", "status": "completed",
+                "created_at": datetime(2024, 3, 1 + day, 8) + timedelta(seconds=n)
+            })
+            lines.extend({
+                "sale_id": sale_id, "product_name": f"Product {line}", "quantity": 1,
+                "unit_price": Decimal("10.00"), "vat_rate": Decimal("20.00"), "vat_amount": Decimal("2.00"),
+                "total": Decimal("12.00")
+            } for line in range(lines_per_sale))
+    db.execute(insert(Sale), sales)
+    db.execute(insert(SaleItem), lines)
+    db.commit()
+    return tenant.id
+
+
+def _export_peak(db, tenant_id, start, end):
+    """Peak traced memory (bytes) while streaming an export, and the size of the export"""
+    size = 0
+    tracemalloc.start()
+    try:
+        for chunk in ExportService(db).stream(tenant_id, start, end):
+            size += len(chunk)
+        return tracemalloc.get_traced_memory()[1], size
+    finally:
+        tracemalloc.stop()
+
+
+def test_export_stream_memory_stays_flat(db, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 200)  # Keep the fetch buffer small next to the data
+    tenant_id = _seed_sales(db, days=12, sales_per_day=1000)
+    _export_peak(db, tenant_id, date(2024, 3, 1), date(2024, 3, 1))  # Warm up caches and compiled statements
+
+    one_day, one_day_size = _export_peak(db, tenant_id, date(2024, 3, 1), date(2024, 3, 1))
+    all_days, all_days_size = _export_peak(db, tenant_id, date(2024, 3, 1), date(2024, 3, 12))
+    assert all_days_size > 11 * one_day_size  # 36k lines against 3k
+    assert all_days < one_day * 1.25  # 12 times the rows, about the same peak
+    assert all_days < all_days_size / 3  # Far less than holding the export
@@ -0,0 +1,135 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.services.idempotency_service import IdempotencyService
+from app.services.sale_service import SaleService
+from tests.conftest import TestingSessionLocal
+
+
+def _product(client, auth_headers):
+    return client.post("/api/v1/products", json={
+        "name": "Retry Product",
+        "price": 10.00,
+        "vat_rate": 0,
+        "stock_quantity": 10
+    }, headers=auth_headers).json()
+
+
+def test_retry_returns_stored_sale(client, auth_headers):
+    product = _product(client, auth_headers)
+    headers = {**auth_headers, "Idempotency-Key": "till-1-0001"}
+    payload = {"items": [{"product_id": product["id"], "quantity": 2}], "payment_method": "card"}
+
+    first = client.post("/api/v1/sales", json=payload, headers=headers)
+    retry = client.post("/api/v1/sales", json=payload, headers=headers)
+
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    stock = client.get(f"/api/v1/products/{product['id']}", headers=auth_headers).json()["stock_quantity"]
+    assert stock == 8
+    assert client.get("/api/v1/sales", headers=auth_headers).json()["total"] == 1
+
+
+def test_key_reused_with_different_payload(client, auth_headers):
+    product = _product(client, auth_headers)
+    headers = {**auth_headers, "Idempotency-Key": "till-1-0002"}
+
+    client.post("/api/v1/sales", json={
+        "items": [{"product_id": product["id"], "quantity": 1}], "payment_method": "card"
+    }, headers=headers)
+    response = client.post("/api/v1/sales", json={
+        "items": [{"product_id": product["id"], "quantity": 5}], "payment_method": "card"
+    }, headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_failed_sale_can_be_retried(client, auth_headers):
+    product = _product(client, auth_headers)
+    headers = {**auth_headers, "Idempotency-Key": "till-1-0003"}
+    payload = {"items": [{"product_id": 999999, "quantity": 1}], "payment_method": "card"}
+
+    assert client.post("/api/v1/sales", json=payload, headers=headers).status_code == 400
+    assert client.post("/api/v1/sales", json=payload, headers=headers).status_code == 400
+
+    payload["items"][0]["product_id"] = product["id"]
+    headers["Idempotency-Key"] = "till-1-0004"
+    assert client.post("/api/v1/sales", json=payload, headers=headers).status_code == 200
+
+
+def test_concurrent_duplicate_waits_for_first_request(client, auth_headers):
+    tenant_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["tenant_id"]
+    first_session = TestingSessionLocal()
+    second_session = TestingSessionLocal()
+    try:
+        first = IdempotencyService(first_session)
+        record = first.begin(tenant_id, "till-2-0001", "hash")
+        assert record.status == "in_progress"
+
+        replayed = {}
+
+        def duplicate():
+            replayed["record"] = IdempotencyService(second_session).begin(tenant_id, "till-2-0001", "hash")
+
+        thread = threading.Thread(target=duplicate)
+        thread.start()
+        time.sleep(0.2)
+        assert thread.is_alive()
+
+        first.complete(record, '{"ok": true}')
+        first_session.commit()
+        thread.join(timeout=5)
+
+        assert replayed["record"].status == "completed"
+        assert replayed["record"].response_body == '{"ok": true}'
+    finally:
+        first_session.close()
+        second_session.close()
+
+
+def test_claim_is_released_after_unexpected_error(client, auth_headers, monkeypatch):
+    product = _product(client, auth_headers)
+    headers = {**auth_headers, "Idempotency-Key": "till-3-0001"}
+    payload = {"items": [{"product_id": product["id"], "quantity": 1}], "payment_method": "card"}
+
+    def broken(self, *args, **kwargs):
+        raise OperationalError("INSERT INTO sales", {}, Exception("connection lost"))
+
+    monkeypatch.setattr(SaleService, "add_sale", broken)
+    with pytest.raises(OperationalError):
+        client.post("/api/v1/sales", json=payload, headers=headers)
+    monkeypatch.undo()
+
+    retry = client.post("/api/v1/sales", json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def test_in_progress_claim_is_only_leased(client, auth_headers):
+    tenant_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["tenant_id"]
+    session = TestingSessionLocal()
+    try:
+        service = IdempotencyService(session)
+        record = service.begin(tenant_id, "till-3-0002", "hash")
+        lease = record.expires_at - datetime.utcnow()
+        assert lease <= timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+
+        # A crashed request's claim is taken over once the lease runs out
+        record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+        retry = service.begin(tenant_id, "till-3-0002", "hash")
+        assert retry.status == "in_progress"
+
+        service.complete(retry, '{"ok": true}')
+        session.commit()
+        assert retry.expires_at - datetime.utcnow() > timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS - 1)
+    finally:
+        session.close()
@@ -0,0 +1,78 @@
+import json
+
+from app.models.outbox import OutboxEvent
+from app.workers.handlers import HANDLERS
+from app.workers.outbox_worker import OutboxWorker
+from tests.conftest import TestingSessionLocal
+
+
+def _sell(client, auth_headers, product_id, quantity):
+    return client.post("/api/v1/sales", json={
+        "items": [{"product_id": product_id, "quantity": quantity}],
+        "payment_method": "card"
+    }, headers=auth_headers).json()
+
+
+def test_worker_journals_stock_movements(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Journaled",
+        "price": 1.00,
+        "stock_quantity": 10
+    }, headers=auth_headers).json()
+    sale = _sell(client, auth_headers, product["id"], 3)
+
+    history = f"/api/v1/inventory/history/{product['id']}"
+    assert client.get(history, headers=auth_headers).json() == []
+
+    assert OutboxWorker(TestingSessionLocal).run_once() == 1
+
+    movements = client.get(history, headers=auth_headers).json()
+    assert [(m["quantity"], m["type"], m["reference_id"]) for m in movements] == [(-3, "sale", sale["id"])]
+
+
+def test_worker_publishes_low_stock_once(client, auth_headers, db):
+    product = client.post("/api/v1/products", json={
+        "name": "Nearly Gone",
+        "price": 1.00,
+        "stock_quantity": 6,
+        "min_stock_level": 3
+    }, headers=auth_headers).json()
+    for _ in range(3):
+        _sell(client, auth_headers, product["id"], 2)  # 4, 2 (crosses), 0
+
+    OutboxWorker(TestingSessionLocal).run_once()
+
+    alerts = db.query(OutboxEvent).filter(OutboxEvent.event_type == "product.low_stock").all()
+    assert [json.loads(a.payload)["stock_quantity"] for a in alerts] == [2]
+
+
+def test_failed_event_is_retried_and_blocks_later_events(client, auth_headers, db):
+    product = client.post("/api/v1/products", json={
+        "name": "Flaky",
+        "price": 1.00,
+        "stock_quantity": 10
+    }, headers=auth_headers).json()
+    first = _sell(client, auth_headers, product["id"], 1)
+    _sell(client, auth_headers, product["id"], 1)
+
+    applied = []
+
+    def flaky(db, tenant_id, payload):
+        if payload["sale_id"] == first["id"] and not applied:
+            applied.append("failed")
+            raise RuntimeError("downstream unavailable")
+        applied.append(payload["sale_id"])
+
+    worker = OutboxWorker(TestingSessionLocal, handlers={**HANDLERS, "sale.completed": [flaky]})
+    assert worker.run_once() == 0
+
+    db.expire_all()
+    events = db.query(OutboxEvent).order_by(OutboxEvent.id).all()
+    assert [(e.status, e.attempts) for e in events] == [("pending", 1), ("pending", 0)]
+    assert "downstream unavailable" in events[0].last_error
+
+    # Make the retry due now; both events are then applied in order
+    events[0].available_at = events[0].created_at
+    db.commit()
+    assert worker.run_once() == 2
+    assert applied[1:] == [first["id"], first["id"] + 1]
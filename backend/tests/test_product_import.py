@@ -0,0 +1,77 @@
+import json
+
+
+def _import(client, headers, name, content):
+    if isinstance(content, str):
+        content = content.encode()
+    response = client.post("/api/v1/products/import", files={"file": (name, content)}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def _products(client, headers):
+    return {p["sku"] or p["barcode"]: p for p in client.get("/api/v1/products", headers=headers).json()["items"]}
+
+
+def test_csv_import_creates_then_updates(client, auth_headers):
+    existing = client.post("/api/v1/products", json={
+        "name": "Cola", "sku": "COLA", "price": 2.00, "stock_quantity": 40
+    }, headers=auth_headers).json()
+
+    result = _import(client, auth_headers, "products.csv", (
+        "name,sku,barcode,price,category\n"
+        "Cola 0.5l,COLA,3800001,2.20,Drinks\n"
+        "Water,WATER,,1.00,Drinks\n"
+        "Bread,,3800003,abc,\n"
+        "Chips,,,1.50,Snacks\n"
+        "Juice,JUICE,3800001,3.00,Drinks\n"
+    ))
+    assert (result["rows"], result["created"], result["updated"], result["errors"]) == (5, 1, 1, 3)
+    assert [(e["line"], e["sku"]) for e in result["error_rows"]] == [(4, None), (5, None), (6, "JUICE")]
+    assert result["error_rows"][0]["barcode"] == "3800003" and "price" in result["error_rows"][0]["error"]
+    assert "Barcode belongs to product" in result["error_rows"][2]["error"]
+
+    products = _products(client, auth_headers)
+    assert set(products) == {"COLA", "WATER"}
+    cola = products["COLA"]
+    assert cola["id"] == existing["id"] and cola["name"] == "Cola 0.5l" and cola["price"] == "2.20"
+    assert cola["stock_quantity"] == 40  # Not in the file, so left alone
+    assert cola["category"]["name"] == products["WATER"]["category"]["name"] == "Drinks"
+    assert [c["name"] for c in client.get("/api/v1/products/categories", headers=auth_headers).json()] == ["Drinks"]
+
+    # The import shows up in delta sync and search
+    changes = client.get("/api/v1/products/changes?since=0", headers=auth_headers).json()
+    assert {p["sku"] for p in changes["products"]} == {"COLA", "WATER"}
+    assert [p["sku"] for p in client.get("/api/v1/products/search?q=water", headers=auth_headers).json()] == ["WATER"]
+
+
+def test_ndjson_import_matches_barcode_and_repeats(client, auth_headers):
+    lines = [
+        {"name": "Milk", "barcode": "4000", "price": 1.80, "stock_quantity": 5},
+        {"name": "Eggs", "sku": "EGGS", "price": 3.00},
+        {"name": "Milk 3%", "barcode": "4000", "price": 1.90},  # Same product again: the later row wins
+        "not an object",
+    ]
+    content = "\n".join(json.dumps(line) for line in lines) + "\n{broken\n"
+    result = _import(client, auth_headers, "products.ndjson", content)
+    assert (result["created"], result["updated"], result["errors"]) == (2, 1, 2)
+    assert [e["line"] for e in result["error_rows"]] == [4, 5]
+
+    # A semicolon CSV from a decimal-comma spreadsheet gives the barcode-only product its SKU
+    result = _import(client, auth_headers, "prices.csv", "sku;barcode;name;price\nMILK;4000;Milk 3%;2,05\n")
+    assert (result["created"], result["updated"], result["errors"]) == (0, 1, 0)
+    milk = _products(client, auth_headers)["MILK"]
+    assert (milk["barcode"], milk["price"], milk["stock_quantity"]) == ("4000", "2.05", 5)
+
+
+def test_import_refuses_lines_that_are_not_utf8(client, auth_headers):
+    # Excel saves "CSV" in the Windows code page; only the line with a non-ASCII name fails to decode
+    content = "name,sku,price\nCoffee,COFFEE,3.00\nCr\u00e8me br\u00fbl\u00e9e,CREME,4.50\nTea,TEA,2.00\n"
+    result = _import(client, auth_headers, "products.csv", content.encode("cp1252"))
+    assert (result["rows"], result["created"], result["errors"]) == (3, 2, 1)
+    assert result["error_rows"][0]["line"] == 3 and "UTF-8" in result["error_rows"][0]["error"]
+    assert set(_products(client, auth_headers)) == {"COFFEE", "TEA"}
+
+    line = '{"name": "Caf\u00e9", "sku": "CAFE", "price": 2}\n'
+    result = _import(client, auth_headers, "products.ndjson", line.encode("latin-1"))
+    assert (result["created"], result["errors"]) == (0, 1)
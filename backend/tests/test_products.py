@@ -48,3 +48,47 @@ def test_update_product(client, auth_headers):
     }, headers=auth_headers)
     assert response.status_code == 200
     assert response.json()["name"] == "New Name"
+
+
+def test_lookup_by_barcode_and_sku(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Scanned", "price": 2.50, "barcode": "3800000000017", "sku": "SC-1"
+    }, headers=auth_headers).json()
+
+    response = client.get("/api/v1/products/by-barcode/3800000000017", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == product["id"]
+    assert client.get("/api/v1/products/by-barcode/SC-1", headers=auth_headers).json()["id"] == product["id"]
+    assert client.get("/api/v1/products/by-barcode/0000", headers=auth_headers).status_code == 404
+
+    # Writes drop the tenant's index
+    client.put(f"/api/v1/products/{product['id']}", json={"price": 3.00, "barcode": "3800000000024"},
+               headers=auth_headers)
+    assert client.get("/api/v1/products/by-barcode/3800000000017", headers=auth_headers).status_code == 404
+    assert float(client.get("/api/v1/products/by-barcode/3800000000024", headers=auth_headers).json()["price"]) == 3.00
+
+    client.delete(f"/api/v1/products/{product['id']}", headers=auth_headers)
+    assert client.get("/api/v1/products/by-barcode/3800000000024", headers=auth_headers).status_code == 404
+
+
+def test_search_ranks_and_tolerates_typos(client, auth_headers):
+    def search(q):
+        return [p["name"] for p in client.get(f"/api/v1/products/search?q={q}", headers=auth_headers).json()]
+
+    for name, sku in [("Chocolate Milk", "DR-2"), ("Milk 1L", "DR-1"), ("Fresh Milk 2L", "DR-3"), ("Bread", "BK-1")]:
+        client.post("/api/v1/products", json={"name": name, "price": 1.00, "sku": sku}, headers=auth_headers)
+
+    # Name prefix first, then word prefix, then the rest
+    assert search("milk") == ["Milk 1L", "Fresh Milk 2L", "Chocolate Milk"]
+    assert search("chocolte")[0] == "Chocolate Milk"
+    assert search("BK-1") == ["Bread"]  # An exact code returns that product only
+    assert search("zzz") == []
+
+    # Writes are applied to the cached index in place
+    bread = client.get("/api/v1/products/search?q=bread", headers=auth_headers).json()[0]
+    client.put(f"/api/v1/products/{bread['id']}", json={"name": "Rye Bread"}, headers=auth_headers)
+    assert search("rye") == ["Rye Bread"]
+    client.delete(f"/api/v1/products/{bread['id']}", headers=auth_headers)
+    assert search("bread") == []
+    client.post("/api/v1/products", json={"name": "Milkshake", "price": 3.00}, headers=auth_headers)
+    assert search("milk")[0] in ("Milk 1L", "Milkshake")
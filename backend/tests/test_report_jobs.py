@@ -0,0 +1,112 @@
+import gzip
+import os
+import time
+from datetime import datetime, timedelta
+
+from app.models.report_job import ReportJob
+from app.services.report_job_service import ReportJobService
+from app.workers.report_jobs import ReportJobWorker, job_pool
+from tests.conftest import TestingSessionLocal
+from tests.test_reports import _product, _sell, _tenant_id
+
+
+def _wait(client, auth_headers, job_id):
+    for _ in range(100):
+        job = client.get(f"/api/v1/reports/jobs/{job_id}", headers=auth_headers).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_range_job_beyond_sync_limit(client, auth_headers):
+    product = _product(client, auth_headers)
+    sale = _sell(client, auth_headers, product["id"], 2, "cash")
+    today = sale["created_at"][:10]
+    start = f"{int(today[:4]) - 2}{today[4:]}"
+
+    assert client.get(f"/api/v1/reports/range?start_date={start}&end_date={today}",
+                      headers=auth_headers).status_code == 400
+
+    try:
+        response = client.post("/api/v1/reports/jobs", json={
+            "kind": "range", "start_date": start, "end_date": today
+        }, headers=auth_headers)
+        assert response.status_code == 202
+        job = _wait(client, auth_headers, response.json()["id"])
+    finally:
+        job_pool.shutdown()
+    assert job["status"] == "done"
+    assert job["expires_at"] is not None
+
+    result = client.get(f"/api/v1/reports/jobs/{job['id']}/result", headers=auth_headers)
+    assert result.status_code == 200
+    report = result.json()
+    assert len(report["daily_breakdown"]) > 700
+    assert float(report["total_revenue"]) == float(sale["total"])
+
+
+def test_export_job_result_is_gzipped(client, auth_headers):
+    product = _product(client, auth_headers)
+    sale = _sell(client, auth_headers, product["id"], 1, "card")
+    today = sale["created_at"][:10]
+
+    try:
+        response = client.post("/api/v1/reports/jobs", json={
+            "kind": "export", "start_date": today, "end_date": today, "rows": "sales", "format": "csv"
+        }, headers=auth_headers)
+        job = _wait(client, auth_headers, response.json()["id"])
+    finally:
+        job_pool.shutdown()
+    assert job["status"] == "done"
+
+    result = client.get(f"/api/v1/reports/jobs/{job['id']}/result", headers=auth_headers)
+    assert result.headers["content-type"] == "application/gzip"
+    lines = gzip.decompress(result.content).decode().splitlines()
+    assert len(lines) == 2
+    assert sale["sale_number"] in lines[1]
+
+    # The result lives in a file, which goes with the expired job
+    session = TestingSessionLocal()
+    try:
+        stored = session.get(ReportJob, job["id"])
+        path = ReportJobService.result_file(stored)
+        assert os.path.getsize(path) == len(result.content)
+        stored.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        session.commit()
+        assert ReportJobService(session).purge_expired() == 1
+        assert not os.path.exists(path)
+    finally:
+        session.close()
+
+
+def test_unknown_and_unfinished_jobs(client, auth_headers, db):
+    assert client.get("/api/v1/reports/jobs/999", headers=auth_headers).status_code == 404
+    tenant_id = _tenant_id(client, auth_headers)
+    job = ReportJob(tenant_id=tenant_id, user_id=1, kind="range",
+                    params='{"start_date": "2024-01-01", "end_date": "2024-01-02"}', status="queued")
+    db.add(job)
+    db.commit()
+    assert client.get(f"/api/v1/reports/jobs/{job.id}/result", headers=auth_headers).status_code == 409
+
+
+def test_claim_respects_tenant_limit(client, auth_headers, db):
+    tenant_id = _tenant_id(client, auth_headers)
+    params = '{"start_date": "2024-01-01", "end_date": "2024-01-02"}'
+    db.add_all([
+        ReportJob(tenant_id=tenant_id, user_id=1, kind="range", params=params, status="queued"),
+        ReportJob(tenant_id=tenant_id, user_id=1, kind="range", params=params, status="queued"),
+        ReportJob(tenant_id=tenant_id + 1, user_id=1, kind="range", params=params, status="queued"),
+    ])
+    db.commit()
+
+    worker = ReportJobWorker(TestingSessionLocal, tenant_limit=1)
+    session = TestingSessionLocal()
+    try:
+        first = worker.claim(session)
+        second = worker.claim(session)
+        assert first.tenant_id == tenant_id
+        assert second.tenant_id == tenant_id + 1  # The first tenant is at its limit
+        assert worker.claim(session) is None
+    finally:
+        session.close()
@@ -0,0 +1,282 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from app.models.rollup import HourlySalesRollup
+from app.services.rollup_service import RollupService
+from tests.conftest import TestingSessionLocal
+
+
+def _product(client, auth_headers, price=10.00):
+    return client.post("/api/v1/products", json={
+        "name": "Reported",
+        "price": price,
+        "vat_rate": 20,
+        "stock_quantity": 100
+    }, headers=auth_headers).json()
+
+
+def _sell(client, auth_headers, product_id, quantity, method):
+    return client.post("/api/v1/sales", json={
+        "items": [{"product_id": product_id, "quantity": quantity}],
+        "payment_method": method
+    }, headers=auth_headers).json()
+
+
+def _tenant_id(client, auth_headers):
+    return client.get("/api/v1/auth/me", headers=auth_headers).json()["tenant_id"]
+
+
+def test_daily_summary_from_rollup(client, auth_headers):
+    product = _product(client, auth_headers)
+    _sell(client, auth_headers, product["id"], 1, "cash")
+    _sell(client, auth_headers, product["id"], 2, "card")
+    refunded = _sell(client, auth_headers, product["id"], 3, "card")
+
+    response = client.put(f"/api/v1/sales/{refunded['id']}/status", json={"status": "refunded"},
+                          headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "refunded"
+
+    today = refunded["created_at"][:10]
+    summary = client.get(f"/api/v1/reports/daily?report_date={today}", headers=auth_headers).json()
+    assert summary["total_sales"] == 2
+    assert float(summary["total_revenue"]) == 36.00
+    assert float(summary["total_vat"]) == 6.00
+    assert float(summary["cash_sales"]) == 12.00
+    assert float(summary["card_sales"]) == 24.00
+
+
+def test_rollup_rebuild_and_verify(client, auth_headers):
+    product = _product(client, auth_headers)
+    _sell(client, auth_headers, product["id"], 1, "cash")
+    sale = _sell(client, auth_headers, product["id"], 1, "card")
+    tenant_id = _tenant_id(client, auth_headers)
+
+    session = TestingSessionLocal()
+    try:
+        service = RollupService(session)
+        assert service.verify(tenant_id) == []
+
+        session.execute(text("DELETE FROM daily_sales_rollup"))
+        session.commit()
+        assert len(service.verify(tenant_id)) == 2
+
+        service.rebuild(tenant_id)
+        assert service.verify(tenant_id) == []
+    finally:
+        session.close()
+
+    summary = client.get(f"/api/v1/reports/daily?report_date={sale['created_at'][:10]}", headers=auth_headers).json()
+    assert summary["total_sales"] == 2
+
+
+def test_date_range_report_fills_empty_days(client, auth_headers):
+    product = _product(client, auth_headers)
+    _sell(client, auth_headers, product["id"], 1, "cash")
+    sale = _sell(client, auth_headers, product["id"], 2, "card")
+
+    sold_on = date.fromisoformat(sale["created_at"][:10])
+    start, end = sold_on - timedelta(days=3), sold_on + timedelta(days=2)
+    report = client.get(f"/api/v1/reports/range?start_date={start}&end_date={end}",
+                        headers=auth_headers).json()
+
+    daily = report["daily_breakdown"]
+    assert [d["date"] for d in daily] == [str(start + timedelta(days=n)) for n in range(6)]
+    assert [d["total_sales"] for d in daily] == [0, 0, 0, 2, 0, 0]
+    assert float(daily[3]["cash_sales"]) == 12.00
+    assert float(daily[3]["card_sales"]) == 24.00
+    assert report["total_sales"] == 2
+    assert float(report["total_revenue"]) == 36.00
+
+
+def test_date_range_report_rejects_bad_ranges(client, auth_headers):
+    response = client.get("/api/v1/reports/range?start_date=2024-02-01&end_date=2024-01-01",
+                          headers=auth_headers)
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/reports/range?start_date=2020-01-01&end_date=2024-01-01",
+                          headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_sales_by_product_and_category(client, auth_headers):
+    category = client.post("/api/v1/products/categories", json={"name": "Drinks"}, headers=auth_headers).json()
+    cheap = client.post("/api/v1/products", json={
+        "name": "Water", "price": 1.00, "vat_rate": 20, "stock_quantity": 100, "category_id": category["id"]
+    }, headers=auth_headers).json()
+    dear = _product(client, auth_headers, price=50.00)
+    sale = _sell(client, auth_headers, cheap["id"], 10, "cash")
+    _sell(client, auth_headers, dear["id"], 1, "card")
+    refunded = _sell(client, auth_headers, dear["id"], 4, "card")
+    client.put(f"/api/v1/sales/{refunded['id']}/status", json={"status": "refunded"}, headers=auth_headers)
+
+    day = sale["created_at"][:10]
+    url = f"/api/v1/reports/by-product?start_date={day}&end_date={day}"
+    by_revenue = client.get(url, headers=auth_headers).json()
+    assert [(r["product_id"], r["quantity_sold"]) for r in by_revenue] == [(dear["id"], 1), (cheap["id"], 10)]
+    assert float(by_revenue[0]["revenue"]) == 60.00
+
+    by_quantity = client.get(url + "&order_by=quantity", headers=auth_headers).json()
+    assert [r["product_id"] for r in by_quantity] == [cheap["id"], dear["id"]]
+
+    page = client.get(url + "&skip=1&limit=1", headers=auth_headers).json()
+    assert [r["product_id"] for r in page] == [cheap["id"]]
+
+    categories = client.get(f"/api/v1/reports/by-category?start_date={day}&end_date={day}",
+                            headers=auth_headers).json()
+    assert [(r["category_name"], r["quantity_sold"]) for r in categories] == [(None, 1), ("Drinks", 10)]
+
+
+def test_cached_daily_summary_sees_new_sales(client, auth_headers):
+    product = _product(client, auth_headers)
+    sale = _sell(client, auth_headers, product["id"], 1, "cash")
+    url = f"/api/v1/reports/daily?report_date={sale['created_at'][:10]}"
+
+    assert client.get(url, headers=auth_headers).json()["total_sales"] == 1
+    assert client.get(url, headers=auth_headers).json()["total_sales"] == 1
+    stats = client.get("/api/v1/reports/cache-stats", headers=auth_headers).json()
+    assert stats["hits"] == 1
+
+    _sell(client, auth_headers, product["id"], 1, "card")
+    assert client.get(url, headers=auth_headers).json()["total_sales"] == 2
+
+
+def test_heatmap_in_tenant_local_time(client, auth_headers):
+    business = client.get("/api/v1/settings/business", headers=auth_headers).json()
+    response = client.put("/api/v1/settings/business", json={**business, "timezone": "Europe/Sofia"},
+                          headers=auth_headers)
+    assert response.status_code == 200
+    tenant_id = _tenant_id(client, auth_headers)
+
+    session = TestingSessionLocal()
+    try:
+        session.add_all([
+            # Monday 2024-03-04 22:00 UTC is Tuesday 00:00 in Sofia (UTC+2)
+            HourlySalesRollup(tenant_id=tenant_id, business_date=date(2024, 3, 4), hour=22,
+                              sale_count=3, revenue=Decimal("30.00")),
+            HourlySalesRollup(tenant_id=tenant_id, business_date=date(2024, 3, 5), hour=9,
+                              sale_count=1, revenue=Decimal("5.50")),
+            # Sofia is on summer time (UTC+3) by 2024-04-02
+            HourlySalesRollup(tenant_id=tenant_id, business_date=date(2024, 4, 2), hour=9,
+                              sale_count=2, revenue=Decimal("7.00")),
+        ])
+        session.commit()
+    finally:
+        session.close()
+
+    heatmap = client.get("/api/v1/reports/heatmap?start_date=2024-03-05&end_date=2024-04-02",
+                         headers=auth_headers).json()
+    assert heatmap["timezone"] == "Europe/Sofia"
+    assert heatmap["transactions"][1][0] == 3
+    assert heatmap["transactions"][1][11] == 1
+    assert heatmap["transactions"][1][12] == 2
+    assert float(heatmap["revenue"][1][0]) == 30.00
+    assert sum(map(sum, heatmap["transactions"])) == 6
+
+    heatmap = client.get("/api/v1/reports/heatmap?start_date=2024-03-04&end_date=2024-03-04",
+                         headers=auth_headers).json()
+    assert sum(map(sum, heatmap["transactions"])) == 0
+
+
+def test_business_timezone_is_validated(client, auth_headers):
+    business = client.get("/api/v1/settings/business", headers=auth_headers).json()
+    response = client.put("/api/v1/settings/business", json={**business, "timezone": "Mars/Olympus"},
+                          headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_abc_classification(client, auth_headers):
+    products = [_product(client, auth_headers, price=price) for price in (70.00, 20.00, 6.00, 4.00)]
+    idle = _product(client, auth_headers, price=1.00)
+    for product in products:
+        sale = _sell(client, auth_headers, product["id"], 1, "cash")
+    day = sale["created_at"][:10]
+
+    report = client.get(f"/api/v1/reports/abc?start_date={day}&end_date={day}", headers=auth_headers).json()
+    assert [i["product_id"] for i in report["items"]] == [p["id"] for p in products] + [idle["id"]]
+    # Cumulative shares 0.7, 0.9, 0.96, 1.0, 1.0; the class follows the share ranked above
+    assert [i["abc_class"] for i in report["items"]] == ["A", "A", "B", "C", "C"]
+    assert report["class_counts"] == {"A": 2, "B": 1, "C": 2}
+    assert float(report["total_value"]) == 120.00
+    assert report["items"][1]["cumulative_share"] == pytest.approx(0.9)
+
+    page = client.get(f"/api/v1/reports/abc?start_date={day}&end_date={day}&a_threshold=0.6&skip=1&limit=2",
+                      headers=auth_headers).json()
+    assert [i["abc_class"] for i in page["items"]] == ["B", "B"]
+    assert page["total_products"] == 5
+
+    response = client.get(f"/api/v1/reports/abc?start_date={day}&end_date={day}&a_threshold=0.9&b_threshold=0.5",
+                          headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_margin_report_uses_cost_at_sale_time(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Costed", "price": 10.00, "cost_price": 6.00, "vat_rate": 20, "stock_quantity": 100
+    }, headers=auth_headers).json()
+    _sell(client, auth_headers, product["id"], 2, "cash")
+    client.put(f"/api/v1/products/{product['id']}", json={"cost_price": 9.00}, headers=auth_headers)
+    sale = _sell(client, auth_headers, product["id"], 1, "card")
+    day = sale["created_at"][:10]
+
+    def margin(group_by):
+        return client.get(f"/api/v1/reports/margin?start_date={day}&end_date={day}&group_by={group_by}",
+                          headers=auth_headers).json()
+
+    report = margin("product")
+    assert float(report["net_revenue"]) == 30.00
+    assert float(report["cost"]) == 21.00  # 2 x 6 at the old cost, 1 x 9 at the new one
+    assert float(report["gross_margin"]) == 9.00
+    assert report["margin_percent"] == 30.0
+    assert report["items"][0]["key"] == str(product["id"])
+    assert report["items"][0]["name"] == "Costed"
+
+    assert [i["key"] for i in margin("day")["items"]] == [day]
+    assert margin("category")["items"][0]["key"] is None
+    cashiers = margin("cashier")
+    assert cashiers["items"][0]["name"] == "Test User"
+    assert float(cashiers["gross_margin"]) == 9.00
+
+    session = TestingSessionLocal()
+    try:
+        service = RollupService(session)
+        assert service.verify(_tenant_id(client, auth_headers)) == []
+        session.execute(text("UPDATE product_daily_sales SET cost = 0"))
+        session.commit()
+        assert len(service.verify(_tenant_id(client, auth_headers))) == 1
+        service.rebuild(_tenant_id(client, auth_headers))
+    finally:
+        session.close()
+    assert float(margin("product")["cost"]) == 21.00
+
+
+def test_sub_cent_vat_rounds_the_same_in_sales_and_rollups(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Sticker", "price": 0.05, "vat_rate": 5, "stock_quantity": 100
+    }, headers=auth_headers).json()
+    response = client.post("/api/v1/sales/batch", json={"sales": [
+        {"client_id": f"till-1:{n}", "items": [{"product_id": product["id"], "quantity": 1}],
+         "payment_method": "cash"}
+        for n in range(3)
+    ]}, headers=auth_headers).json()
+    assert response["created"] == 3
+    sale_ids = [r["sale_id"] for r in response["results"]]
+    sale = client.get(f"/api/v1/sales/{sale_ids[0]}", headers=auth_headers).json()
+    assert (sale["vat_amount"], sale["total"]) == ("0.00", "0.05")  # 0.0025 VAT rounds to 0.00
+
+    today = sale["created_at"][:10]
+    summary = client.get(f"/api/v1/reports/daily?report_date={today}", headers=auth_headers).json()
+    assert Decimal(summary["total_revenue"]) == Decimal("0.15")
+
+    client.put(f"/api/v1/sales/{sale_ids[0]}/status", json={"status": "refunded"}, headers=auth_headers)
+    summary = client.get(f"/api/v1/reports/daily?report_date={today}", headers=auth_headers).json()
+    assert Decimal(summary["total_revenue"]) == Decimal("0.10")
+
+    session = TestingSessionLocal()
+    try:
+        assert RollupService(session).verify(_tenant_id(client, auth_headers)) == []
+    finally:
+        session.close()
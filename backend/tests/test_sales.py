@@ -43,3 +43,205 @@ def test_sale_reduces_stock(client, auth_headers):
     # Check stock reduced
     updated = client.get(f"/api/v1/products/{product['id']}", headers=auth_headers).json()
     assert updated["stock_quantity"] == 7
+
+
+def test_sale_with_many_lines(client, auth_headers):
+    products = [
+        client.post("/api/v1/products", json={
+            "name": f"Basket {i}",
+            "price": 1.00,
+            "vat_rate": 0,
+            "stock_quantity": 10
+        }, headers=auth_headers).json()
+        for i in range(5)
+    ]
+
+    # The same product may appear on several lines
+    items = [{"product_id": p["id"], "quantity": 1} for p in products]
+    items.append({"product_id": products[0]["id"], "quantity": 2})
+    response = client.post("/api/v1/sales", json={
+        "items": items,
+        "payment_method": "card"
+    }, headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 6
+    assert float(data["total"]) == 7.00
+
+    first = client.get(f"/api/v1/products/{products[0]['id']}", headers=auth_headers).json()
+    assert first["stock_quantity"] == 7
+
+
+def test_sale_unknown_product(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Known",
+        "price": 1.00,
+        "stock_quantity": 10
+    }, headers=auth_headers).json()
+
+    response = client.post("/api/v1/sales", json={
+        "items": [
+            {"product_id": product["id"], "quantity": 1},
+            {"product_id": 999999, "quantity": 1}
+        ],
+        "payment_method": "card"
+    }, headers=auth_headers)
+    assert response.status_code == 400
+
+    unchanged = client.get(f"/api/v1/products/{product['id']}", headers=auth_headers).json()
+    assert unchanged["stock_quantity"] == 10
+
+
+def test_sale_numbers_are_sequential(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Numbered",
+        "price": 1.00,
+        "stock_quantity": 10
+    }, headers=auth_headers).json()
+
+    numbers = [
+        client.post("/api/v1/sales", json={
+            "items": [{"product_id": product["id"], "quantity": 1}],
+            "payment_method": "card"
+        }, headers=auth_headers).json()["sale_number"]
+        for _ in range(3)
+    ]
+
+    assert [n.rsplit("-", 1)[1] for n in numbers] == ["0001", "0002", "0003"]
+    assert len({n.rsplit("-", 1)[0] for n in numbers}) == 1
+
+
+def test_concurrent_sale_numbers_do_not_collide(client, auth_headers):
+    import threading
+    from app.services.counter_service import CounterService
+    from tests.conftest import TestingSessionLocal
+
+    tenant_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["tenant_id"]
+    allocated = []
+
+    def till():
+        session = TestingSessionLocal()
+        try:
+            for _ in range(20):
+                allocated.append(CounterService(session).next_value(tenant_id, "sale_number:test"))
+                session.commit()
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=till) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(allocated) == list(range(1, 101))
+
+
+def test_sales_batch_ingest(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Offline Product",
+        "price": 2.00,
+        "vat_rate": 0,
+        "stock_quantity": 100
+    }, headers=auth_headers).json()
+
+    def offline_sale(client_id, product_id=product["id"]):
+        return {
+            "client_id": client_id,
+            "client_created_at": "2024-03-01T09:30:00+02:00",
+            "items": [{"product_id": product_id, "quantity": 1}],
+            "payment_method": "cash",
+            "cash_received": 5.00
+        }
+
+    response = client.post("/api/v1/sales/batch", json={"sales": [
+        offline_sale("till-1:1"),
+        offline_sale("till-1:2", product_id=999999),
+        offline_sale("till-1:3"),
+        offline_sale("till-1:1"),
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["created", "error", "created", "duplicate"]
+    assert (data["created"], data["errors"], data["duplicates"]) == (2, 1, 1)
+    assert data["results"][0]["sale_number"] == "INV-20240301-0001"
+    assert data["results"][3]["sale_id"] == data["results"][0]["sale_id"]
+
+    sale = client.get(f"/api/v1/sales/{data['results'][0]['sale_id']}", headers=auth_headers).json()
+    assert sale["created_at"].startswith("2024-03-01T07:30:00")
+
+    # Resending the queue after a dropped response creates nothing new
+    resend = client.post("/api/v1/sales/batch", json={"sales": [
+        offline_sale("till-1:1"),
+        offline_sale("till-1:3"),
+    ]}, headers=auth_headers).json()
+    assert resend["duplicates"] == 2
+
+    stock = client.get(f"/api/v1/products/{product['id']}", headers=auth_headers).json()["stock_quantity"]
+    assert stock == 98
+
+
+def test_list_sales_cursor_pagination(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Paged",
+        "price": 1.00,
+        "stock_quantity": 100
+    }, headers=auth_headers).json()
+    for _ in range(5):
+        client.post("/api/v1/sales", json={
+            "items": [{"product_id": product["id"], "quantity": 1}],
+            "payment_method": "card"
+        }, headers=auth_headers)
+
+    first = client.get("/api/v1/sales?limit=2", headers=auth_headers).json()
+    assert first["total"] == 5
+    assert len(first["items"]) == 2
+    assert len(first["items"][0]["items"]) == 1
+
+    seen = [s["id"] for s in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(f"/api/v1/sales?limit=2&include_total=false&cursor={cursor}", headers=auth_headers).json()
+        assert page["total"] is None
+        seen += [s["id"] for s in page["items"]]
+        cursor = page["next_cursor"]
+
+    assert seen == sorted(seen, reverse=True)
+    assert len(set(seen)) == 5
+
+    # Offset paging still works
+    offset = client.get("/api/v1/sales?skip=2&limit=2", headers=auth_headers).json()
+    assert [s["id"] for s in offset["items"]] == seen[2:4]
+
+    assert client.get("/api/v1/sales?cursor=not-a-cursor", headers=auth_headers).status_code == 400
+
+
+def test_sale_summaries_with_filters(client, auth_headers):
+    product = client.post("/api/v1/products", json={
+        "name": "Filtered",
+        "price": 10.00,
+        "vat_rate": 0,
+        "stock_quantity": 100
+    }, headers=auth_headers).json()
+    for method, quantity in [("cash", 1), ("card", 2), ("card", 5)]:
+        client.post("/api/v1/sales", json={
+            "items": [{"product_id": product["id"], "quantity": quantity}],
+            "payment_method": method
+        }, headers=auth_headers)
+
+    response = client.get("/api/v1/sales/summary", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert "items" not in data["items"][0]
+    assert set(data["items"][0]) >= {"sale_number", "total", "payment_method", "status", "created_at"}
+
+    card = client.get("/api/v1/sales/summary?payment_method=card&min_total=30", headers=auth_headers).json()
+    assert [float(s["total"]) for s in card["items"]] == [50.0]
+
+    today = data["items"][0]["created_at"][:10]
+    full = client.get(f"/api/v1/sales?date_from={today}&date_to={today}&status=completed", headers=auth_headers).json()
+    assert full["total"] == 3
+    assert client.get("/api/v1/sales?date_to=2000-01-01", headers=auth_headers).json()["total"] == 0
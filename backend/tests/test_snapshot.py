@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app.services.snapshot_service import SnapshotService
+from tests.conftest import TestingSessionLocal
+
+
+def _sell(client, auth_headers, product_id, quantity):
+    return client.post("/api/v1/sales", json={
+        "items": [{"product_id": product_id, "quantity": quantity}],
+        "payment_method": "cash"
+    }, headers=auth_headers).json()
+
+
+def test_incremental_parquet_snapshot(client, auth_headers, tmp_path):
+    product = client.post("/api/v1/products", json={
+        "name": "Snap", "price": 3.33, "vat_rate": 20, "stock_quantity": 50
+    }, headers=auth_headers).json()
+    first = _sell(client, auth_headers, product["id"], 3)
+    tenant_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["tenant_id"]
+    client.post("/api/v1/inventory/adjust", json={
+        "product_id": product["id"], "quantity": 5
+    }, headers=auth_headers)
+
+    session = TestingSessionLocal()
+    try:
+        service = SnapshotService(session)
+        assert service.export(tenant_id, str(tmp_path)) == {"sales": 1, "sale_items": 1, "stock_movements": 1}
+
+        second = _sell(client, auth_headers, product["id"], 1)
+        assert service.export(tenant_id, str(tmp_path)) == {"sales": 1, "sale_items": 1, "stock_movements": 0}
+        assert service.export(tenant_id, str(tmp_path)) == {"sales": 0, "sale_items": 0, "stock_movements": 0}
+    finally:
+        session.close()
+
+    sales = pq.read_table(tmp_path / f"tenant={tenant_id}" / "sales").sort_by("id")
+    assert sales.schema.field("total").type == pa.decimal128(10, 2)
+    assert sales.column("sale_number").to_pylist() == [first["sale_number"], second["sale_number"]]
+    assert sales.column("total").to_pylist() == [Decimal(first["total"]), Decimal(second["total"])]
+
+    items = pq.read_table(tmp_path / f"tenant={tenant_id}" / "sale_items")
+    assert sorted(items.column("quantity").to_pylist()) == [1, 3]
+    assert items.column("unit_price").to_pylist() == [Decimal("3.33")] * 2
@@ -0,0 +1,115 @@
+import threading
+
+from app.models.product import Product
+from app.services.stock_service import StockService, InsufficientStockError
+from tests.conftest import TestingSessionLocal
+
+THREADS = 8
+SALES_PER_THREAD = 25
+
+
+def _create_product(client, auth_headers, stock):
+    return client.post("/api/v1/products", json={
+        "name": "Fast Mover",
+        "price": 1.00,
+        "stock_quantity": stock
+    }, headers=auth_headers).json()
+
+
+def _hammer(tenant_id, product_id, allow_negative):
+    """Decrement one unit per transaction from THREADS threads, return (sold, rejected)"""
+    sold = []
+    rejected = []
+    barrier = threading.Barrier(THREADS)
+
+    def till():
+        session = TestingSessionLocal()
+        service = StockService(session)
+        barrier.wait()
+        try:
+            for _ in range(SALES_PER_THREAD):
+                try:
+                    service.apply(tenant_id, {product_id: -1}, allow_negative=allow_negative)
+                    session.commit()
+                    sold.append(1)
+                except InsufficientStockError:
+                    session.rollback()
+                    rejected.append(1)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=till) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(sold), len(rejected)
+
+
+def _stock(db, product_id):
+    db.expire_all()
+    return db.query(Product).filter(Product.id == product_id).first().stock_quantity
+
+
+def test_concurrent_decrements_lose_no_updates(client, auth_headers, db):
+    product = _create_product(client, auth_headers, 1000)
+    tenant_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["tenant_id"]
+
+    sold, rejected = _hammer(tenant_id, product["id"], allow_negative=True)
+
+    assert rejected == 0
+    assert sold == THREADS * SALES_PER_THREAD
+    assert _stock(db, product["id"]) == 1000 - THREADS * SALES_PER_THREAD
+
+
+def test_concurrent_decrements_reject_oversell(client, auth_headers, db):
+    product = _create_product(client, auth_headers, 50)
+    tenant_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["tenant_id"]
+
+    sold, rejected = _hammer(tenant_id, product["id"], allow_negative=False)
+
+    assert sold == 50
+    assert rejected == THREADS * SALES_PER_THREAD - 50
+    assert _stock(db, product["id"]) == 0
+
+
+def test_sale_rejected_when_policy_forbids_oversell(client, auth_headers):
+    product = _create_product(client, auth_headers, 2)
+    client.put("/api/v1/settings/stock-policy", json={"allow_negative": False}, headers=auth_headers)
+
+    response = client.post("/api/v1/sales", json={
+        "items": [{"product_id": product["id"], "quantity": 3}],
+        "payment_method": "card"
+    }, headers=auth_headers)
+    assert response.status_code == 400
+
+    unchanged = client.get(f"/api/v1/products/{product['id']}", headers=auth_headers).json()
+    assert unchanged["stock_quantity"] == 2
+
+
+def test_sale_allowed_negative_by_default(client, auth_headers):
+    product = _create_product(client, auth_headers, 2)
+
+    response = client.post("/api/v1/sales", json={
+        "items": [{"product_id": product["id"], "quantity": 3}],
+        "payment_method": "card"
+    }, headers=auth_headers)
+    assert response.status_code == 200
+
+    updated = client.get(f"/api/v1/products/{product['id']}", headers=auth_headers).json()
+    assert updated["stock_quantity"] == -1
+
+
+def test_batch_ingest_rejects_oversell_in_order(client, auth_headers):
+    product = _create_product(client, auth_headers, 3)
+    client.put("/api/v1/settings/stock-policy", json={"allow_negative": False}, headers=auth_headers)
+
+    response = client.post("/api/v1/sales/batch", json={"sales": [
+        {"client_id": f"till-9:{n}", "items": [{"product_id": product["id"], "quantity": 2}],
+         "payment_method": "card"}
+        for n in range(3)
+    ]}, headers=auth_headers).json()
+
+    assert [r["status"] for r in response["results"]] == ["created", "error", "error"]
+    stock = client.get(f"/api/v1/products/{product['id']}", headers=auth_headers).json()["stock_quantity"]
+    assert stock == 1